@@ -1,837 +1,82 @@
+import io
+import os
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-from scipy import stats
 import plotly.express as px
 import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-
-from reportlab.platypus import (
-    SimpleDocTemplate,
-    Paragraph,
-    Spacer,
-    Table,
-    TableStyle,
-    Image as RLImage,
-)
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-
-import tempfile
-import io
-import os
-
-# ------------------------------------------------------------------
-# MULTI-LANGUAGE SUPPORT
-# ------------------------------------------------------------------
-LANGUAGES = {
-    "en": {
-        "page_title": "📊 The Relationship between Fear of Missing Out (FOMO) and Social Media Addiction among Generation Z",
-        "subtitle": "Statistics 1 • Class 1",
-        "sidebar_members": "👥 Group Members",
-        "language_selector": "🌐 Language",
-        "upload_dataset": "1. Upload Dataset",
-        "upload_instruction": "Upload a CSV or Excel file:",
-        "upload_info": "Please upload a dataset first.",
-        "preview_data": "Preview data (First 5 rows, before age cleaning):",
-        "see_columns": "See all column names (headers):",
-        "age_detected": "Age column detected as:",
-        "age_not_found": "Age column not found. Make sure there's a column with 'Age' or 'Umur' in the name.",
-        "data_clean_success": "✅ Data cleaning & age grouping completed.",
-        "data_clean_summary": "**Data Cleaning Summary:**",
-        "respondents_before": "Respondents before cleaning:",
-        "respondents_after": "Respondents after cleaning (13–28 years only):",
-        "respondents_removed": "Removed respondents:",
-        "age_distribution": "**Age Group Distribution:**",
-        "num_respondents": "Number of respondents",
-        "preview_after_clean": "Preview data after cleaning & age grouping:",
-        "select_variables": "2. Select Variables X and Y (fixed item set)",
-        "fomo_items": "FOMO (X) – Choose Items:",
-        "fomo_help": "Select X1–X5 items (As per Questionnaire).",
-        "addiction_items": "Social Media Addiction (Y) – Choose Items:",
-        "addiction_help": "Select Y1–Y5 items (As per Questionnaire).",
-        "selected_fomo": "**Selected FOMO items:**",
-        "selected_addiction": "**Selected Addiction items:**",
-        "min_selection": "Please select at least 1 item for X and 1 item for Y.",
-        "composite_scores": "3. Composite Scores (X_total & Y_total)",
-        "composite_method": "Composite score method:",
-        "mean_items": "Mean of items (recommended)",
-        "sum_items": "Sum of items",
-        "composite_success": "✅ Composite scores X_total and Y_total have been successfully created.",
-        "normality_test": "Normality Test (Shapiro–Wilk)",
-        "result": "### Result:",
-        "variable": "Variable",
-        "statistic": "Shapiro-Wilk Statistic",
-        "p_value": "p-value",
-        "normality": "Normality",
-        "normal": "Normal",
-        "not_normal": "Not Normal",
-        "recommended_method": "✅ Recommended association method based on normality test:",
-        "valid_respondents": "Valid respondents (after age filter)",
-        "avg_fomo": "Average FOMO (X_total)",
-        "avg_addiction": "Average Addiction (Y_total)",
-        "association_analysis": "4. Association Analysis – Choose Method",
-        "association_method": "Association method for X and Y (based on normality recommendation):",
-        "pearson": "Pearson Correlation",
-        "spearman": "Spearman Rank Correlation",
-        "chi_square": "Chi-square Test (categorical X & Y)",
-        "chi_instruction": "**Chi-square Test – Select categorical X and Y variables (Likert).**",
-        "categorical_x": "Categorical X variable:",
-        "categorical_y": "Categorical Y variable:",
-        "tab_desc": "📋 Descriptive Statistics",
-        "tab_vis": "📈 Visualizations",
-        "tab_assoc": "🔗 Analysis Result",
-        "tab_pdf": "📄 PDF Report",
-        "demographic_summary": "### 5.0 Demographic Summary",
-        "age_group_dist": "**Age Group Distribution**",
-        "gender_dist": "**Gender Distribution**",
-        "gender_not_detected": "Gender column was not detected, so gender distribution is not shown.",
-        "desc_items": "### 5.1 Descriptive Statistics – Each Survey Item",
-        "desc_composite": "### 5.2 Descriptive Statistics – Composite Scores (X_total & Y_total)",
-        "freq_table": "### 5.3 Frequency & Percentage Table (All X and Y Items)",
-        "freq_caption": "Table shows frequency distribution for each questionnaire item X1 to Y5. Charts available in '📈 Visualizations' tab.",
-        "result_for_item": "#### Result for Item:",
-        "frequency": "Frequency",
-        "percentage": "Percentage (%)",
-        "likert_note": "Note: SD=Strongly Disagree, SA=Strongly Agree.",
-        "visualizations": "### 6. Visualizations",
-        "age_chart": "#### 6.1 Distribution of Respondents by Age Group",
-        "hist_x": "#### 6.2 Distribution of X_total (FOMO)",
-        "hist_y": "#### 6.3 Distribution of Y_total (Social Media Addiction)",
-        "scatter": "#### 6.4 Scatterplot: X_total (FOMO) vs Y_total (Social Media Addiction)",
-        "item_charts": "#### 6.5 Interactive Bar Charts for Each Survey Item",
-        "item_caption": "Bar charts show response distribution for each questionnaire item.",
-        "stacked_chart": "#### 6.6 Interactive Stacked Bar Chart: Response Percentage Across All Items",
-        "stacked_caption": "This chart shows percentage distribution of responses for all questionnaire items (X1-Y5).",
-        "item": "Item:",
-        "assoc_result": "### 7. Association Analysis",
-        "result_corr": "#### Result",
-        "corr_coef": "Correlation Coefficient (r)",
-        "direction": "Direction",
-        "strength": "Strength",
-        "significance": "Significance",
-        "interpretation": "#### Interpretation:",
-        "visual_check": "#### Visual Check: Scatterplot",
-        "chi_result": "#### Chi-square Test Result between",
-        "chi_value": "Chi-square Value (χ²)",
-        "dof": "Degrees of Freedom (dof)",
-        "contingency": "#### Contingency Table",
-        "select_method": "Please select an association method in section **4. Association Analysis** above.",
-        "pdf_export": "### 8. Export PDF Report",
-        "pdf_filename": "PDF file name (without .pdf):",
-        "pdf_layout": "**PDF Visualization Layout Settings:**",
-        "charts_per_row": "Charts per Row:",
-        "select_content": "Select content to include in PDF:",
-        "include_items": "Descriptive statistics – items (X & Y)",
-        "include_comp": "Descriptive statistics – composite scores (X_total & Y_total)",
-        "include_corr": "Association analysis summary",
-        "include_demo": "Demographic summary (Age & Gender)",
-        "include_normality": "Normality test result (Shapiro–Wilk)",
-        "visualizations_pdf": "**Visualizations**",
-        "include_freq": "Frequency bar charts (All X and Y items)",
-        "include_stacked": "Stacked Bar Chart (All Item Response Percentage)",
-        "include_hist_x": "Histogram X_total",
-        "include_hist_y": "Histogram Y_total",
-        "include_scatter": "Scatterplot X_total vs Y_total",
-        "include_age": "Demographic bar chart (Age Group)",
-        "generate_pdf": "Generate PDF Report",
-        "pdf_success": "✅ PDF Report '{}' successfully created and ready for download.",
-        "pdf_error": "Failed to build PDF. Make sure all charts fit on the page. Error details: {}",
-        "download_pdf": "Download PDF Report",
-        "age_group": "Age Group",
-        "x_total_score": "X_total Score (FOMO)",
-        "y_total_score": "Y_total Score (Social Media Addiction)",
-        "response_score": "Response Score",
-        "survey_item": "Survey Item",
-        "regression_line": "Regression line",
-    },
-    "id": {
-        "page_title": "📊 Hubungan antara Fear of Missing Out (FOMO) dan Kecanduan Media Sosial pada Generasi Z",
-        "subtitle": "Statistika 1 • Kelas 1",
-        "sidebar_members": "👥 Anggota Kelompok",
-        "language_selector": "🌐 Bahasa",
-        "upload_dataset": "1. Unggah Dataset",
-        "upload_instruction": "Unggah file CSV atau Excel:",
-        "upload_info": "Silakan unggah dataset terlebih dahulu.",
-        "preview_data": "Preview data (5 baris pertama, sebelum pembersihan usia):",
-        "see_columns": "Lihat semua nama kolom (header):",
-        "age_detected": "Kolom usia terdeteksi sebagai:",
-        "age_not_found": "Kolom usia tidak ditemukan. Pastikan ada kolom dengan nama mengandung 'Age' atau 'Umur'.",
-        "data_clean_success": "✅ Pembersihan data & pengelompokan usia selesai.",
-        "data_clean_summary": "**Ringkasan Pembersihan Data:**",
-        "respondents_before": "Responden sebelum pembersihan:",
-        "respondents_after": "Responden setelah pembersihan (usia 13–28 tahun saja):",
-        "respondents_removed": "Responden dihapus:",
-        "age_distribution": "**Distribusi Kelompok Usia:**",
-        "num_respondents": "Jumlah responden",
-        "preview_after_clean": "Preview data setelah pembersihan & pengelompokan usia:",
-        "select_variables": "2. Pilih Variabel X dan Y (set item tetap)",
-        "fomo_items": "FOMO (X) – Pilih Item:",
-        "fomo_help": "Pilih item X1–X5 (Sesuai Kuesioner).",
-        "addiction_items": "Kecanduan Media Sosial (Y) – Pilih Item:",
-        "addiction_help": "Pilih item Y1–Y5 (Sesuai Kuesioner).",
-        "selected_fomo": "**Item FOMO yang dipilih:**",
-        "selected_addiction": "**Item Kecanduan yang dipilih:**",
-        "min_selection": "Minimal pilih 1 item untuk X dan 1 item untuk Y.",
-        "composite_scores": "3. Skor Komposit (X_total & Y_total)",
-        "composite_method": "Metode skor komposit:",
-        "mean_items": "Rata-rata item (direkomendasikan)",
-        "sum_items": "Jumlah item",
-        "composite_success": "✅ Skor komposit X_total dan Y_total berhasil dibuat.",
-        "normality_test": "Uji Normalitas (Shapiro–Wilk)",
-        "result": "### Hasil:",
-        "variable": "Variabel",
-        "statistic": "Statistik Shapiro-Wilk",
-        "p_value": "nilai-p",
-        "normality": "Normalitas",
-        "normal": "Normal",
-        "not_normal": "Tidak Normal",
-        "recommended_method": "✅ Metode asosiasi yang direkomendasikan berdasarkan uji normalitas:",
-        "valid_respondents": "Responden valid (setelah filter usia)",
-        "avg_fomo": "Rata-rata FOMO (X_total)",
-        "avg_addiction": "Rata-rata Kecanduan (Y_total)",
-        "association_analysis": "4. Analisis Asosiasi – Pilih Metode",
-        "association_method": "Metode asosiasi untuk X dan Y (berdasarkan rekomendasi normalitas):",
-        "pearson": "Korelasi Pearson",
-        "spearman": "Korelasi Rank Spearman",
-        "chi_square": "Uji Chi-square (X & Y kategorikal)",
-        "chi_instruction": "**Uji Chi-square – Pilih variabel X dan Y kategorikal (Likert).**",
-        "categorical_x": "Variabel X kategorikal:",
-        "categorical_y": "Variabel Y kategorikal:",
-        "tab_desc": "📋 Statistik Deskriptif",
-        "tab_vis": "📈 Visualisasi",
-        "tab_assoc": "🔗 Hasil Analisis",
-        "tab_pdf": "📄 Laporan PDF",
-        "demographic_summary": "### 5.0 Ringkasan Demografi",
-        "age_group_dist": "**Distribusi Kelompok Usia**",
-        "gender_dist": "**Distribusi Jenis Kelamin**",
-        "gender_not_detected": "Kolom jenis kelamin tidak terdeteksi, sehingga distribusi jenis kelamin tidak ditampilkan.",
-        "desc_items": "### 5.1 Statistik Deskriptif – Setiap Item Survei",
-        "desc_composite": "### 5.2 Statistik Deskriptif – Skor Komposit (X_total & Y_total)",
-        "freq_table": "### 5.3 Tabel Frekuensi & Persentase (Semua Item X dan Y)",
-        "freq_caption": "Tabel menunjukkan distribusi frekuensi untuk setiap item kuesioner X1 hingga Y5. Grafik tersedia di tab '📈 Visualisasi'.",
-        "result_for_item": "#### Hasil untuk Item:",
-        "frequency": "Frekuensi",
-        "percentage": "Persentase (%)",
-        "likert_note": "Keterangan: STS=Sangat Tidak Setuju, SS=Sangat Setuju.",
-        "visualizations": "### 6. Visualisasi",
-        "age_chart": "#### 6.1 Distribusi Responden Berdasarkan Kelompok Usia",
-        "hist_x": "#### 6.2 Distribusi X_total (FOMO)",
-        "hist_y": "#### 6.3 Distribusi Y_total (Kecanduan Media Sosial)",
-        "scatter": "#### 6.4 Scatterplot: X_total (FOMO) vs Y_total (Kecanduan Media Sosial)",
-        "item_charts": "#### 6.5 Grafik Batang Interaktif untuk Setiap Item Survei",
-        "item_caption": "Grafik batang menunjukkan distribusi jawaban untuk setiap item kuesioner.",
-        "stacked_chart": "#### 6.6 Grafik Batang Bertumpuk Interaktif: Persentase Respons untuk Semua Item",
-        "stacked_caption": "Grafik ini menunjukkan persentase distribusi jawaban untuk semua item kuesioner (X1-Y5).",
-        "item": "Item:",
-        "assoc_result": "### 7. Analisis Asosiasi",
-        "result_corr": "#### Hasil",
-        "corr_coef": "Koefisien Korelasi (r)",
-        "direction": "Arah",
-        "strength": "Kekuatan",
-        "significance": "Signifikansi",
-        "interpretation": "#### Interpretasi:",
-        "visual_check": "#### Pemeriksaan Visual: Scatterplot",
-        "chi_result": "#### Hasil Uji Chi-square antara",
-        "chi_value": "Nilai Chi-square (χ²)",
-        "dof": "Derajat Kebebasan (dof)",
-        "contingency": "#### Tabel Kontingensi",
-        "select_method": "Silakan pilih metode asosiasi di bagian **4. Analisis Asosiasi** di atas.",
-        "pdf_export": "### 8. Ekspor Laporan PDF",
-        "pdf_filename": "Nama file PDF (tanpa .pdf):",
-        "pdf_layout": "**Pengaturan Layout Visualisasi dalam PDF:**",
-        "charts_per_row": "Grafik per Baris:",
-        "select_content": "Pilih konten yang ingin dimasukkan ke PDF:",
-        "include_items": "Statistik deskriptif – item (X & Y)",
-        "include_comp": "Statistik deskriptif – skor komposit (X_total & Y_total)",
-        "include_corr": "Ringkasan analisis asosiasi",
-        "include_demo": "Ringkasan demografi (Usia & Jenis Kelamin)",
-        "include_normality": "Hasil uji normalitas (Shapiro–Wilk)",
-        "visualizations_pdf": "**Visualisasi**",
-        "include_freq": "Grafik batang frekuensi (Semua item X dan Y)",
-        "include_stacked": "Grafik Batang Bertumpuk (Persentase Respons Semua Item)",
-        "include_hist_x": "Histogram X_total",
-        "include_hist_y": "Histogram Y_total",
-        "include_scatter": "Scatterplot X_total vs Y_total",
-        "include_age": "Grafik batang demografi (Kelompok Usia)",
-        "generate_pdf": "Buat Laporan PDF",
-        "pdf_success": "✅ Laporan PDF '{}' berhasil dibuat dan siap diunduh.",
-        "pdf_error": "Gagal membangun PDF. Pastikan semua grafik muat di halaman. Detail Error: {}",
-        "download_pdf": "Unduh Laporan PDF",
-        "age_group": "Kelompok Usia",
-        "x_total_score": "Skor X_total (FOMO)",
-        "y_total_score": "Skor Y_total (Kecanduan Media Sosial)",
-        "response_score": "Skor Respons",
-        "survey_item": "Item Survei",
-        "regression_line": "Garis regresi",
-    }
-}
-
-RESPONSE_LABELS_EN = {
-    1: "1 (SD: Strongly Disagree)",
-    2: "2 (D: Disagree)",
-    3: "3 (N: Neutral)",
-    4: "4 (A: Agree)",
-    5: "5 (SA: Strongly Agree)",
-}
-
-RESPONSE_LABELS_ID = {
-    1: "1 (STS: Sangat Tidak Setuju)",
-    2: "2 (TS: Tidak Setuju)",
-    3: "3 (N: Netral)",
-    4: "4 (S: Setuju)",
-    5: "5 (SS: Sangat Setuju)",
-}
-
-FOMO_LABELS_EN = {
-    "X1": "I feel anxious if I don't know the latest updates on social media.",
-    "X2": "I feel the urge to constantly check social media to stay connected.",
-    "X3": "I'm afraid of being left behind when others talk about trending topics.",
-    "X4": "I feel the need to follow viral trends to stay 'included'.",
-    "X5": "I feel uncomfortable when I see others participating in activities that I am not part of.",
-}
-
-FOMO_LABELS_ID = {
-    "X1": "Saya merasa cemas jika tidak tahu update terbaru di media sosial.",
-    "X2": "Saya merasa perlu terus mengecek media sosial agar tetap terhubung.",
-    "X3": "Saya takut ketinggalan saat orang lain membahas topik yang sedang tren.",
-    "X4": "Saya merasa perlu mengikuti tren viral agar tetap 'masuk'.",
-    "X5": "Saya merasa tidak nyaman saat melihat orang lain mengikuti aktivitas yang tidak saya ikuti.",
-}
-
-ADDICTION_LABELS_EN = {
-    "Y1": "I find it difficult to reduce the amount of time I spend on social media.",
-    "Y2": "I prefer using social media over doing offline activities.",
-    "Y3": "Social media usage disrupts my sleep, study time, or other important activities.",
-    "Y4": "I often spend more time on social media than I originally planned.",
-    "Y5": "I often open social media automatically without any clear purpose.",
-}
-
-ADDICTION_LABELS_ID = {
-    "Y1": "Saya kesulitan mengurangi waktu yang saya habiskan di media sosial.",
-    "Y2": "Saya lebih suka menggunakan media sosial daripada melakukan aktivitas offline.",
-    "Y3": "Penggunaan media sosial mengganggu tidur, waktu belajar, atau aktivitas penting lainnya.",
-    "Y4": "Saya sering menghabiskan lebih banyak waktu di media sosial dari yang saya rencanakan.",
-    "Y5": "Saya sering membuka media sosial secara otomatis tanpa tujuan yang jelas.",
-}
-
-# ------------------------------------------------------------------
-# HELPER FUNCTIONS
-# ------------------------------------------------------------------
-def descriptive_table(data: pd.DataFrame, cols, lang_dict):
-    t = lang_dict
-    rows = []
-    for col in cols:
-        if col not in data.columns:
-            continue
-        s = data[col].dropna()
-        if s.empty:
-            continue
-        mode_vals = s.mode()
-        mode_val = mode_vals.iloc[0] if not mode_vals.empty else np.nan
-        rows.append({
-            t["variable"]: col,
-            "N": len(s),
-            "Mean": s.mean(),
-            "Median": s.median(),
-            "Mode": mode_val,
-            "Min": s.min(),
-            "Max": s.max(),
-            "Std Dev": s.std(ddof=1),
-        })
-    if not rows:
-        return pd.DataFrame(columns=[t["variable"], "N", "Mean", "Median", "Mode", "Min", "Max", "Std Dev"]).set_index(t["variable"])
-    return pd.DataFrame(rows).set_index(t["variable"]).round(3)
-
-
-def compute_normality(valid_xy: pd.DataFrame, lang_dict):
-    t = lang_dict
-    shapiro_x = stats.shapiro(valid_xy["X_total"])
-    shapiro_y = stats.shapiro(valid_xy["Y_total"])
-    normal_x = t["normal"] if shapiro_x.pvalue >= 0.05 else t["not_normal"]
-    normal_y = t["normal"] if shapiro_y.pvalue >= 0.05 else t["not_normal"]
-
-    result_norm = pd.DataFrame({
-        t["variable"]: ["X_total", "Y_total"],
-        t["statistic"]: [shapiro_x.statistic, shapiro_y.statistic],
-        t["p_value"]: [shapiro_x.pvalue, shapiro_y.pvalue],
-        t["normality"]: [normal_x, normal_y]
-    }).round(4)
-
-    if normal_x == t["normal"] and normal_y == t["normal"]:
-        recommended_method = t["pearson"]
-    else:
-        recommended_method = t["spearman"]
-
-    return result_norm, recommended_method, (shapiro_x, shapiro_y)
-
-
-def interpret_strength(r, lang_code):
-    a = abs(r)
-    if a < 0.2:
-        return "very weak" if lang_code == "en" else "sangat lemah"
-    elif a < 0.4:
-        return "weak" if lang_code == "en" else "lemah"
-    elif a < 0.6:
-        return "moderate" if lang_code == "en" else "sedang"
-    elif a < 0.8:
-        return "strong" if lang_code == "en" else "kuat"
-    else:
-        return "very strong" if lang_code == "en" else "sangat kuat"
-
-
-def compute_correlation(valid_xy: pd.DataFrame, method: str, lang_code: str, lang_dict):
-    t = lang_dict
-    x_corr = valid_xy["X_total"]
-    y_corr = valid_xy["Y_total"]
-
-    if method == t["pearson"]:
-        r_value, p_value = stats.pearsonr(x_corr, y_corr)
-        method_short = "Pearson"
-    else:
-        r_value, p_value = stats.spearmanr(x_corr, y_corr)
-        method_short = "Spearman"
-
-    direction = "positive" if r_value > 0 else "negative"
-    if lang_code == "id":
-        direction = "positif" if r_value > 0 else "negatif"
-
-    strength = interpret_strength(r_value, lang_code)
-    if lang_code == "en":
-        signif_text = "significant (p < 0.05)" if p_value < 0.05 else "not significant (p ≥ 0.05)"
-    else:
-        signif_text = "signifikan (p < 0,05)" if p_value < 0.05 else "tidak signifikan (p ≥ 0,05)"
-
-    assoc_stats = {
-        "type": "correlation",
-        "method": method_short,
-        "r": r_value,
-        "p": p_value,
-        "direction": direction,
-        "strength": strength,
-        "signif_text": signif_text,
-    }
-
-    if lang_code == "en":
-        assoc_summary_text = (
-            f"Using the {method_short} correlation, there is a {direction} and {strength} "
-            f"relationship between FOMO (X_total) and social media addiction (Y_total), "
-            f"with r = {r_value:.3f} and p = {p_value:.4f}, indicating that the association is "
-            f"{signif_text}."
-        )
-    else:
-        assoc_summary_text = (
-            f"Menggunakan korelasi {method_short}, terdapat hubungan {direction} dan {strength} "
-            f"antara FOMO (X_total) dan kecanduan media sosial (Y_total), "
-            f"dengan r = {r_value:.3f} dan p = {p_value:.4f}, menunjukkan bahwa asosiasi tersebut "
-            f"{signif_text}."
-        )
-
-    return assoc_stats, assoc_summary_text
-
-
-def compute_chi_square(df: pd.DataFrame, x_col: str, y_col: str, lang_code: str, lang_dict):
-    t = lang_dict
-    contingency = pd.crosstab(df[x_col], df[y_col])
-    chi2_value, p_chi, dof, expected = stats.chi2_contingency(contingency)
-
-    if lang_code == "en":
-        signif_text = "significant (p < 0.05)" if p_chi < 0.05 else "not significant (p ≥ 0.05)"
-    else:
-        signif_text = "signifikan (p < 0,05)" if p_chi < 0.05 else "tidak signifikan (p ≥ 0,05)"
-
-    assoc_stats = {
-        "type": "chi-square",
-        "method": "Chi-square",
-        "chi2": chi2_value,
-        "p": p_chi,
-        "dof": dof,
-        "x": x_col,
-        "y": y_col,
-        "signif_text": signif_text,
-        "contingency": contingency,
-    }
-
-    if lang_code == "en":
-        assoc_summary_text = (
-            f"Using the Chi-square test between {x_col} and {y_col}, "
-            f"the chi-square statistic is χ² = {chi2_value:.3f} with {dof} degrees of freedom "
-            f"and p = {p_chi:.4f}, indicating that the association is {signif_text}."
-        )
-    else:
-        assoc_summary_text = (
-            f"Menggunakan uji Chi-square antara {x_col} dan {y_col}, "
-            f"statistik chi-square adalah χ² = {chi2_value:.3f} dengan {dof} derajat kebebasan "
-            f"dan p = {p_chi:.4f}, menunjukkan bahwa asosiasi tersebut {signif_text}."
-        )
-
-    return assoc_stats, assoc_summary_text
-
-
-def generate_pdf_report(
-    lang_code,
-    t,
-    pdf_filename,
-    before_clean,
-    after_clean,
-    age_demo_df,
-    gender_demo_df,
-    result_norm,
-    desc_items,
-    desc_comp,
-    assoc_summary_text,
-    age_counts,
-    df,
-    x_items,
-    y_items,
-    valid_xy,
-    include_items,
-    include_comp,
-    include_corr,
-    include_demo,
-    include_normality,
-    include_freq_plot,
-    include_stacked_plot,
-    include_hist_x_plot,
-    include_hist_y_plot,
-    include_scatter_plot,
-    include_age_plot,
-):
-    """Build PDF and return bytes"""
-    styles = getSampleStyleSheet()
-    story = []
-    temp_imgs = []
-
-    safe_filename = "".join(c for c in pdf_filename if c.isalnum() or c in (" ", "_")).rstrip()
-    final_filename = (safe_filename if safe_filename else "Laporan_Analisis") + ".pdf"
-
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-
-    def add_table(title, df_table):
-        if df_table is None or df_table.empty:
-            return
-        story.append(Paragraph(title, styles["Heading3"]))
-        df_reset = df_table.reset_index()
-        table_data = [df_reset.columns.tolist()] + df_reset.values.tolist()
-        tbl = Table(table_data)
-        tbl.setStyle(
-            TableStyle(
-                [
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                    ("ALIGN", (1, 1), (-1, -1), "CENTER"),
-                ]
-            )
-        )
-        story.append(tbl)
-        story.append(Spacer(1, 10))
 
-    def add_frequency_table(item_name, freq_table):
-        """Add frequency table for a single item"""
-        if freq_table is None or freq_table.empty:
-            return
-        
-        story.append(Paragraph(f"Frequency Table: {item_name}", styles["Heading4"]))
-        
-        # Prepare table data
-        freq_reset = freq_table.reset_index()
-        table_data = [freq_reset.columns.tolist()] + freq_reset.values.tolist()
-        
-        tbl = Table(table_data)
-        tbl.setStyle(
-            TableStyle(
-                [
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                    ("ALIGN", (1, 1), (-1, -1), "CENTER"),
-                ]
-            )
-        )
-        story.append(tbl)
-        story.append(Spacer(1, 8))
-
-    def add_plot(fig, title_text, width=400, height=250):
-        if fig is None:
-            return
-        tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-        fig.savefig(tmp_file.name, bbox_inches="tight")
-        plt.close(fig)
-        temp_imgs.append(tmp_file.name)
-        story.append(Paragraph(title_text, styles["Heading4"]))
-        img = RLImage(tmp_file.name, width=width, height=height)
-        story.append(img)
-        story.append(Spacer(1, 10))
-
-    # Title
-    if lang_code == "en":
-        main_title = "Survey Analysis Report"
-        subtitle = "FOMO & Social Media Addiction – Statistics 1 (Group 3)"
-        members_title = "Group Members:"
-        cleaning_title = "Data Cleaning (Age Filter & Grouping):"
-        cleaning_text = (
-            "Only respondents whose age category was 13–18 years, 19–23 years, "
-            "or 24–28 years were included in the analysis to represent Generation Z. "
-            "Other age categories such as below 13 or above 28 years were excluded."
-        )
-        resp_text = (
-            f"Respondents before cleaning: {before_clean}<br/>"
-            f"Respondents after cleaning: {after_clean}<br/>"
-            f"Removed respondents: {before_clean - after_clean}"
-        )
-        demo_title = "Demographic Summary – Age Group"
-        gender_title = "Demographic Summary – Gender"
-        freq_table_title = "Frequency Tables for Survey Items"
-        vis_title = "Visualizations"
-    else:
-        main_title = "Laporan Analisis Survei"
-        subtitle = "FOMO & Kecanduan Media Sosial – Statistika 1 (Kelompok 3)"
-        members_title = "Anggota Kelompok:"
-        cleaning_title = "Pembersihan Data (Filter & Pengelompokan Usia):"
-        cleaning_text = (
-            "Hanya responden dengan kategori usia 13–18 tahun, 19–23 tahun, "
-            "atau 24–28 tahun yang disertakan dalam analisis untuk mewakili Generasi Z. "
-            "Kategori usia lain di bawah 13 atau di atas 28 tahun dikeluarkan."
-        )
-        resp_text = (
-            f"Responden sebelum pembersihan: {before_clean}<br/>"
-            f"Responden setelah pembersihan: {after_clean}<br/>"
-            f"Responden dihapus: {before_clean - after_clean}"
-        )
-        demo_title = "Ringkasan Demografi – Kelompok Usia"
-        gender_title = "Ringkasan Demografi – Jenis Kelamin"
-        freq_table_title = "Tabel Frekuensi untuk Item Survei"
-        vis_title = "Visualisasi"
-
-    story.append(Paragraph(main_title, styles["Title"]))
-    story.append(Spacer(1, 12))
-    story.append(Paragraph(subtitle, styles["Heading2"]))
-    story.append(Spacer(1, 8))
-    story.append(Paragraph(members_title, styles["Heading3"]))
-    story.append(
-        Paragraph(
-            "- Delon Raphael Andianto (004202200050)<br/>"
-            "- Kallista Viasta (004202200039)<br/>"
-            "- Nabila Putri Amalia (004202200049)<br/>"
-            "- Pingkan R G Lumingkewas (004202200035)",
-            styles["Normal"],
-        )
-    )
-    story.append(Spacer(1, 12))
-
-    story.append(Paragraph(cleaning_title, styles["Heading3"]))
-    story.append(Paragraph(cleaning_text, styles["Normal"]))
-    story.append(Spacer(1, 8))
-    story.append(Paragraph(resp_text, styles["Normal"]))
-    story.append(Spacer(1, 12))
-
-    # Tables - Ensure data exists
-    if include_normality and result_norm is not None and not result_norm.empty:
-        add_table(
-            "Normality Test (Shapiro–Wilk)" if lang_code == "en" else "Uji Normalitas (Shapiro–Wilk)",
-            result_norm,
-        )
-
-    if include_demo:
-        if age_demo_df is not None and not age_demo_df.empty:
-            add_table(demo_title, age_demo_df)
-        if gender_demo_df is not None and not gender_demo_df.empty:
-            add_table(gender_title, gender_demo_df)
-
-    if include_items and desc_items is not None and not desc_items.empty:
-        add_table(
-            "Descriptive Statistics – Selected Items"
-            if lang_code == "en"
-            else "Statistik Deskriptif – Item Terpilih",
-            desc_items,
-        )
-
-    if include_comp and desc_comp is not None and not desc_comp.empty:
-        add_table(
-            "Descriptive Statistics – Composite Scores (X_total & Y_total)"
-            if lang_code == "en"
-            else "Statistik Deskriptif – Skor Komposit (X_total & Y_total)",
-            desc_comp,
-        )
-
-    # Add frequency tables for all items
-    if include_items:
-        story.append(Paragraph(freq_table_title, styles["Heading3"]))
-        story.append(Spacer(1, 10))
-        
-        all_items_list = list(x_items) + list(y_items)
-        for var in all_items_list:
-            if var not in df.columns:
-                continue
-            s_freq = df[var].dropna()
-            if s_freq.empty:
-                continue
-            freq = s_freq.value_counts().sort_index()
-            perc = (freq / freq.sum() * 100).round(2)
-            freq_table = pd.DataFrame({t["frequency"]: freq, t["percentage"]: perc})
-            
-            # Add response labels if applicable
-            if freq_table.index.dtype in [int, float] and freq_table.index.max() <= 5:
-                # Create a copy with labeled index for display
-                freq_table_display = freq_table.copy()
-                RESPONSE_LABELS = RESPONSE_LABELS_EN if lang_code == "en" else RESPONSE_LABELS_ID
-                labeled_index = freq_table.index.map(lambda x: RESPONSE_LABELS.get(x, x))
-                freq_table_display.index = labeled_index
-                freq_table_display.index.name = "Response"
-            else:
-                freq_table_display = freq_table
-            
-            add_frequency_table(var, freq_table_display)
-
-    if include_corr and assoc_summary_text:
-        story.append(
-            Paragraph(
-                "Association Analysis Summary"
-                if lang_code == "en"
-                else "Ringkasan Analisis Asosiasi",
-                styles["Heading3"],
-            )
-        )
-        story.append(Paragraph(assoc_summary_text, styles["Normal"]))
-        story.append(Spacer(1, 10))
-
-    # Visualizations - Create figures as needed
-    any_plot = False
-    figures_to_add = []
-
-    # Age bar
-    if include_age_plot and age_counts is not None and not age_counts.empty:
-        any_plot = True
-        fig_age, ax_age = plt.subplots(figsize=(6, 4))
-        age_counts.plot(kind="bar", ax=ax_age, color="skyblue", edgecolor="black")
-        ax_age.set_xlabel(t["age_group"])
-        ax_age.set_ylabel(t["frequency"] if lang_code == "id" else "Frequency")
-        if lang_code == "en":
-            ax_age.set_title("Distribution of Respondents by Age Group")
-        else:
-            ax_age.set_title("Distribusi Responden Berdasarkan Kelompok Usia")
-        plt.tight_layout()
-        figures_to_add.append((fig_age, ax_age.get_title()))
-
-    # Per-item frequency plots
-    all_items_list = list(x_items) + list(y_items)
-    if include_freq_plot and all_items_list:
-        any_plot = True
-        for var in all_items_list:
-            if var not in df.columns:
-                continue
-            s_freq = df[var].dropna()
-            if s_freq.empty:
-                continue
-            freq = s_freq.value_counts().sort_index()
-            fig_bar, ax_bar = plt.subplots(figsize=(5, 3))
-            ax_bar.bar(freq.index.astype(str), freq.values)
-            ax_bar.set_xlabel(var)
-            ax_bar.set_ylabel(t["frequency"] if lang_code == "id" else "Frequency")
-            if lang_code == "en":
-                ax_bar.set_title(f"Frequency Chart: {var}")
-            else:
-                ax_bar.set_title(f"Grafik Frekuensi: {var}")
-            plt.tight_layout()
-            figures_to_add.append((fig_bar, ax_bar.get_title()))
-
-    # Stacked bar (percentage)
-    if include_stacked_plot and all_items_list:
-        any_plot = True
-        # Ensure we only use available columns
-        available_items = [item for item in all_items_list if item in df.columns]
-        if available_items:
-            freq_data = df[available_items].apply(lambda x: x.value_counts(normalize=True)).T * 100
-            freq_data = freq_data.fillna(0).sort_index()
-
-            for i in range(1, 6):
-                if i not in freq_data.columns:
-                    freq_data[i] = 0.0
-            freq_data = freq_data.sort_index(axis=1)
-
-            fig_stack, ax_stack = plt.subplots(figsize=(8, 5))
-            freq_data.plot(
-                kind="bar",
-                stacked=True,
-                ax=ax_stack,
-                color=plt.cm.RdYlBu(np.linspace(0.1, 0.9, 5)),
-            )
-            ax_stack.set_xlabel(t["survey_item"])
-            ax_stack.set_ylabel(t["percentage"])
-            if lang_code == "en":
-                ax_stack.set_title("Response Percentage Across All Items (X & Y)")
-            else:
-                ax_stack.set_title("Persentase Respons untuk Semua Item (X & Y)")
-            ax_stack.legend(
-                title=t["response_score"],
-                bbox_to_anchor=(1.05, 1),
-                loc="upper left",
-            )
-            plt.tight_layout()
-            figures_to_add.append((fig_stack, ax_stack.get_title()))
-
-    # Histograms X_total / Y_total
-    if include_hist_x_plot and valid_xy is not None and "X_total" in valid_xy.columns:
-        any_plot = True
-        fig_hx, ax_hx = plt.subplots(figsize=(6, 4))
-        ax_hx.hist(valid_xy["X_total"].dropna(), bins=10, edgecolor="black", color="lightcoral")
-        ax_hx.set_xlabel(t["x_total_score"])
-        ax_hx.set_ylabel(t["frequency"] if lang_code == "id" else "Frequency")
-        ax_hx.set_title("Histogram X_total")
-        plt.tight_layout()
-        figures_to_add.append((fig_hx, ax_hx.get_title()))
-
-    if include_hist_y_plot and valid_xy is not None and "Y_total" in valid_xy.columns:
-        any_plot = True
-        fig_hy, ax_hy = plt.subplots(figsize=(6, 4))
-        ax_hy.hist(valid_xy["Y_total"].dropna(), bins=10, edgecolor="black", color="lightgreen")
-        ax_hy.set_xlabel(t["y_total_score"])
-        ax_hy.set_ylabel(t["frequency"] if lang_code == "id" else "Frequency")
-        ax_hy.set_title("Histogram Y_total")
-        plt.tight_layout()
-        figures_to_add.append((fig_hy, ax_hy.get_title()))
-
-    # Scatter
-    if include_scatter_plot and valid_xy is not None and {"X_total", "Y_total"}.issubset(valid_xy.columns):
-        any_plot = True
-        fig_sc, ax_sc = plt.subplots(figsize=(6, 4))
-        ax_sc.scatter(valid_xy["X_total"], valid_xy["Y_total"], alpha=0.7)
-        z = np.polyfit(valid_xy["X_total"], valid_xy["Y_total"], 1)
-        p_line = np.poly1d(z)
-        x_line = np.linspace(valid_xy["X_total"].min(), valid_xy["X_total"].max(), 100)
-        y_line = p_line(x_line)
-        ax_sc.plot(x_line, y_line, color="red", linestyle="--")
-        ax_sc.set_xlabel(t["x_total_score"])
-        ax_sc.set_ylabel(t["y_total_score"])
-        if lang_code == "en":
-            ax_sc.set_title("Scatterplot X_total vs Y_total")
-        else:
-            ax_sc.set_title("Scatterplot X_total vs Y_total")
-        plt.tight_layout()
-        figures_to_add.append((fig_sc, ax_sc.get_title()))
-
-    # Add visualizations section if any plot exists
-    if any_plot:
-        story.append(Paragraph(vis_title, styles["Heading2"]))
-        story.append(Spacer(1, 10))
-        for fig, title in figures_to_add:
-            add_plot(fig, title)
-
-    # Build PDF
-    try:
-        doc.build(story)
-        pdf_bytes = buffer.getvalue()
-        return final_filename, pdf_bytes, None
-    except Exception as e:
-        return final_filename, None, str(e)
-    finally:
-        # Clean up temporary image files
-        for path in temp_imgs:
-            try:
-                os.remove(path)
-            except OSError:
-                pass
+from survey_cache import SHARED_CACHE, cached, content_hash
+from survey_density import group_densities
+from survey_efa import run_efa
+from survey_engine import get_engine
+from survey_figures import (
+    age_bar_figure,
+    group_distribution_figure,
+    item_bars_figure,
+    scatter_regression_figure,
+    score_histogram_figure,
+    stacked_items_figure,
+)
+from survey_groups import P_ADJUST_METHODS, compare_groups
+from survey_incremental import IncrementalError, watch
+from survey_irt import fit_grm, test_information
+from survey_jobs import PDF_JOBS
+from survey_snapshot import (
+    SNAPSHOT_DIR,
+    SnapshotError,
+    list_snapshots,
+    load_snapshot,
+    save_snapshot,
+)
+from survey_quality import (
+    DEFAULT_MIN_GAP_SECONDS,
+    DEFAULT_RUN_SHARE,
+    SCREEN_RULES,
+    screen_responses,
+    screening_counts,
+    screening_mask,
+)
+from survey_regression import fit_regression, regression_summary, regression_tables
+from survey_power import instrument_from_data, plan_power, required_sample_size
+from survey_helpers import (
+    LANGUAGES,
+    RESPONSE_LABELS_EN,
+    RESPONSE_LABELS_ID,
+    FOMO_LABELS_EN,
+    FOMO_LABELS_ID,
+    ADDICTION_LABELS_EN,
+    ADDICTION_LABELS_ID,
+    FIXED_X_ITEMS,
+    FIXED_Y_ITEMS,
+    AGE_GROUPS,
+    AGE_KEYWORDS,
+    GENDER_KEYWORDS,
+    TIMESTAMP_KEYWORDS,
+    SURVEY_FILE_TYPES,
+    parse_upload,
+    parse_age_groups,
+    export_clean_dataset,
+    export_analysis_xlsx,
+    association_table,
+    frequency_table,
+    list_excel_sheets,
+    find_column,
+    rename_item_columns,
+    demographic_table,
+    screening_table,
+    describe_columns,
+    normality_test,
+    normality_table,
+    correlation_test,
+    chi_square_test,
+    describe_association,
+    localized_report_inputs,
+    compute_chi_square_matrix,
+    compute_ordinal_association,
+    generate_pdf_report,
+)
 
 # ------------------------------------------------------------------
 # STREAMLIT APP
@@ -868,35 +113,143 @@ st.sidebar.write("- Kallista Viasta (004202200039)")
 st.sidebar.write("- Nabila Putri Amalia (004202200049)")
 st.sidebar.write("- Pingkan R G Lumingkewas (004202200035)")
 
+# dataframe engine for ingest / cleaning / scoring / counts (SURVEY_ENGINE)
+engine = get_engine()
+
+with st.sidebar.expander(t["cache_stats"]):
+    st.caption(t["engine_caption"].format(engine.name))
+    cache_stats = SHARED_CACHE.stats()
+    st.caption(t["cache_caption"].format(
+        cache_stats["entries"],
+        cache_stats["bytes"] / 1024 ** 2,
+        cache_stats["budget_bytes"] / 1024 ** 2,
+        cache_stats["hits"],
+        cache_stats["misses"],
+        cache_stats["evictions"],
+    ))
+
+
+# SNAPSHOTS (restore here, save at the end of the page)
+def restore_snapshot(data: bytes):
+    """Put a snapshot's results back into the shared cache and select its settings"""
+    try:
+        manifest = load_snapshot(data)
+    except (SnapshotError, OSError) as e:
+        st.session_state["snapshot_error"] = str(e)
+        return
+    meta = manifest["meta"]
+    current_upload = st.session_state.get("survey_upload")
+    st.session_state["snapshot"] = {
+        "data_key": manifest["data_key"],
+        "meta": meta,
+        "created": manifest["created"],
+        "clean": manifest["clean"],
+        "upload_id": current_upload.file_id if current_upload is not None else None,
+    }
+    for widget in ("chi_x", "chi_y"):
+        if meta.get(widget):
+            st.session_state[widget] = meta[widget]
+
+
+snapshot_box = st.sidebar.expander(t["snapshot_title"])
+with snapshot_box:
+    saved_snapshots = list_snapshots()
+    if saved_snapshots:
+        chosen_snapshot = st.selectbox(t["snapshot_saved"], saved_snapshots)
+        if st.button(t["snapshot_restore"]):
+            with open(os.path.join(SNAPSHOT_DIR, chosen_snapshot), "rb") as f:
+                restore_snapshot(f.read())
+    snapshot_file = st.file_uploader(t["snapshot_upload"], type=["svsnap"], key="snapshot_file")
+    if snapshot_file is not None and st.button(t["snapshot_restore"], key="restore_uploaded_snapshot"):
+        restore_snapshot(snapshot_file.getvalue())
+    if "snapshot_error" in st.session_state:
+        st.error(t["snapshot_error"].format(st.session_state.pop("snapshot_error")))
+
+# INCREMENTAL MODE (a local export that keeps growing)
+with st.sidebar.expander(t["watch_title"]):
+    watch_path = st.text_input(t["watch_path"], key="watch_path").strip()
+    watch_interval = st.number_input(t["watch_interval"], 0, 3600, 0, 10, key="watch_interval")
+
+if watch_path:
+    st.subheader(t["watch_title"])
+    st.caption(t["watch_caption"])
+
+    @st.fragment(run_every=watch_interval or None)
+    def live_panel():
+        st.button(t["watch_refresh"])
+        try:
+            live = watch(watch_path)
+            result = live.refresh()
+        except (IncrementalError, OSError, ValueError) as e:
+            st.error(t["watch_error"].format(e))
+            return
+        summary = live.summary()
+        if result["reset"]:
+            st.warning(t["watch_reset"])
+        st.caption(t["watch_status"].format(result["new_rows"], result["seconds"], summary["last_refresh"]))
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric(t["watch_rows"], summary["rows"], delta=result["new_rows"] or None)
+        m2.metric(t["watch_clean"], summary["rows_clean"])
+        m3.metric(t["watch_r"], f"{summary['correlation']['r']:.3f}", help=f"p = {summary['correlation']['p']:.4g}")
+        m4.metric(t["watch_latest"], summary["latest_response"] or "–")
+        d1, d2 = st.columns([1, 2])
+        d1.dataframe(summary["age_counts"].rename(t["num_respondents"]), use_container_width=True)
+        d2.dataframe(summary["descriptives"].round(3), use_container_width=True)
+        c1, c2 = st.columns(2)
+        live_x = c1.selectbox(t["categorical_x"], FIXED_X_ITEMS + FIXED_Y_ITEMS, key="watch_chi_x")
+        live_y = c2.selectbox(t["categorical_y"], FIXED_Y_ITEMS + FIXED_X_ITEMS, key="watch_chi_y")
+        chi = live.chi_square(live_x, live_y)
+        st.dataframe(chi["table"], use_container_width=True)
+        st.caption(f"χ² = {chi['chi2']:.3f}, df = {chi['dof']}, p = {chi['p']:.4g}")
+
+    live_panel()
+
 # 1. UPLOAD DATASET
 st.subheader(t["upload_dataset"])
 uploaded = st.file_uploader(
     t["upload_instruction"],
-    type=["csv", "xlsx"],
+    type=SURVEY_FILE_TYPES,
+    key="survey_upload",
 )
 
-if uploaded is None:
+snapshot = st.session_state.get("snapshot")
+if snapshot is not None and uploaded is not None and uploaded.file_id != snapshot["upload_id"]:
+    # a new upload replaces the restored snapshot
+    del st.session_state["snapshot"]
+    snapshot = None
+restored = snapshot["meta"] if snapshot is not None else {}
+
+if uploaded is None and snapshot is None:
     st.info(t["upload_info"])
     st.stop()
 
-if uploaded.name.lower().endswith(".csv"):
-    df = pd.read_csv(uploaded)
+sheet_name = None
+if snapshot is not None:
+    # restored analysis: every result below is served from the shared cache
+    data_key = snapshot["data_key"]
+    source_name = restored["source"]
+    st.info(t["snapshot_restored"].format(source_name, snapshot["created"]))
+    df = snapshot["clean"][0]
 else:
-    df = pd.read_excel(uploaded)
+    source_name = uploaded.name
+    if uploaded.name.lower().endswith(".xlsx"):
+        sheet_names = list_excel_sheets(uploaded)
+        if len(sheet_names) > 1:
+            sheet_name = st.selectbox(t["select_sheet"], sheet_names)
+
+    # parsed / cleaned / scored frames are shared between sessions by content hash
+    upload_bytes = uploaded.getvalue()
+    data_key = (content_hash(upload_bytes), sheet_name)
+    df = parse_upload(upload_bytes, uploaded.name, sheet_name, engine)
 
 st.write(t["preview_data"])
 st.dataframe(df.head(), use_container_width=True)
 
 with st.expander(t["see_columns"]):
-    st.write(list(df.columns))
+    st.write(df.attrs.get("source_columns", list(df.columns)))
 
 # 1A. DATA CLEANING – AGE
-AGE_COLUMN = None
-for col in df.columns:
-    col_lower = str(col).lower()
-    if "age" in col_lower or "umur" in col_lower:
-        AGE_COLUMN = col
-        break
+AGE_COLUMN = find_column(df.columns, AGE_KEYWORDS)
 
 if AGE_COLUMN is None:
     st.error(t["age_not_found"])
@@ -904,20 +257,23 @@ if AGE_COLUMN is None:
 
 st.write(f"{t['age_detected']} **{AGE_COLUMN}**")
 
-allowed_age_categories = [
-    "13–18 years / tahun",
-    "19–23 years / tahun",
-    "24–28 years / tahun",
-    "13-18 years / tahun",
-    "19-23 years / tahun",
-    "24-28 years / tahun",
-]
-
-before_clean = len(df)
-df = df[df[AGE_COLUMN].isin(allowed_age_categories)]
-after_clean = len(df)
-
-df["Age_Group"] = df[AGE_COLUMN].astype("category")
+default_age_text = ", ".join(f"{low}-{high}" for low, high in restored.get("age_groups", AGE_GROUPS))
+age_groups_text = st.text_input(
+    t["age_groups_input"], default_age_text, help=t["age_groups_help"], disabled=snapshot is not None
+)
+age_groups = parse_age_groups(age_groups_text)
+if age_groups is None:
+    st.warning(t["age_groups_invalid"])
+    age_groups = AGE_GROUPS
+if snapshot is None:
+    # the age groups shape every cleaned frame, so they are part of the dataset key
+    data_key = data_key + (age_groups,)
+
+if snapshot is not None:
+    clean_result = cached("clean_age", data_key, lambda: snapshot["clean"])
+else:
+    clean_result = cached("clean_age", data_key, lambda: engine.clean_age(df, AGE_COLUMN, age_groups))
+df, before_clean, after_clean = clean_result
 
 st.success(t["data_clean_success"])
 st.write(t["data_clean_summary"])
@@ -933,66 +289,22 @@ st.dataframe(df.head(), use_container_width=True)
 
 # DEMOGRAPHIC SUMMARY TABLES
 age_counts = df["Age_Group"].value_counts().sort_index()
-age_demo_df = pd.DataFrame(
-    {
-        t["age_group"]: age_counts.index,
-        t["frequency"]: age_counts.values,
-    }
-)
-age_demo_df[t["percentage"]] = (
-    age_demo_df[t["frequency"]] / age_demo_df[t["frequency"]].sum() * 100
-).round(2)
+age_demo_df = demographic_table(age_counts, t["age_group"], t)
 
-GENDER_COLUMN = None
-for col in df.columns:
-    col_lower = str(col).lower()
-    if "gender" in col_lower or "jenis kelamin" in col_lower:
-        GENDER_COLUMN = col
-        break
+GENDER_COLUMN = find_column(df.columns, GENDER_KEYWORDS)
 
+gender_counts = None
 gender_demo_df = None
 if GENDER_COLUMN is not None:
     gender_counts = df[GENDER_COLUMN].value_counts().sort_index()
-    gender_demo_df = pd.DataFrame(
-        {
-            "Gender": gender_counts.index,
-            t["frequency"]: gender_counts.values,
-        }
-    )
-    gender_demo_df[t["percentage"]] = (
-        gender_demo_df[t["frequency"]] / gender_demo_df[t["frequency"]].sum() * 100
-    ).round(2)
+    gender_demo_df = demographic_table(gender_counts, "Gender", t)
 
 # 2. VARIABLE MAPPING
 fixed_x_all = list(FOMO_LABELS.keys())
 fixed_y_all = list(ADDICTION_LABELS.keys())
 
 # Try auto-rename based on phrases if X1..Y5 not present
-if not all(c in df.columns for c in fixed_x_all + fixed_y_all):
-    PHRASES = {
-        "X1": "anxious if i don't know the latest updates",
-        "X2": "urge to constantly check social media",
-        "X3": "afraid of being left behind when others talk about trending topics",
-        "X4": "need to follow viral trends to stay",
-        "X5": "uncomfortable when i see others participating in activities that i am not part of",
-        "Y1": "difficult to reduce the amount of time i spend on social media",
-        "Y2": "prefer using social media over doing offline activities",
-        "Y3": "disrupts my sleep, study time, or other important activities",
-        "Y4": "spend more time on social media than i originally planned",
-        "Y5": "open social media automatically without any clear purpose",
-    }
-
-    lower_cols = {c: str(c).lower() for c in df.columns}
-    renamed = {}
-
-    for code, phrase in PHRASES.items():
-        phrase_low = phrase.lower()
-        for col, col_low in lower_cols.items():
-            if phrase_low in col_low:
-                renamed[col] = code
-
-    if renamed:
-        df = df.rename(columns=renamed)
+df = cached("renamed", data_key, lambda: rename_item_columns(df))
 
 missing_x = [c for c in fixed_x_all if c not in df.columns]
 missing_y = [c for c in fixed_y_all if c not in df.columns]
@@ -1003,6 +315,57 @@ if missing_x or missing_y:
     st.write("Current headers:", list(df.columns))
     st.stop()
 
+# 2A. DATA QUALITY SCREENING
+st.subheader(t["screening_title"])
+st.caption(t["screening_caption"])
+TIMESTAMP_COLUMN = find_column(df.columns, TIMESTAMP_KEYWORDS)
+screen_labels = t["screen_rule_labels"]
+s1, s2 = st.columns(2)
+run_share = s1.slider(
+    t["screen_run_share"], 0.5, 1.0, float(restored.get("run_share", DEFAULT_RUN_SHARE)), 0.05
+)
+min_gap = s2.number_input(
+    t["screen_min_gap"],
+    min_value=0,
+    max_value=3600,
+    value=int(restored.get("min_gap", DEFAULT_MIN_GAP_SECONDS)),
+    disabled=TIMESTAMP_COLUMN is None,
+)
+if TIMESTAMP_COLUMN is None:
+    st.caption(t["screen_no_timestamp"])
+
+# flags are computed once per upload and threshold; the rule choice only filters
+screen_flags = cached(
+    "screening", data_key + (run_share, min_gap),
+    lambda: screen_responses(df, fixed_x_all + fixed_y_all, TIMESTAMP_COLUMN, run_share, min_gap),
+)
+screen_options = [r for r in SCREEN_RULES if r != "speeder" or TIMESTAMP_COLUMN is not None]
+screen_rules = st.multiselect(
+    t["screen_rules"],
+    screen_options,
+    default=[r for r in restored.get("screen_rules", []) if r in screen_options],
+    format_func=screen_labels.get,
+)
+screen_counts = screening_counts(screen_flags, screen_rules)
+st.dataframe(
+    screening_table(screen_counts, screen_options, screen_rules, t), hide_index=True, use_container_width=True
+)
+
+screen_key = (tuple(screen_rules), run_share, min_gap)
+before_screen = len(df)
+df = cached("screened", data_key + screen_key, lambda: df[~screening_mask(screen_flags, screen_rules)])
+after_screen = len(df)
+st.write(f"- {t['respondents_before_screen']} {before_screen}")
+st.write(f"- {t['respondents_after_screen']} {after_screen}")
+st.write(f"- {t['respondents_removed']} {before_screen - after_screen}")
+screening_summary = {
+    "counts": screen_counts,
+    "checks": screen_options,
+    "rules": screen_rules,
+    "before": before_screen,
+    "after": after_screen,
+}
+
 # 3. SELECT VARIABLES
 st.subheader(t["select_variables"])
 cA, cB = st.columns(2)
@@ -1011,7 +374,7 @@ with cA:
     x_items = st.multiselect(
         t["fomo_items"],
         options=fixed_x_all,
-        default=fixed_x_all,
+        default=restored.get("x_items", fixed_x_all),
         help=t["fomo_help"],
     )
     st.markdown(t["selected_fomo"])
@@ -1022,7 +385,7 @@ with cB:
     y_items = st.multiselect(
         t["addiction_items"],
         options=fixed_y_all,
-        default=fixed_y_all,
+        default=restored.get("y_items", fixed_y_all),
         help=t["addiction_help"],
     )
     st.markdown(t["selected_addiction"])
@@ -1033,26 +396,54 @@ if len(x_items) == 0 or len(y_items) == 0:
     st.warning(t["min_selection"])
     st.stop()
 
-for col in x_items + y_items:
-    df[col] = pd.to_numeric(df[col], errors="coerce")
-
 # 4. COMPOSITE SCORES
 st.subheader(t["composite_scores"])
+comp_options = {t["mean_items"]: "mean", t["sum_items"]: "sum", t["irt_items"]: "irt"}
 comp_method = st.radio(
     t["composite_method"],
-    [t["mean_items"], t["sum_items"]],
+    list(comp_options),
+    index=list(comp_options.values()).index(restored.get("comp_key", "mean")),
     horizontal=True,
 )
+comp_key = comp_options[comp_method]
+if comp_key == "irt" and (len(x_items) < 2 or len(y_items) < 2):
+    st.warning(t["irt_min_items"])
+    comp_key = "mean"
 
-if comp_method == t["mean_items"]:
-    df["X_total"] = df[x_items].mean(axis=1)
-    df["Y_total"] = df[y_items].mean(axis=1)
-else:
-    df["X_total"] = df[x_items].sum(axis=1)
-    df["Y_total"] = df[y_items].sum(axis=1)
+scored_key = data_key + (screen_key, tuple(x_items), tuple(y_items), comp_key)
+df = cached("scored", scored_key, lambda: engine.add_composite_scores(df, x_items, y_items, comp_key))
 
 st.success(t["composite_success"])
 
+if comp_key == "irt":
+    with st.expander(t["irt_title"]):
+        info_curves = {}
+        for scale, scale_items in (("X", x_items), ("Y", y_items)):
+            grm = fit_grm(df[scale_items])
+            st.markdown(f"**{scale}**")
+            st.dataframe(grm["item_table"], use_container_width=True)
+            st.caption(t["irt_caption"].format(grm["n_respondents"], grm["n_patterns"], grm["n_iter"]))
+            info_curves[scale] = test_information(grm)["Test information"]
+        fig_info = go.Figure()
+        for scale, curve in info_curves.items():
+            fig_info.add_trace(go.Scatter(x=curve.index, y=curve.values, mode="lines", name=scale))
+        fig_info.update_layout(xaxis_title="θ", yaxis_title=t["irt_info"], height=350)
+        st.plotly_chart(fig_info, use_container_width=True)
+
+with st.expander(t["export_clean"]):
+    export_fmt = st.selectbox(t["export_format"], ["parquet", "feather"], key="export_fmt")
+    if st.button(t["prepare_export"]):
+        export_cols = [AGE_COLUMN, "Age_Group"]
+        if GENDER_COLUMN is not None:
+            export_cols.append(GENDER_COLUMN)
+        export_cols += x_items + y_items + ["X_total", "Y_total"]
+        st.download_button(
+            label=t["download_clean"],
+            data=export_clean_dataset(df, export_cols, export_fmt),
+            file_name=f"cleaned_dataset.{export_fmt}",
+            mime="application/octet-stream",
+        )
+
 valid_xy = df[["X_total", "Y_total"]].dropna()
 n_valid = valid_xy.shape[0]
 mean_x = valid_xy["X_total"].mean()
@@ -1060,7 +451,10 @@ mean_y = valid_xy["Y_total"].mean()
 
 # NORMALITY
 st.subheader(t["normality_test"])
-result_norm, recommended_method, _ = compute_normality(valid_xy, t)
+# statistics are cached language-neutral; only the labels depend on selected_lang
+norm_results = cached("normality", scored_key, lambda: normality_test(valid_xy))
+result_norm = normality_table(norm_results, t)
+recommended_method = t[norm_results["recommended"]]
 st.write(t["result"])
 st.dataframe(result_norm, use_container_width=True)
 st.info(f"{t['recommended_method']} **{recommended_method}**")
@@ -1072,35 +466,89 @@ m3.metric(t["avg_addiction"], f"{mean_y:.2f}")
 
 # 6. ASSOCIATION METHOD
 st.subheader(t["association_analysis"])
+assoc_options = {t["pearson"]: "pearson", t["spearman"]: "spearman", t["chi_square"]: "chi-square"}
 assoc_method = st.radio(
     t["association_method"],
-    [t["pearson"], t["spearman"], t["chi_square"]],
-    index=0,
+    list(assoc_options),
+    index=list(assoc_options.values()).index(restored.get("assoc_key", "pearson")),
 )
+assoc_key = assoc_options[assoc_method]
 
+assoc_results = None
 assoc_stats = {}
 assoc_summary_text = ""
 
-if assoc_method in [t["pearson"], t["spearman"]]:
-    assoc_stats, assoc_summary_text = compute_correlation(
-        valid_xy, assoc_method, selected_lang, t
-    )
+if assoc_key in ("pearson", "spearman"):
+    assoc_results = cached("correlation", scored_key + (assoc_key,), lambda: correlation_test(valid_xy, assoc_key))
 else:
     st.markdown(t["chi_instruction"])
     cat_options = x_items + y_items
     chi_x_col = st.selectbox(t["categorical_x"], cat_options, key="chi_x")
     chi_y_col = st.selectbox(t["categorical_y"], cat_options, key="chi_y")
-    assoc_stats, assoc_summary_text = compute_chi_square(
-        df, chi_x_col, chi_y_col, selected_lang, t
+    sparse_options = {
+        t["sparse_auto"]: "auto",
+        t["sparse_mc"]: "monte-carlo",
+        t["sparse_asymptotic"]: "asymptotic",
+    }
+    sparse_choice = st.radio(
+        t["sparse_method"],
+        list(sparse_options),
+        index=list(sparse_options.values()).index(restored.get("sparse", "auto")),
+        horizontal=True,
+    )
+    sparse_key = sparse_options[sparse_choice]
+    assoc_results = cached(
+        "chi_square", scored_key + (chi_x_col, chi_y_col, sparse_key),
+        lambda: chi_square_test(df, chi_x_col, chi_y_col, sparse_method=sparse_key, seed=0, engine=engine),
     )
+assoc_stats, assoc_summary_text = describe_association(assoc_results, selected_lang)
+
+
+
+# descriptive tables are computed (and cached) only when a view needs them
+def get_desc_items():
+    return cached("desc_items", scored_key, lambda: describe_columns(df, x_items + y_items))
+
+
+def get_desc_comp():
+    return cached("desc_composite", scored_key, lambda: describe_columns(df, ["X_total", "Y_total"]))
 
-# TABS
-tab_desc, tab_vis, tab_assoc, tab_pdf = st.tabs(
-    [t["tab_desc"], t["tab_vis"], t["tab_assoc"], t["tab_pdf"]]
+
+def get_item_counts():
+    return cached("item_frequencies", scored_key, lambda: engine.item_frequencies(df, x_items + y_items))
+
+
+def get_density(score, group_column=None):
+    groups = None if group_column is None else df.loc[valid_xy.index, group_column]
+    return cached(
+        "density", scored_key + (score, group_column), lambda: group_densities(valid_xy[score], groups)
+    )
+
+
+def get_regression(interactions):
+    # the gender column is renamed so coefficients read Gender[…] whatever the form header was
+    covariates = ["Age_Group"] + (["Gender"] if GENDER_COLUMN is not None else [])
+    reg_data = df.rename(columns={GENDER_COLUMN: "Gender"}) if GENDER_COLUMN is not None else df
+    return cached(
+        "regression", scored_key + (GENDER_COLUMN, interactions),
+        lambda: fit_regression(reg_data, covariates=covariates, interactions=interactions),
+    )
+
+
+# VIEWS (only the selected one runs)
+view_labels = {"desc": t["tab_desc"], "vis": t["tab_vis"], "assoc": t["tab_assoc"], "pdf": t["tab_pdf"]}
+active_view = st.segmented_control(
+    t["active_view"],
+    list(view_labels),
+    default="desc",
+    required=True,
+    format_func=view_labels.get,
+    key="active_view",
+    label_visibility="collapsed",
 )
 
 # TAB DESCRIPTIVES
-with tab_desc:
+if active_view == "desc":
     st.markdown(t["demographic_summary"])
     col1, col2 = st.columns(2)
 
@@ -1116,186 +564,190 @@ with tab_desc:
             st.info(t["gender_not_detected"])
 
     st.markdown(t["desc_items"])
-    desc_items = descriptive_table(df, x_items + y_items, t)
+    desc_items = get_desc_items().rename_axis(t["variable"])
     st.dataframe(desc_items, use_container_width=True)
 
     st.markdown(t["desc_composite"])
-    desc_comp = descriptive_table(df, ["X_total", "Y_total"], t)
+    desc_comp = get_desc_comp().rename_axis(t["variable"])
     st.dataframe(desc_comp, use_container_width=True)
 
     st.markdown(t["freq_table"])
     st.caption(t["freq_caption"])
 
     all_items = x_items + y_items
+    item_counts = get_item_counts()
     cols_freq = st.columns(2)
     for idx, var_freq in enumerate(all_items):
         with cols_freq[idx % 2]:
             st.markdown(f"#### {t['result_for_item']} **{var_freq}**")
-            s_freq = df[var_freq].dropna()
-            freq = s_freq.value_counts().sort_index()
+            freq = item_counts[var_freq]
             if freq.empty:
                 st.write("No data.")
                 continue
-            perc = (freq / freq.sum() * 100).round(2)
-            freq_table = pd.DataFrame({t["frequency"]: freq, t["percentage"]: perc})
-
-            if freq_table.index.dtype in [int, float] and freq_table.index.max() <= 5:
-                labeled_index = freq_table.index.map(lambda x: RESPONSE_LABELS.get(x, x))
-                freq_table.index = labeled_index
+            freq_table = frequency_table(freq, t, RESPONSE_LABELS)
+            if not freq_table.index.equals(freq.index):
                 st.caption(t["likert_note"])
 
             st.dataframe(freq_table, use_container_width=True)
 
+    st.markdown(t["efa_title"])
+    if st.checkbox(t["efa_toggle"], key="efa", persist_state="page"):
+        e1, e2, e3, e4 = st.columns(4)
+        efa_corr = e1.selectbox(
+            t["efa_corr"], ["pearson", "polychoric"], key="efa_corr", persist_state="page"
+        )
+        efa_extraction = e2.selectbox(
+            t["efa_extraction"], ["minres", "ml"], key="efa_extraction", persist_state="page"
+        )
+        efa_rotation = e3.selectbox(
+            t["efa_rotation"], ["oblimin", "varimax", "none"], key="efa_rotation", persist_state="page"
+        )
+        efa_k = e4.number_input(
+            t["efa_n_factors"],
+            min_value=0,
+            max_value=max(1, len(all_items) - 1),
+            value=0,
+            key="efa_k",
+            persist_state="page",
+        )
+        if len(all_items) < 3:
+            st.warning(t["min_selection"])
+        else:
+            efa = cached(
+                "efa", scored_key + (tuple(all_items), efa_k, efa_corr, efa_extraction, efa_rotation),
+                lambda: run_efa(
+                    df,
+                    all_items,
+                    n_factors=efa_k or None,
+                    corr_method=efa_corr,
+                    extraction=efa_extraction,
+                    rotation=efa_rotation,
+                    seed=0,
+                ),
+            )
+            st.info(
+                t["efa_suggested"].format(
+                    efa["suggested_factors"], efa["suggested_components"], efa["n_factors"], efa["n_obs"]
+                )
+            )
+            st.markdown(t["efa_parallel"])
+            st.dataframe(efa["parallel"], use_container_width=True)
+            st.markdown(t["efa_loadings"])
+            st.dataframe(efa["loadings"], use_container_width=True)
+            st.markdown(t["efa_variance"])
+            st.dataframe(efa["variance"], use_container_width=True)
+            if efa["phi"] is not None:
+                st.markdown(t["efa_phi"])
+                st.dataframe(efa["phi"], use_container_width=True)
+
 # TAB VISUALIZATIONS
-with tab_vis:
+if active_view == "vis":
     st.markdown(t["visualizations"])
+    # figures are cached per data hash and language; reruns only send them
+    fig_key = scored_key + (selected_lang,)
+    all_items = x_items + y_items
 
     # Age distribution
     st.markdown(t["age_chart"])
-    fig_age = px.bar(
-        x=age_counts.index,
-        y=age_counts.values,
-        labels={"x": t["age_group"], "y": t["frequency"]},
-        title=t["age_chart"].replace("#### ", ""),
-        color=age_counts.values,
-        color_continuous_scale="Blues",
-    )
-    fig_age.update_layout(showlegend=False, height=400)
+    fig_age = cached("figure", data_key + ("age", selected_lang), lambda: age_bar_figure(age_counts, t))
     st.plotly_chart(fig_age, use_container_width=True)
 
     st.markdown("---")
 
     # Histograms X & Y
+    show_kde = st.checkbox(t["kde_overlay"], key="kde_overlay", persist_state="page")
     col1, col2 = st.columns(2)
     with col1:
         st.markdown(t["hist_x"])
-        fig_hist_x = px.histogram(
-            valid_xy,
-            x="X_total",
-            nbins=20,
-            labels={"X_total": t["x_total_score"]},
-            title=t["hist_x"].replace("#### ", ""),
+        fig_hist_x = cached(
+            "figure", fig_key + ("hist_x", show_kde),
+            lambda: score_histogram_figure(
+                valid_xy["X_total"], t["x_total_score"], t["hist_x"],
+                kde=get_density("X_total") if show_kde else None,
+            ),
         )
-        fig_hist_x.update_layout(showlegend=False, height=400)
         st.plotly_chart(fig_hist_x, use_container_width=True)
 
     with col2:
         st.markdown(t["hist_y"])
-        fig_hist_y = px.histogram(
-            valid_xy,
-            x="Y_total",
-            nbins=20,
-            labels={"Y_total": t["y_total_score"]},
-            title=t["hist_y"].replace("#### ", ""),
+        fig_hist_y = cached(
+            "figure", fig_key + ("hist_y", show_kde),
+            lambda: score_histogram_figure(
+                valid_xy["Y_total"], t["y_total_score"], t["hist_y"],
+                kde=get_density("Y_total") if show_kde else None,
+            ),
         )
-        fig_hist_y.update_layout(showlegend=False, height=400)
         st.plotly_chart(fig_hist_y, use_container_width=True)
 
     st.markdown("---")
 
     # Scatter with regression
     st.markdown(t["scatter"])
-    z = np.polyfit(valid_xy["X_total"], valid_xy["Y_total"], 1)
-    p_line = np.poly1d(z)
-    x_line = np.linspace(valid_xy["X_total"].min(), valid_xy["X_total"].max(), 100)
-    y_line = p_line(x_line)
-
-    fig_scatter = px.scatter(
-        valid_xy,
-        x="X_total",
-        y="Y_total",
-        labels={"X_total": t["x_total_score"], "Y_total": t["y_total_score"]},
-        title=t["scatter"].replace("#### ", ""),
-        color="X_total",
-        color_continuous_scale="Viridis",
-        opacity=0.8,
-    )
-    fig_scatter.add_trace(
-        go.Scatter(
-            x=x_line,
-            y=y_line,
-            mode="lines",
-            name=t["regression_line"],
-            line=dict(color="red", dash="dash", width=2),
-        )
-    )
-    fig_scatter.update_layout(height=500)
+    fig_scatter = cached("figure", fig_key + ("scatter",), lambda: scatter_regression_figure(valid_xy, t))
     st.plotly_chart(fig_scatter, use_container_width=True)
 
     st.markdown("---")
 
-    # Per-item bar charts
+    # Per-item bar charts (one faceted figure)
     st.markdown(t["item_charts"])
     st.caption(t["item_caption"])
-    all_items = x_items + y_items
-    cols_items = st.columns(2)
-
-    for idx, item_code in enumerate(all_items):
-        with cols_items[idx % 2]:
-            st.markdown(f"##### {t['item']} **{item_code}**")
-            if item_code in FOMO_LABELS:
-                st.caption(f"*{FOMO_LABELS[item_code]}*")
-            elif item_code in ADDICTION_LABELS:
-                st.caption(f"*{ADDICTION_LABELS[item_code]}*")
-
-            s_freq = df[item_code].dropna()
-            freq = s_freq.value_counts().sort_index()
-            if freq.empty:
-                st.write("No data.")
-                continue
-
-            fig_item = px.bar(
-                x=freq.index.astype(str),
-                y=freq.values,
-                labels={"x": item_code, "y": t["frequency"]},
-                title=f"{item_code}",
-            )
-            fig_item.update_layout(showlegend=False, height=300)
-            st.plotly_chart(fig_item, use_container_width=True)
+    fig_items = cached(
+        "figure", fig_key + ("items",),
+        lambda: item_bars_figure(get_item_counts(), t, {**FOMO_LABELS, **ADDICTION_LABELS}),
+    )
+    if fig_items is None:
+        st.write("No data.")
+    else:
+        st.plotly_chart(fig_items, use_container_width=True)
 
     st.markdown("---")
 
     # Stacked bar across items
     st.markdown(t["stacked_chart"])
     st.caption(t["stacked_caption"])
+    fig_stacked = cached(
+        "figure", fig_key + ("stacked",), lambda: stacked_items_figure(get_item_counts(), t, RESPONSE_LABELS)
+    )
+    st.plotly_chart(fig_stacked, use_container_width=True)
 
-    freq_data = df[all_items].apply(lambda x: x.value_counts(normalize=True)).T * 100
-    freq_data = freq_data.fillna(0).sort_index()
-
-    for i in range(1, 6):
-        if i not in freq_data.columns:
-            freq_data[i] = 0.0
-    freq_data = freq_data.sort_index(axis=1)
-
-    freq_data_reset = freq_data.reset_index()
-    freq_data_reset.columns = [t["survey_item"]] + [str(i) for i in range(1, 6)]
-
-    fig_stacked = go.Figure()
-    for score in range(1, 6):
-        col_name = str(score)
-        fig_stacked.add_trace(
-            go.Bar(
-                name=RESPONSE_LABELS[score],
-                x=freq_data_reset[t["survey_item"]],
-                y=freq_data_reset[col_name],
-                text=freq_data_reset[col_name].round(1),
-                textposition="inside",
-                hovertemplate="%{x}<br>%{y:.1f}%<extra></extra>",
-            )
-        )
+    st.markdown("---")
 
-    fig_stacked.update_layout(
-        barmode="stack",
-        title=t["stacked_chart"].replace("#### ", ""),
-        xaxis_title=t["survey_item"],
-        yaxis_title=t["percentage"],
-        height=500,
-        legend_title=t["response_score"],
+    # Violin / ridge plots by group (density curves only)
+    st.markdown(t["dist_title"])
+    st.caption(t["dist_caption"])
+    group_labels = {"Age_Group": t["age_group"]}
+    if GENDER_COLUMN is not None:
+        group_labels[GENDER_COLUMN] = "Gender"
+    score_labels = {"X_total": t["x_total_score"], "Y_total": t["y_total_score"]}
+    g1, g2, g3 = st.columns(3)
+    dist_score = g1.selectbox(
+        t["dist_score"], list(score_labels), format_func=score_labels.get, key="dist_score", persist_state="page"
     )
-    st.plotly_chart(fig_stacked, use_container_width=True)
+    dist_group = g2.selectbox(
+        t["dist_group"], list(group_labels), format_func=group_labels.get, key="dist_group", persist_state="page"
+    )
+    dist_kind = g3.segmented_control(
+        t["dist_kind"],
+        list(t["dist_kinds"]),
+        default="violin",
+        required=True,
+        format_func=t["dist_kinds"].get,
+        key="dist_kind",
+        persist_state="page",
+    )
+    fig_dist = cached(
+        "figure", fig_key + ("dist", dist_score, dist_group, dist_kind),
+        lambda: group_distribution_figure(
+            get_density(dist_score, dist_group),
+            score_labels[dist_score],
+            f"{score_labels[dist_score]} – {group_labels[dist_group]}",
+            dist_kind,
+        ),
+    )
+    st.plotly_chart(fig_dist, use_container_width=True)
 
 # TAB ASSOCIATION
-with tab_assoc:
+if active_view == "assoc":
     if not assoc_stats:
         st.warning(t["select_method"])
     else:
@@ -1357,17 +809,20 @@ with tab_assoc:
 
         elif assoc_stats["type"] == "chi-square":
             st.markdown(f"{t['chi_result']} {assoc_stats['x']} & {assoc_stats['y']}")
-            chi_data = pd.DataFrame(
-                {
-                    "Metric": [t["chi_value"], t["dof"], t["p_value"], t["significance"]],
-                    "Value": [
-                        f"{assoc_stats['chi2']:.3f}",
-                        assoc_stats["dof"],
-                        f"{assoc_stats['p']:.4f}",
-                        assoc_stats["signif_text"].capitalize(),
-                    ],
-                }
-            ).set_index("Metric")
+            if assoc_stats["sparse"]:
+                st.warning(t["sparse_warning"].format(assoc_stats["low_expected_pct"], assoc_stats["p_asymptotic"]))
+            chi_metrics = [t["test_method"], t["chi_value"], t["dof"], t["p_value"], t["significance"]]
+            chi_values = [
+                assoc_stats["method"],
+                f"{assoc_stats['chi2']:.3f}",
+                assoc_stats["dof"],
+                f"{assoc_stats['p']:.4f}",
+                assoc_stats["signif_text"].capitalize(),
+            ]
+            if assoc_stats["mc_se"] is not None:
+                chi_metrics.append(t["mc_error"])
+                chi_values.append(f"± {assoc_stats['mc_se']:.4f} (n = {assoc_stats['n_sim']})")
+            chi_data = pd.DataFrame({"Metric": chi_metrics, "Value": chi_values}).set_index("Metric")
             st.dataframe(chi_data, use_container_width=True)
 
             st.markdown(t["interpretation"])
@@ -1377,86 +832,216 @@ with tab_assoc:
             st.markdown(t["contingency"])
             st.dataframe(assoc_stats["contingency"], use_container_width=True)
 
+    st.markdown("---")
+    st.markdown(t["ordinal_assoc"])
+    ord_options = ["X_total", "Y_total"] + x_items + y_items
+    o1, o2 = st.columns(2)
+    ord_x_col = o1.selectbox(t["ordinal_x"], ord_options, index=0, key="ord_x", persist_state="page")
+    ord_y_col = o2.selectbox(t["ordinal_y"], ord_options, index=1, key="ord_y", persist_state="page")
+    ordinal_table, _ = cached(
+        "ordinal", scored_key + (ord_x_col, ord_y_col, selected_lang),
+        lambda: compute_ordinal_association(df, ord_x_col, ord_y_col, t),
+    )
+    st.dataframe(ordinal_table, use_container_width=True)
+    st.caption(t["ordinal_caption"])
+
+    st.markdown("---")
+    st.markdown(t["chi_matrix"])
+    if st.checkbox(t["chi_matrix_toggle"], key="chi_matrix", persist_state="page"):
+        chi_matrix_df, cramers_v_matrix = cached(
+            "chi_matrix", scored_key,
+            lambda: compute_chi_square_matrix(df, x_items + y_items, ["Age_Group", GENDER_COLUMN]),
+        )
+        if chi_matrix_df.empty:
+            st.write("No data.")
+        else:
+            st.caption(t["chi_matrix_caption"])
+            st.dataframe(chi_matrix_df, use_container_width=True)
+            fig_v = px.imshow(
+                cramers_v_matrix,
+                zmin=0,
+                zmax=1,
+                color_continuous_scale="Blues",
+                text_auto=".2f",
+                aspect="auto",
+                title="Cramér's V",
+            )
+            fig_v.update_layout(height=max(400, 22 * len(cramers_v_matrix)))
+            st.plotly_chart(fig_v, use_container_width=True)
+
+    st.markdown("---")
+    st.markdown(t["group_tests"])
+    if st.checkbox(t["group_tests_toggle"], key="group_tests", persist_state="page"):
+        group_correction = st.selectbox(
+            t["group_tests_correction"],
+            P_ADJUST_METHODS,
+            format_func=t["group_tests_corrections"].get,
+            key="group_correction",
+            persist_state="page",
+        )
+        group_tests = cached(
+            "group_tests", scored_key + (GENDER_COLUMN, group_correction),
+            lambda: compare_groups(
+                df, ["X_total", "Y_total"] + x_items + y_items, [GENDER_COLUMN, "Age_Group"], group_correction
+            ),
+        )
+        if group_tests["tests"].empty:
+            st.write("No data.")
+        else:
+            st.caption(t["group_tests_caption"])
+            st.dataframe(group_tests["tests"].round(4), use_container_width=True, hide_index=True)
+            if not group_tests["posthoc"].empty:
+                st.markdown(t["group_tests_posthoc"])
+                st.dataframe(group_tests["posthoc"].round(4), use_container_width=True, hide_index=True)
+            st.markdown(t["group_tests_groups"])
+            st.dataframe(group_tests["groups"].round(3), use_container_width=True, hide_index=True)
+
+    st.markdown("---")
+    st.markdown(t["reg_title"])
+    st.caption(t["reg_caption"])
+    reg_interactions = st.checkbox(t["reg_interactions"], key="reg_interactions", persist_state="page")
+    regression = get_regression(reg_interactions)
+    if regression is None:
+        st.warning(t["reg_unavailable"])
+    else:
+        reg_coefficients, reg_anova = regression_tables(regression, t)
+        st.write(regression_summary(regression, t))
+        st.caption(t["reg_reference"].format(
+            ", ".join(f"{k} = {v}" for k, v in regression["references"].items())
+        ))
+        if regression["aliased"]:
+            st.caption(t["reg_aliased"].format(", ".join(regression["aliased"])))
+        st.markdown(t["reg_coefficients"])
+        st.dataframe(reg_coefficients, use_container_width=True)
+        st.markdown(t["reg_anova"])
+        st.dataframe(reg_anova, use_container_width=True)
+
+    st.markdown("---")
+    st.markdown(t["power_title"])
+    st.caption(t["power_caption"])
+    p1, p2, p3, p4 = st.columns(4)
+    power_n_text = p1.text_input(
+        t["power_n_grid"], "50, 100, 150, 200, 300, 400", key="power_n_text", persist_state="page"
+    )
+    power_rho_text = p2.text_input(
+        t["power_rho_grid"], "0.1, 0.2, 0.3, 0.4", key="power_rho_text", persist_state="page"
+    )
+    power_reps = p3.number_input(
+        t["power_reps"],
+        min_value=100,
+        max_value=20000,
+        value=2000,
+        step=500,
+        key="power_reps",
+        persist_state="page",
+    )
+    power_target = p4.slider(t["power_target"], 0.5, 0.99, 0.8, key="power_target", persist_state="page")
+    if comp_key == "irt":
+        st.caption(t["power_irt_note"])
+    if st.button(t["power_run"]):
+        power_bar = st.progress(0.0)
+        try:
+            power_n_grid = [int(v) for v in power_n_text.split(",") if v.strip()]
+            power_rho_grid = [float(v) for v in power_rho_text.split(",") if v.strip()]
+            st.session_state["power_results"] = plan_power(
+                instrument_from_data(df, x_items, y_items),
+                n_grid=power_n_grid,
+                rho_grid=power_rho_grid,
+                n_reps=int(power_reps),
+                method="spearman" if assoc_method == t["spearman"] else "pearson",
+                composite="sum" if comp_key == "sum" else "mean",
+                progress=power_bar.progress,
+            )
+        except ValueError as e:
+            power_bar.empty()
+            st.error(str(e))
+    if "power_results" in st.session_state:
+        power_results = st.session_state["power_results"]
+        retention = after_screen / before_clean if before_clean else 1.0
+        st.markdown(t["power_required"].format(retention * 100))
+        st.dataframe(required_sample_size(power_results, power_target, retention), use_container_width=True)
+        fig_power = px.line(
+            power_results,
+            x="N",
+            y="Power",
+            color=power_results["rho"].astype(str),
+            markers=True,
+            labels={"color": "rho"},
+        )
+        fig_power.add_hline(y=power_target, line_dash="dash", line_color="red")
+        fig_power.update_layout(height=400)
+        st.plotly_chart(fig_power, use_container_width=True)
+        st.dataframe(power_results, use_container_width=True)
+
 # TAB PDF
-with tab_pdf:
+@st.fragment(run_every=1.0)
+def poll_pdf_jobs(job_ids):
+    """Progress of the background PDF jobs; reruns the app once all are done"""
+    jobs = [PDF_JOBS.get(job_id) for job_id in job_ids]
+    if all(job is None or job.done for job in jobs):
+        st.rerun()
+    for job in jobs:
+        if job is not None:
+            st.progress(job.progress, text=job.stage or t["pdf_queued"])
+
+
+if active_view == "pdf":
     st.markdown(t["pdf_export"])
-    pdf_filename = st.text_input(t["pdf_filename"], value="analysis_report")
+    pdf_filename = st.text_input(
+        t["pdf_filename"], value="analysis_report", key="pdf_filename", persist_state="page"
+    )
 
     st.markdown("---")
     st.write(t["select_content"])
-    include_items = st.checkbox(t["include_items"], value=True)
-    include_comp = st.checkbox(t["include_comp"], value=True)
-    include_corr = st.checkbox(t["include_corr"], value=True)
-    include_demo = st.checkbox(t["include_demo"], value=True)
-    include_normality = st.checkbox(t["include_normality"], value=True)
+    include_items = st.checkbox(t["include_items"], value=True, key="include_items", persist_state="page")
+    include_comp = st.checkbox(t["include_comp"], value=True, key="include_comp", persist_state="page")
+    include_corr = st.checkbox(t["include_corr"], value=True, key="include_corr", persist_state="page")
+    include_demo = st.checkbox(t["include_demo"], value=True, key="include_demo", persist_state="page")
+    include_normality = st.checkbox(
+        t["include_normality"], value=True, key="include_normality", persist_state="page"
+    )
     
     # Add a checkbox specifically for frequency tables
-    include_freq_tables = st.checkbox("Frequency Tables (for all X & Y items)", value=True)
+    include_freq_tables = st.checkbox(
+        "Frequency Tables (for all X & Y items)", value=True, key="include_freq_tables", persist_state="page"
+    )
 
     st.markdown("---")
     st.markdown(t["visualizations_pdf"])
-    include_freq_plot = st.checkbox(t["include_freq"], value=True)
-    include_stacked_plot = st.checkbox(t["include_stacked"], value=True)
-    include_hist_x_plot = st.checkbox(t["include_hist_x"], value=True)
-    include_hist_y_plot = st.checkbox(t["include_hist_y"], value=True)
-    include_scatter_plot = st.checkbox(t["include_scatter"], value=True)
-    include_age_plot = st.checkbox(t["include_age"], value=True)
-
-    if st.button(t["generate_pdf"]):
-        # Ensure all required data is available
-        if 'assoc_summary_text' not in locals() and 'assoc_summary_text' not in globals():
-            assoc_summary_text = ""  # Provide default if not set
-        
-        # Ensure age_counts is available
-        if age_counts is None or age_counts.empty:
-            age_counts = df["Age_Group"].value_counts().sort_index()
-            
-        # Ensure valid_xy is available
-        if valid_xy is None:
-            valid_xy = df[["X_total", "Y_total"]].dropna()
-            
-        # Ensure descriptive tables are available
-        desc_items = descriptive_table(df, x_items + y_items, t)
-        desc_comp = descriptive_table(df, ["X_total", "Y_total"], t)
-        
-        # Ensure result_norm is available
-        if valid_xy is not None and not valid_xy.empty:
-            result_norm, _, _ = compute_normality(valid_xy, t)
-        else:
-            result_norm = pd.DataFrame(columns=[t["variable"], t["statistic"], t["p_value"], t["normality"]])
+    include_freq_plot = st.checkbox(
+        t["include_freq"], value=True, key="include_freq_plot", persist_state="page"
+    )
+    include_stacked_plot = st.checkbox(
+        t["include_stacked"], value=True, key="include_stacked_plot", persist_state="page"
+    )
+    include_hist_x_plot = st.checkbox(
+        t["include_hist_x"], value=True, key="include_hist_x_plot", persist_state="page"
+    )
+    include_hist_y_plot = st.checkbox(
+        t["include_hist_y"], value=True, key="include_hist_y_plot", persist_state="page"
+    )
+    include_scatter_plot = st.checkbox(
+        t["include_scatter"], value=True, key="include_scatter_plot", persist_state="page"
+    )
+    include_age_plot = st.checkbox(t["include_age"], value=True, key="include_age_plot", persist_state="page")
+    include_quality = st.checkbox(t["include_quality"], value=True, key="include_quality", persist_state="page")
+    include_kde = st.checkbox(t["include_kde"], value=False, key="include_kde", persist_state="page")
+    include_violin = st.checkbox(t["include_violin"], value=False, key="include_violin", persist_state="page")
+    include_regression = st.checkbox(
+        t["include_regression"], value=True, key="include_regression", persist_state="page"
+    )
 
-        # Prepare gender demo dataframe if available
-        if GENDER_COLUMN is not None and GENDER_COLUMN in df.columns:
-            gender_counts = df[GENDER_COLUMN].value_counts().sort_index()
-            gender_demo_df = pd.DataFrame(
-                {
-                    "Gender": gender_counts.index,
-                    t["frequency"]: gender_counts.values,
-                }
-            )
-            gender_demo_df[t["percentage"]] = (
-                gender_demo_df[t["frequency"]] / gender_demo_df[t["frequency"]].sum() * 100
-            ).round(2)
-        else:
-            gender_demo_df = None
-
-        filename, pdf_bytes, err = generate_pdf_report(
-            selected_lang,
-            t,
-            pdf_filename,
-            before_clean,
-            after_clean,
-            age_demo_df,
-            gender_demo_df,
-            result_norm,
-            desc_items,
-            desc_comp,
-            assoc_summary_text,
-            age_counts,
-            df,
-            x_items,
-            y_items,
-            valid_xy,
+    report_langs = st.multiselect(
+        t["report_languages"],
+        options=list(LANGUAGES),
+        default=[selected_lang],
+        format_func=lambda x: "English" if x == "en" else "Indonesia",
+        key="report_langs",
+        persist_state="page",
+    )
+
+    if st.button(t["generate_pdf"]) and report_langs:
+        pdf_flags = (
             include_items,
             include_comp,
             include_corr,
@@ -1469,15 +1054,124 @@ with tab_pdf:
             include_scatter_plot,
             include_age_plot,
         )
-
+        norm_pdf = norm_results if not valid_xy.empty else None
+        st.session_state["pdf_jobs"] = []
+        desc_items_raw, desc_comp_raw = get_desc_items(), get_desc_comp()
+        reg_interactions = st.session_state.get("reg_interactions", False)
+        regression = get_regression(reg_interactions) if include_regression else None
+        for lang_code in report_langs:
+            # one report per language from the same neutral results; chart renders are shared
+            loc = localized_report_inputs(
+                lang_code, norm_pdf, assoc_results, age_counts, gender_counts, desc_items_raw, desc_comp_raw,
+                screening_summary if include_quality else None,
+                regression,
+            )
+            report_name = pdf_filename if len(report_langs) == 1 else f"{pdf_filename}_{lang_code}"
+            # identical requests (same data, options and file name) reuse the queued / finished job
+            pdf_job_key = scored_key + (
+                lang_code, report_name, loc["assoc_summary_text"], include_quality, include_regression, reg_interactions
+            ) + pdf_flags + (include_kde, include_violin)
+            st.session_state["pdf_jobs"].append(PDF_JOBS.submit(
+                pdf_job_key,
+                generate_pdf_report,
+                lang_code,
+                loc["t"],
+                report_name,
+                before_clean,
+                after_clean,
+                loc["age_demo_df"],
+                loc["gender_demo_df"],
+                loc["result_norm"],
+                loc["desc_items"],
+                loc["desc_comp"],
+                loc["assoc_summary_text"],
+                age_counts,
+                df,
+                x_items,
+                y_items,
+                valid_xy,
+                *pdf_flags,
+                quality=loc["quality"],
+                regression=loc["regression"],
+                kde=include_kde,
+                violin=include_violin,
+                age_groups=age_groups,
+            ))
+
+    pdf_jobs = [PDF_JOBS.get(job_id) for job_id in st.session_state.get("pdf_jobs", [])]
+    pdf_jobs = [job for job in pdf_jobs if job is not None]
+    if any(not job.done for job in pdf_jobs):
+        poll_pdf_jobs(tuple(job.id for job in pdf_jobs))
+    for pdf_job in pdf_jobs if all(job.done for job in pdf_jobs) else []:
+        filename, pdf_bytes, err = pdf_job.result or (None, None, pdf_job.error)
         if err is not None or pdf_bytes is None:
             st.error(t["pdf_error"].format(err))
         else:
             # Create download button
             st.download_button(
-                label=t["download_pdf"],
+                label=f"{t['download_pdf']} ({filename})",
                 data=pdf_bytes,
                 file_name=filename,
                 mime="application/pdf",
+                key=f"download_pdf_{pdf_job.id}",
             )
             st.success(t["pdf_success"].format(filename))
+    st.markdown("---")
+    st.markdown(t["xlsx_export"])
+    st.caption(t["xlsx_caption"])
+    if st.button(t["prepare_xlsx"]):
+        xlsx_sheets = {
+            "Demographics": [
+                (t["age_group"], age_demo_df),
+                ("Gender", gender_demo_df),
+            ],
+            "Item descriptives": [(None, get_desc_items().rename_axis(t["variable"]))],
+            "Composite descriptives": [(None, get_desc_comp().rename_axis(t["variable"]))],
+            "Frequencies": [
+                (item, frequency_table(counts, t, RESPONSE_LABELS)) for item, counts in get_item_counts().items()
+            ],
+            "Screening": [(None, screening_table(screen_counts, screen_options, screen_rules, t))],
+            "Normality": [(None, result_norm)],
+            "Association": [
+                (None, association_table(assoc_stats, assoc_summary_text)),
+                ("Contingency", assoc_stats.get("contingency")),
+            ],
+        }
+        xlsx_columns = [AGE_COLUMN, "Age_Group"] + ([GENDER_COLUMN] if GENDER_COLUMN is not None else [])
+        xlsx_columns += x_items + y_items + ["X_total", "Y_total"]
+        xlsx_buffer = export_analysis_xlsx(io.BytesIO(), xlsx_sheets, df, xlsx_columns)
+        st.download_button(
+            label=t["download_xlsx"],
+            data=xlsx_buffer.getvalue(),
+            file_name=f"{pdf_filename or 'analysis_report'}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+
+# SAVE SNAPSHOT
+with snapshot_box:
+    st.markdown("---")
+    snapshot_name = st.text_input(t["snapshot_name"], value=os.path.splitext(source_name)[0])
+    if st.button(t["snapshot_save"]):
+        snapshot_meta = {
+            "source": source_name,
+            "x_items": x_items,
+            "y_items": y_items,
+            "comp_key": comp_key,
+            "assoc_key": assoc_key,
+            "chi_x": st.session_state.get("chi_x"),
+            "chi_y": st.session_state.get("chi_y"),
+            "sparse": sparse_key if assoc_key == "chi-square" else "auto",
+            "screen_rules": screen_rules,
+            "run_share": run_share,
+            "min_gap": min_gap,
+            "age_groups": [list(g) for g in age_groups],
+        }
+        saved_path = save_snapshot(snapshot_name, data_key, snapshot_meta, clean_result)
+        st.success(t["snapshot_saved_to"].format(saved_path))
+        with open(saved_path, "rb") as f:
+            st.download_button(
+                t["snapshot_download"],
+                data=f.read(),
+                file_name=os.path.basename(saved_path),
+                mime="application/octet-stream",
+            )
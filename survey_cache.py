@@ -0,0 +1,166 @@
+"""Process-wide cache shared by every Streamlit session and the HTTP service.
+
+Identical uploads and derived results (keyed by the upload's content hash
+plus the parameters that produced them) are stored once per process with a
+global memory budget and LRU eviction. Cached values are shared read-only:
+callers must not modify them in place. Copy-on-Write is enabled, so pandas
+column assignments on frames derived from a cached frame never write back
+into it.
+"""
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+if int(pd.__version__.split(".")[0]) < 3:
+    # pandas >= 3 always uses Copy-on-Write
+    pd.set_option("mode.copy_on_write", True)
+
+DEFAULT_BUDGET_MB = float(os.environ.get("SURVEY_CACHE_MB", 512))
+
+
+def content_hash(data) -> str:
+    """SHA-256 of raw bytes or of a DataFrame's contents"""
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        hashed = pd.util.hash_pandas_object(data, index=True).to_numpy()
+        h = hashlib.sha256(hashed.tobytes())
+        labels = list(data.columns) if isinstance(data, pd.DataFrame) else [data.name]
+        h.update(repr(labels).encode("utf-8"))
+        return h.hexdigest()
+    return hashlib.sha256(data).hexdigest()
+
+
+def estimate_size(value, _seen=None) -> int:
+    """Approximate memory footprint of a cached value in bytes"""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(v, _seen) for v in value)
+    if hasattr(value, "to_plotly_json"):
+        # plotly figures: measure the underlying data / layout dicts
+        return estimate_size(value.to_plotly_json(), _seen)
+    return sys.getsizeof(value)
+
+
+class SharedCache:
+    """Thread-safe LRU cache with a global byte budget and hit/miss counters.
+
+    Concurrent requests for the same missing key compute it once; the other
+    callers wait for the result instead of duplicating the work.
+    """
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = int(budget_bytes)
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+                event = self._pending.get(key)
+                if event is None:
+                    event = self._pending[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # someone else is computing this key: wait, then re-check
+            event.wait()
+
+        try:
+            value = compute()
+            self.put(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            event.set()
+
+    def peek(self, key, default=None):
+        """Cached value for ``key`` or ``default``, without counting a hit or touching the LRU order"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return default if entry is None else entry[0]
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key, value) -> bool:
+        """Store ``value``; False if it is larger than the whole budget (not stored)"""
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            if size > self.budget_bytes:
+                return False
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.budget_bytes and self._entries:
+                _, (_, old_size) = self._entries.popitem(last=False)
+                self.bytes -= old_size
+                self.evictions += 1
+        return True
+
+    def discard(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry[1]
+
+    def entries(self, predicate):
+        """(key, value) pairs whose key satisfies ``predicate``"""
+        with self._lock:
+            return [(k, v) for k, (v, _) in self._entries.items() if predicate(k)]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+SHARED_CACHE = SharedCache(DEFAULT_BUDGET_MB * 1024 * 1024)
+
+
+def cached(namespace, key, compute):
+    """Shortcut for SHARED_CACHE.get_or_compute((namespace,) + key)"""
+    if not isinstance(key, tuple):
+        key = (key,)
+    return SHARED_CACHE.get_or_compute((namespace,) + key, compute)
@@ -0,0 +1,376 @@
+"""Exploratory factor analysis for the X1–X5 / Y1–Y5 items.
+
+Checks that the FOMO and addiction items load on two factors before the
+composite scores are reported. Provides Pearson or polychoric input,
+minres / maximum-likelihood extraction, varimax / oblimin rotation and
+Horn's parallel analysis for factor retention.
+"""
+import numpy as np
+import pandas as pd
+from scipy import optimize, stats
+
+from survey_cache import cached, content_hash
+
+# simulated matrix cells (p * p * iter) per batch in parallel analysis
+PARALLEL_BATCH_CELLS = 2_000_000
+
+_GL_NODES, _GL_WEIGHTS = np.polynomial.legendre.leggauss(24)
+
+
+# ------------------------------------------------------------------
+# CORRELATION INPUT
+# ------------------------------------------------------------------
+def _bivariate_normal_cdf(h, k, rho):
+    """Φ2(h, k; ρ) for arrays h, k (same shape) by Gauss–Legendre over ρ.
+
+    Uses Φ2 = Φ(h)Φ(k) + ∫0^ρ φ2(h, k; r) dr, vectorized over all points.
+    """
+    h = np.clip(h, -8.0, 8.0)
+    k = np.clip(k, -8.0, 8.0)
+    r = 0.5 * rho * (_GL_NODES + 1.0)
+    w = 0.5 * rho * _GL_WEIGHTS
+    hh = h[..., None]
+    kk = k[..., None]
+    one_minus = 1.0 - r ** 2
+    dens = np.exp(-(hh ** 2 - 2 * r * hh * kk + kk ** 2) / (2 * one_minus)) / (
+        2 * np.pi * np.sqrt(one_minus)
+    )
+    return stats.norm.cdf(h) * stats.norm.cdf(k) + (dens * w).sum(axis=-1)
+
+
+def _thresholds(codes, n_levels):
+    counts = np.bincount(codes, minlength=n_levels)
+    cum = np.cumsum(counts)[:-1] / counts.sum()
+    return np.concatenate([[-np.inf], stats.norm.ppf(cum), [np.inf]])
+
+
+def polychoric_pair(x, y):
+    """Two-step polychoric correlation of two ordinal vectors (no missing values)"""
+    x_codes, _ = pd.factorize(pd.Series(x), sort=True)
+    y_codes, _ = pd.factorize(pd.Series(y), sort=True)
+    rx, ry = x_codes.max() + 1, y_codes.max() + 1
+    if rx < 2 or ry < 2:
+        return np.nan
+    table = np.bincount(x_codes * ry + y_codes, minlength=rx * ry).reshape(rx, ry)
+    tx = _thresholds(x_codes, rx)
+    ty = _thresholds(y_codes, ry)
+    H, K = np.meshgrid(tx, ty, indexing="ij")
+
+    def neg_loglik(rho):
+        F = _bivariate_normal_cdf(H, K, rho)
+        probs = F[1:, 1:] - F[:-1, 1:] - F[1:, :-1] + F[:-1, :-1]
+        return -(table * np.log(np.clip(probs, 1e-300, None))).sum()
+
+    res = optimize.minimize_scalar(neg_loglik, bounds=(-0.995, 0.995), method="bounded")
+    return float(res.x)
+
+
+def polychoric_matrix(data: pd.DataFrame):
+    """Pairwise polychoric correlation matrix (pairwise-complete rows)"""
+    cols = list(data.columns)
+    R = np.eye(len(cols))
+    values = data.to_numpy(dtype=float)
+    for i in range(len(cols)):
+        for j in range(i + 1, len(cols)):
+            mask = ~np.isnan(values[:, i]) & ~np.isnan(values[:, j])
+            R[i, j] = R[j, i] = polychoric_pair(values[mask, i], values[mask, j])
+    return nearest_positive_definite(R)
+
+
+def nearest_positive_definite(R, eps=1e-6):
+    """Clip negative eigenvalues and rescale to a unit diagonal"""
+    vals, vecs = np.linalg.eigh(R)
+    if vals.min() > eps:
+        return R
+    vals = np.clip(vals, eps, None)
+    fixed = vecs @ np.diag(vals) @ vecs.T
+    d = np.sqrt(np.diag(fixed))
+    return fixed / np.outer(d, d)
+
+
+def item_correlation(df: pd.DataFrame, items, method="pearson"):
+    """Item correlation matrix, cached by data content, items and method"""
+    data = df[list(items)].apply(pd.to_numeric, errors="coerce")
+
+    def compute():
+        if method == "polychoric":
+            R = polychoric_matrix(data)
+        else:
+            R = nearest_positive_definite(data.corr(method="pearson").to_numpy())
+        return pd.DataFrame(R, index=list(items), columns=list(items))
+
+    return cached("item_correlation", (content_hash(data), tuple(items), method), compute)
+
+
+# ------------------------------------------------------------------
+# EXTRACTION
+# ------------------------------------------------------------------
+def _smc(R):
+    """Squared multiple correlations (initial communalities)"""
+    return 1.0 - 1.0 / np.diag(np.linalg.inv(R))
+
+
+def _loadings_from_psi(R, psi, n_factors):
+    Rs = R.copy()
+    np.fill_diagonal(Rs, 1.0 - psi)
+    vals, vecs = np.linalg.eigh(Rs)
+    idx = np.argsort(vals)[::-1][:n_factors]
+    return vecs[:, idx] * np.sqrt(np.clip(vals[idx], 0, None))
+
+
+def _minres_objective(psi, R, n_factors):
+    L = _loadings_from_psi(R, psi, n_factors)
+    resid = R - L @ L.T
+    np.fill_diagonal(resid, 0.0)
+    return 0.5 * (resid ** 2).sum()
+
+
+def _ml_objective(psi, R, n_factors):
+    sc = 1.0 / np.sqrt(psi)
+    vals = np.linalg.eigvalsh(R * np.outer(sc, sc))[::-1]
+    e = vals[n_factors:]
+    return -np.sum(np.log(e) - e) - n_factors + R.shape[0]
+
+
+def _ml_loadings(R, psi, n_factors):
+    sc = 1.0 / np.sqrt(psi)
+    vals, vecs = np.linalg.eigh(R * np.outer(sc, sc))
+    idx = np.argsort(vals)[::-1][:n_factors]
+    L = vecs[:, idx] * np.sqrt(np.clip(vals[idx] - 1.0, 0, None))
+    return L * np.sqrt(psi)[:, None]
+
+
+def extract_factors(R, n_factors, method="minres"):
+    """Unrotated loadings by minres (ULS) or maximum likelihood"""
+    R = np.asarray(R, dtype=float)
+    start = np.clip(1.0 - _smc(R), 0.005, 0.995)
+    bounds = [(0.005, 1.0)] * R.shape[0]
+    objective = _ml_objective if method == "ml" else _minres_objective
+    res = optimize.minimize(objective, start, args=(R, n_factors), method="L-BFGS-B", bounds=bounds)
+    psi = res.x
+    if method == "ml":
+        return _ml_loadings(R, psi, n_factors)
+    return _loadings_from_psi(R, psi, n_factors)
+
+
+# ------------------------------------------------------------------
+# ROTATION
+# ------------------------------------------------------------------
+def varimax(L, max_iter=500, tol=1e-8):
+    """Kaiser-normalized varimax rotation. Returns (rotated, rotation matrix)"""
+    p, k = L.shape
+    if k < 2:
+        return L, np.eye(k)
+    h = np.sqrt((L ** 2).sum(axis=1))
+    h[h == 0] = 1.0
+    A = L / h[:, None]
+    T = np.eye(k)
+    d_old = 0.0
+    for _ in range(max_iter):
+        B = A @ T
+        u, s, vt = np.linalg.svd(A.T @ (B ** 3 - B @ np.diag((B ** 2).sum(axis=0)) / p))
+        T = u @ vt
+        d = s.sum()
+        if d_old and d / d_old < 1 + tol:
+            break
+        d_old = d
+    return (A @ T) * h[:, None], T
+
+
+def _oblimin_criterion(L, gamma=0.0):
+    p, k = L.shape
+    L2 = L ** 2
+    N = np.ones((k, k)) - np.eye(k)
+    X = L2 if gamma == 0 else (np.eye(p) - gamma * np.ones((p, p)) / p) @ L2
+    XN = X @ N
+    return (L2 * XN).sum() / 4.0, L * XN
+
+
+def oblimin(L, gamma=0.0, max_iter=1000, tol=1e-6):
+    """Direct oblimin (quartimin for gamma=0) by gradient projection.
+
+    Returns (pattern loadings, factor correlation matrix Phi).
+    """
+    p, k = L.shape
+    if k < 2:
+        return L, np.eye(k)
+    T = np.eye(k)
+    al = 1.0
+    Lr = L @ np.linalg.inv(T).T
+    f, Gq = _oblimin_criterion(Lr, gamma)
+    G = -(Lr.T @ Gq @ np.linalg.inv(T)).T
+    for _ in range(max_iter):
+        Gp = G - T @ np.diag((T * G).sum(axis=0))
+        if np.sqrt((Gp ** 2).sum()) < tol:
+            break
+        al *= 2
+        for _ in range(12):
+            X = T - al * Gp
+            Tt = X / np.sqrt((X ** 2).sum(axis=0))
+            Lt = L @ np.linalg.inv(Tt).T
+            ft, Gqt = _oblimin_criterion(Lt, gamma)
+            if ft < f - 0.5 * (Gp ** 2).sum() * al:
+                break
+            al /= 2
+        T, f, Lr = Tt, ft, Lt
+        G = -(Lr.T @ Gqt @ np.linalg.inv(T)).T
+    return Lr, T.T @ T
+
+
+# ------------------------------------------------------------------
+# PARALLEL ANALYSIS
+# ------------------------------------------------------------------
+def _random_eigenvalues(n_obs, n_vars, n_iter, seed):
+    """Eigenvalues of full and SMC-reduced correlation matrices of random normal data.
+
+    The scatter matrix of n_obs centered standard normal rows is
+    Wishart(n_obs - 1, I), so it is drawn directly by the Bartlett
+    decomposition and the cost does not grow with n_obs. Samples too small
+    for that (n_obs - 1 < n_vars) are simulated from the data themselves.
+    """
+    rng = np.random.default_rng(seed)
+    batch = max(1, PARALLEL_BATCH_CELLS // (n_vars * n_vars))
+    idx = np.arange(n_vars)
+    dof = n_obs - 1 - np.arange(n_vars)
+    lower = np.tril_indices(n_vars, -1)
+    full, reduced = [], []
+    done = 0
+    while done < n_iter:
+        b = min(batch, n_iter - done)
+        if dof[-1] > 0:
+            A = np.zeros((b, n_vars, n_vars))
+            A[:, lower[0], lower[1]] = rng.standard_normal((b, len(lower[0])))
+            A[:, idx, idx] = np.sqrt(rng.chisquare(dof, size=(b, n_vars)))
+            W = A @ A.transpose(0, 2, 1)
+        else:
+            Z = rng.standard_normal((b, n_obs, n_vars))
+            Z -= Z.mean(axis=1, keepdims=True)
+            W = np.einsum("bni,bnj->bij", Z, Z)
+        scale = 1.0 / np.sqrt(np.diagonal(W, axis1=1, axis2=2))
+        R = W * scale[:, :, None] * scale[:, None, :]
+        full.append(np.linalg.eigvalsh(R)[:, ::-1])
+        smc = 1.0 - 1.0 / np.diagonal(np.linalg.inv(R), axis1=1, axis2=2)
+        R[:, idx, idx] = smc
+        reduced.append(np.linalg.eigvalsh(R)[:, ::-1])
+        done += b
+    return np.concatenate(full), np.concatenate(reduced)
+
+
+def random_eigenvalue_quantiles(n_obs, n_vars, n_iter=2000, quantile=95, seed=None):
+    """Simulated eigenvalue quantiles (PC, FA); cached when ``seed`` is fixed"""
+
+    def compute():
+        sim_full, sim_reduced = _random_eigenvalues(n_obs, n_vars, n_iter, seed)
+        return np.percentile(sim_full, quantile, axis=0), np.percentile(sim_reduced, quantile, axis=0)
+
+    if seed is None:
+        return compute()
+    return cached("parallel_analysis", (n_obs, n_vars, n_iter, quantile, seed), compute)
+
+
+def parallel_analysis(R, n_obs, n_iter=2000, quantile=95, seed=None):
+    """Horn's parallel analysis against random normal data of the same size.
+
+    Simulated correlation matrices are drawn from a Wishart distribution in
+    batched calls (see _random_eigenvalues()), and the simulated quantiles
+    depend only on the sizes and the seed, so they are shared through the
+    cache. Returns (table, n_factors, n_components): retention stops at the
+    first observed eigenvalue not above the simulated quantile.
+    """
+    R = np.asarray(R, dtype=float)
+    n_vars = R.shape[0]
+    obs_full = np.linalg.eigvalsh(R)[::-1]
+    reduced = R.copy()
+    np.fill_diagonal(reduced, _smc(R))
+    obs_reduced = np.linalg.eigvalsh(reduced)[::-1]
+
+    q_full, q_reduced = random_eigenvalue_quantiles(n_obs, n_vars, n_iter, quantile, seed)
+
+    def _retained(observed, threshold):
+        above = observed > threshold
+        return int(np.argmin(above)) if not above.all() else len(above)
+
+    table = pd.DataFrame(
+        {
+            "Observed (PC)": obs_full,
+            f"Random P{quantile} (PC)": q_full,
+            "Observed (FA)": obs_reduced,
+            f"Random P{quantile} (FA)": q_reduced,
+        },
+        index=pd.RangeIndex(1, n_vars + 1, name="Factor"),
+    ).round(3)
+    return table, max(1, _retained(obs_reduced, q_reduced)), _retained(obs_full, q_full)
+
+
+# ------------------------------------------------------------------
+# EFA
+# ------------------------------------------------------------------
+def run_efa(
+    df: pd.DataFrame,
+    items,
+    n_factors=None,
+    corr_method="pearson",
+    extraction="minres",
+    rotation="oblimin",
+    n_iter=2000,
+    seed=None,
+):
+    """Exploratory factor analysis of the selected items.
+
+    ``n_factors=None`` uses the parallel-analysis suggestion. Returns a dict
+    with the loadings, communalities, variance table, factor correlations
+    (oblimin only) and the parallel-analysis table.
+    """
+    items = list(items)
+    data = df[items].apply(pd.to_numeric, errors="coerce").dropna()
+    R = item_correlation(data, items, corr_method)
+    pa_table, pa_factors, pa_components = parallel_analysis(
+        R.to_numpy(), len(data), n_iter=n_iter, seed=seed
+    )
+    k = int(n_factors or pa_factors)
+    k = max(1, min(k, len(items) - 1))
+
+    L = extract_factors(R.to_numpy(), k, extraction)
+    phi = np.eye(k)
+    if rotation == "varimax":
+        L, _ = varimax(L)
+    elif rotation == "oblimin":
+        L, phi = oblimin(L)
+
+    # orient each factor so most loadings are positive, then sort by variance
+    signs = np.sign(L.sum(axis=0))
+    signs[signs == 0] = 1
+    L = L * signs
+    phi = phi * np.outer(signs, signs)
+    order = np.argsort(-(L ** 2).sum(axis=0))
+    L = L[:, order]
+    phi = phi[np.ix_(order, order)]
+
+    names = [f"F{i + 1}" for i in range(k)]
+    loadings = pd.DataFrame(L, index=items, columns=names)
+    structure = L @ phi
+    communalities = (L * structure).sum(axis=1)
+    loadings["h²"] = communalities
+    loadings["u²"] = 1 - communalities
+
+    ss = (L ** 2).sum(axis=0)
+    variance = pd.DataFrame(
+        {
+            "SS loadings": ss,
+            "Proportion var": ss / len(items),
+            "Cumulative var": np.cumsum(ss) / len(items),
+        },
+        index=names,
+    )
+
+    return {
+        "n_obs": len(data),
+        "n_factors": k,
+        "suggested_factors": pa_factors,
+        "suggested_components": pa_components,
+        "correlation": R.round(3),
+        "loadings": loadings.round(3),
+        "variance": variance.round(3),
+        "phi": pd.DataFrame(phi, index=names, columns=names).round(3) if rotation == "oblimin" else None,
+        "parallel": pa_table,
+    }
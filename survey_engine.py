@@ -0,0 +1,509 @@
+"""Pluggable dataframe engines for ingest, cleaning, scoring and counting.
+
+pandas is the reference engine and always available. When installed,
+Polars (lazy, multi-threaded) and DuckDB (vectorized SQL over the pandas
+frame, no copy in) run the same steps on all cores. Every engine takes and
+returns pandas objects with the reference layout (index, column order,
+value-count and crosstab shapes), so the statistics, cache keys and UI do
+not depend on the engine; check_parity() compares an engine against pandas
+on a real upload.
+
+The default engine comes from the ``SURVEY_ENGINE`` environment variable
+("pandas", "polars" or "duckdb"); an engine that is not installed falls
+back to pandas with a warning.
+"""
+import importlib.util
+import os
+import shutil
+import tempfile
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from survey_helpers import (
+    AGE_GROUPS,
+    AGE_NUMBER,
+    AGE_OPEN_ENDED,
+    add_composite_scores,
+    age_group_frame,
+    clean_age,
+    item_frequencies,
+)
+from survey_irt import fit_grm
+
+ENGINE_NAMES = ("pandas", "polars", "duckdb")
+DEFAULT_ENGINE = os.environ.get("SURVEY_ENGINE", "pandas")
+# text answers that pd.to_numeric() turns into int64 (when a whole column matches)
+INTEGER_TEXT = r"^[+-]?[0-9]+$"
+
+
+class EngineError(Exception):
+    """Unknown engine name"""
+
+
+# ------------------------------------------------------------------
+# PANDAS (REFERENCE)
+# ------------------------------------------------------------------
+class PandasEngine:
+    """Reference implementation: the survey_helpers pandas functions"""
+
+    name = "pandas"
+
+    def read_csv(self, file_obj) -> pd.DataFrame:
+        return pd.read_csv(file_obj)
+
+    def clean_age(self, df: pd.DataFrame, age_column, groups=AGE_GROUPS):
+        return clean_age(df, age_column, groups)
+
+    def add_composite_scores(self, df: pd.DataFrame, x_items, y_items, method: str = "mean"):
+        return add_composite_scores(df, x_items, y_items, method)
+
+    def item_frequencies(self, df: pd.DataFrame, items):
+        return item_frequencies(df, items)
+
+    def crosstab(self, df: pd.DataFrame, x_col, y_col) -> pd.DataFrame:
+        mask = df[x_col].notna() & df[y_col].notna()
+        return pd.crosstab(df.loc[mask, x_col], df.loc[mask, y_col])
+
+
+def _with_scores(df: pd.DataFrame, items, numeric: dict, x_total, y_total):
+    """Copy of ``df`` with numeric item columns and X_total / Y_total appended"""
+    df = df.copy()
+    for col in items:
+        df[col] = numeric[col]
+    df["X_total"] = x_total
+    df["Y_total"] = y_total
+    return df
+
+
+def _counts_series(values, counts, item):
+    """value_counts()-shaped Series sorted by response value"""
+    return pd.Series(
+        np.asarray(counts, dtype="int64"),
+        index=pd.Index(values, name=item),
+        name="count",
+    ).sort_index()
+
+
+def _pivot_pairs(pairs: pd.DataFrame, x_col, y_col) -> pd.DataFrame:
+    """(x, y, n) rows -> pd.crosstab()-shaped table"""
+    table = pairs.pivot(index="x", columns="y", values="n").fillna(0).astype("int64")
+    table = table.sort_index().sort_index(axis=1)
+    table.index.name = x_col
+    table.columns.name = y_col
+    return table
+
+
+# ------------------------------------------------------------------
+# POLARS
+# ------------------------------------------------------------------
+class PolarsEngine:
+    """Lazy Polars queries; only the columns a step needs are converted"""
+
+    name = "polars"
+
+    def __init__(self):
+        import polars as pl
+
+        self.pl = pl
+
+    def _frame(self, df: pd.DataFrame, columns):
+        pl = self.pl
+        data = {}
+        for col in columns:
+            s = df[col]
+            if s.dtype == object:
+                # mixed text / numbers from Excel: compare as text
+                s = s.astype("string")
+            data[str(col)] = s
+        return pl.from_pandas(pd.DataFrame(data, copy=False)).lazy()
+
+    def _numeric(self, col, dtype):
+        pl = self.pl
+        if dtype.is_numeric():
+            return pl.col(col)
+        return pl.col(col).cast(pl.String).str.strip_chars().cast(pl.Float64, strict=False)
+
+    def read_csv(self, file_obj) -> pd.DataFrame:
+        return self.pl.read_csv(file_obj, infer_schema_length=10_000).to_pandas()
+
+    def _age_bin(self, value, groups):
+        """Group index of a numeric age (-1 outside every group)"""
+        pl = self.pl
+        code = pl.lit(-1)
+        for k, (low, high) in reversed(list(enumerate(groups))):
+            code = pl.when((value >= low) & (value < high + 1)).then(pl.lit(k)).otherwise(code)
+        return code
+
+    def _age_range(self, first, last, groups):
+        """Group index of an age range label "first–last" (-1 if it spans groups)"""
+        pl = self.pl
+        code = pl.lit(-1)
+        for k, (low, high) in reversed(list(enumerate(groups))):
+            code = pl.when((first >= low) & (last <= high)).then(pl.lit(k)).otherwise(code)
+        return code
+
+    def clean_age(self, df: pd.DataFrame, age_column, groups=AGE_GROUPS):
+        # same rules as survey_helpers.age_group_codes(): numeric ages are binned,
+        # labels are read as one age or a low–high range, open-ended labels dropped
+        # labels are classified once per distinct value and joined back to the rows
+        pl = self.pl
+        lf = self._frame(df, [age_column])
+        col = str(age_column)
+        dtype = lf.collect_schema()[col]
+        text = pl.col(col).cast(pl.String).str.strip_chars().str.to_lowercase()
+        number = pl.col(col).cast(pl.Float64) if dtype.is_numeric() else text.cast(pl.Float64, strict=False)
+        found = (
+            text.str.extract_all(AGE_NUMBER.pattern)
+            .list.eval(pl.element().str.replace(",", ".", literal=True).cast(pl.Float64))
+            .list.sort()
+        )
+        open_ended = pl.any_horizontal([text.str.contains(word, literal=True) for word in AGE_OPEN_ENDED])
+        code = (
+            pl.when(number.is_not_null()).then(self._age_bin(number, groups))
+            .when(open_ended).then(pl.lit(-1))
+            .when(found.list.len() == 1).then(self._age_bin(found.list.first(), groups))
+            .when(found.list.len() == 2).then(self._age_range(found.list.first(), found.list.last(), groups))
+            .otherwise(pl.lit(-1))
+        )
+        coded = lf.select(col).unique().select(col, code.alias("code")).filter(pl.col("code") >= 0)
+        kept = (
+            lf.with_row_index("__row")
+            .join(coded, on=col, how="inner", maintain_order="left")
+            .select("__row", "code")
+            .collect()
+        )
+        return age_group_frame(df, kept["__row"].to_numpy(), kept["code"].to_numpy(), groups)
+
+    def add_composite_scores(self, df: pd.DataFrame, x_items, y_items, method: str = "mean"):
+        pl = self.pl
+        items = list(x_items) + list(y_items)
+        lf = self._frame(df, items)
+        schema = lf.collect_schema()
+        # text columns of whole numbers come back as int64, like pd.to_numeric()
+        text_items = [col for col in items if not schema[col].is_numeric()]
+        integer_items = set()
+        if text_items:
+            whole = lf.select([
+                pl.col(col).cast(pl.String).str.strip_chars().str.contains(INTEGER_TEXT).fill_null(False).all()
+                for col in text_items
+            ]).collect().row(0)
+            integer_items = {col for col, ok in zip(text_items, whole) if ok}
+        lf = lf.with_columns([self._numeric(col, schema[col]) for col in items])
+        if method == "irt":
+            numeric = lf.collect()
+            frame = numeric.to_pandas()
+            frame.index = df.index
+            x_total = fit_grm(frame[list(x_items)])["scores"]
+            y_total = fit_grm(frame[list(y_items)])["scores"]
+        else:
+            horizontal = pl.mean_horizontal if method == "mean" else pl.sum_horizontal
+            numeric = lf.with_columns(
+                horizontal(list(x_items)).alias("X_total"),
+                horizontal(list(y_items)).alias("Y_total"),
+            ).collect()
+            x_total = numeric["X_total"].to_numpy()
+            y_total = numeric["Y_total"].to_numpy()
+        values = {
+            col: (numeric[col].cast(pl.Int64) if col in integer_items else numeric[col]).to_numpy()
+            for col in items
+        }
+        return _with_scores(df, items, values, x_total, y_total)
+
+    def item_frequencies(self, df: pd.DataFrame, items):
+        pl = self.pl
+        items = [item for item in items if item in df.columns]
+        lf = self._frame(df, items)
+        # one group-by per item, all collected in parallel
+        queries = [
+            lf.select(item).drop_nulls().group_by(item).agg(pl.len().alias("n"))
+            for item in items
+        ]
+        results = pl.collect_all(queries)
+        return {
+            item: _counts_series(res[item].to_numpy(), res["n"].to_numpy(), item)
+            for item, res in zip(items, results)
+        }
+
+    def crosstab(self, df: pd.DataFrame, x_col, y_col) -> pd.DataFrame:
+        pl = self.pl
+        pairs = (
+            self._frame(df, [x_col, y_col] if x_col != y_col else [x_col])
+            .select(pl.col(str(x_col)).alias("x"), pl.col(str(y_col)).alias("y"))
+            .drop_nulls()
+            .group_by(["x", "y"])
+            .agg(pl.len().alias("n"))
+            .collect()
+            .to_pandas()
+        )
+        return _pivot_pairs(pairs, x_col, y_col)
+
+
+# ------------------------------------------------------------------
+# DUCKDB
+# ------------------------------------------------------------------
+def _quote(name) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class DuckDBEngine:
+    """SQL over the pandas frame (scanned in place, multi-threaded)"""
+
+    name = "duckdb"
+
+    def __init__(self):
+        import duckdb
+
+        self.duckdb = duckdb
+
+    def _query(self, df: pd.DataFrame, columns, sql: str, params=None) -> pd.DataFrame:
+        frame = df[list(columns)]
+        frame.columns = [str(c) for c in frame.columns]
+        with self.duckdb.connect() as con:
+            con.register("frame", frame)
+            return con.execute(sql, params or []).df()
+
+    def _numeric(self, df: pd.DataFrame, col) -> str:
+        if pd.api.types.is_numeric_dtype(df[col].dtype):
+            return _quote(col)
+        return f"TRY_CAST(TRIM(CAST({_quote(col)} AS VARCHAR)) AS DOUBLE)"
+
+    def read_csv(self, file_obj) -> pd.DataFrame:
+        # DuckDB's parallel CSV reader works on files, not in-memory buffers
+        with tempfile.NamedTemporaryFile(suffix=".csv") as tmp:
+            shutil.copyfileobj(file_obj, tmp)
+            tmp.flush()
+            with self.duckdb.connect() as con:
+                # no date sniffing: text columns stay text as with pd.read_csv
+                return con.execute(
+                    "SELECT * FROM read_csv(?, auto_type_candidates=['BOOLEAN', 'BIGINT', 'DOUBLE', 'VARCHAR'])",
+                    [tmp.name],
+                ).df()
+
+    def clean_age(self, df: pd.DataFrame, age_column, groups=AGE_GROUPS):
+        # same rules as survey_helpers.age_group_codes(), see PolarsEngine.clean_age()
+        import pyarrow as pa
+
+        age = df[age_column]
+        if age.dtype == object:
+            # mixed text / numbers from Excel: compare as text
+            age = age.astype("string")
+        # an Arrow table is scanned without converting strings back to Python objects
+        frame = pa.table({"age": pa.array(age.array, from_pandas=True), "pos": np.arange(len(df))})
+        if pd.api.types.is_numeric_dtype(age.dtype):
+            number = "CAST(age AS DOUBLE)"
+        else:
+            number = "TRY_CAST(trim(CAST(age AS VARCHAR)) AS DOUBLE)"
+
+        def age_bin(value):
+            cases = " ".join(
+                f"WHEN {value} >= {low} AND {value} < {high + 1} THEN {k}" for k, (low, high) in enumerate(groups)
+            )
+            return f"CASE {cases} ELSE -1 END"
+
+        ranges = " ".join(
+            f"WHEN found[1] >= {low} AND found[2] <= {high} THEN {k}" for k, (low, high) in enumerate(groups)
+        )
+        open_ended = " OR ".join(
+            "contains(label, '" + word.replace("'", "''") + "')" for word in AGE_OPEN_ENDED
+        )
+        # labels are classified once per distinct value and joined back to the rows
+        sql = f"""
+            WITH ages AS (
+                SELECT age, {number} AS number, label,
+                    list_sort(list_transform(
+                        regexp_extract_all(label, '{AGE_NUMBER.pattern}'),
+                        x -> CAST(replace(x, ',', '.') AS DOUBLE)
+                    )) AS found
+                FROM (
+                    SELECT age, lower(trim(CAST(age AS VARCHAR))) AS label
+                    FROM (SELECT DISTINCT age FROM frame)
+                )
+            ),
+            coded AS (
+                SELECT age, CASE
+                    WHEN number IS NOT NULL THEN {age_bin("number")}
+                    WHEN {open_ended} THEN -1
+                    WHEN len(found) = 1 THEN {age_bin("found[1]")}
+                    WHEN len(found) = 2 THEN CASE {ranges} ELSE -1 END
+                    ELSE -1
+                END AS code
+                FROM ages
+            )
+            SELECT pos, code FROM frame JOIN coded USING (age) WHERE code >= 0 ORDER BY pos
+        """
+        with self.duckdb.connect() as con:
+            con.register("frame", frame)
+            kept = con.execute(sql).df()
+        return age_group_frame(df, kept["pos"].to_numpy(), kept["code"].to_numpy(), groups)
+
+    def add_composite_scores(self, df: pd.DataFrame, x_items, y_items, method: str = "mean"):
+        items = list(x_items) + list(y_items)
+        text_items = [col for col in items if not pd.api.types.is_numeric_dtype(df[col].dtype)]
+        integer_items = set()
+        if text_items:
+            checks = [
+                f"coalesce(bool_and(coalesce(regexp_matches(trim(CAST({_quote(col)} AS VARCHAR)), ?), false)), true)"
+                for col in text_items
+            ]
+            whole = self._query(
+                df, text_items, f"SELECT {', '.join(checks)} FROM frame", [INTEGER_TEXT] * len(text_items)
+            ).iloc[0]
+            integer_items = {col for col, ok in zip(text_items, whole) if ok}
+        select = [f"{self._numeric(df, col)} AS {_quote(col)}" for col in items]
+        numeric = self._query(df, items, f"SELECT {', '.join(select)} FROM frame")
+        if method == "irt":
+            numeric.index = df.index
+            x_total = fit_grm(numeric[list(x_items)])["scores"]
+            y_total = fit_grm(numeric[list(y_items)])["scores"]
+        else:
+            totals = []
+            for scale in (x_items, y_items):
+                total = " + ".join(f"coalesce({_quote(c)}, 0)" for c in scale)
+                if method == "mean":
+                    answered = " + ".join(f"({_quote(c)} IS NOT NULL)::INTEGER" for c in scale)
+                    total = f"({total}) / nullif({answered}, 0)"
+                totals.append(f"({total})::DOUBLE")
+            scores = self._query(
+                numeric, items, f"SELECT {totals[0]} AS x, {totals[1]} AS y FROM frame"
+            )
+            x_total = scores["x"].to_numpy(dtype=float, na_value=np.nan)
+            y_total = scores["y"].to_numpy(dtype=float, na_value=np.nan)
+        values = {}
+        for col in items:
+            s = numeric[col]
+            # keep whole-number columns as int64 like pd.to_numeric()
+            if col in integer_items or (pd.api.types.is_integer_dtype(df[col].dtype) and not s.isna().any()):
+                values[col] = s.to_numpy(dtype="int64")
+            else:
+                values[col] = s.to_numpy(dtype=float, na_value=np.nan)
+        return _with_scores(df, items, values, x_total, y_total)
+
+    def item_frequencies(self, df: pd.DataFrame, items):
+        items = [item for item in items if item in df.columns]
+        counts = {}
+        for item in items:
+            q = _quote(item)
+            res = self._query(
+                df, [item], f"SELECT {q} AS v, count(*) AS n FROM frame WHERE {q} IS NOT NULL GROUP BY {q}"
+            )
+            counts[item] = _counts_series(res["v"].to_numpy(), res["n"].to_numpy(), item)
+        return counts
+
+    def crosstab(self, df: pd.DataFrame, x_col, y_col) -> pd.DataFrame:
+        columns = [x_col, y_col] if x_col != y_col else [x_col]
+        x, y = _quote(x_col), _quote(y_col)
+        pairs = self._query(
+            df, columns,
+            f"SELECT {x} AS x, {y} AS y, count(*) AS n FROM frame "
+            f"WHERE {x} IS NOT NULL AND {y} IS NOT NULL GROUP BY {x}, {y}",
+        )
+        return _pivot_pairs(pairs, x_col, y_col)
+
+
+# ------------------------------------------------------------------
+# SELECTION
+# ------------------------------------------------------------------
+ENGINE_CLASSES = {"pandas": PandasEngine, "polars": PolarsEngine, "duckdb": DuckDBEngine}
+_ENGINES = {}
+
+
+def engine_available(name: str) -> bool:
+    return name == "pandas" or (name in ENGINE_CLASSES and importlib.util.find_spec(name) is not None)
+
+
+def available_engines():
+    return [name for name in ENGINE_NAMES if engine_available(name)]
+
+
+def get_engine(name=None):
+    """Engine instance by name (default: DEFAULT_ENGINE), pandas if not installed"""
+    name = name or DEFAULT_ENGINE
+    if name not in ENGINE_CLASSES:
+        raise EngineError(f"Unknown engine '{name}'; choose one of {', '.join(ENGINE_NAMES)}.")
+    if not engine_available(name):
+        warnings.warn(f"Engine '{name}' is not installed; using pandas.", RuntimeWarning, stacklevel=2)
+        name = "pandas"
+    if name not in _ENGINES:
+        _ENGINES[name] = ENGINE_CLASSES[name]()
+    return _ENGINES[name]
+
+
+# ------------------------------------------------------------------
+# PARITY CHECK
+# ------------------------------------------------------------------
+def _same(check, left, right):
+    try:
+        check(left, right, check_dtype=False, check_exact=False, rtol=1e-9)
+        return True, ""
+    except AssertionError as e:
+        return False, str(e).splitlines()[0]
+
+
+def check_parity(df: pd.DataFrame, age_column, x_items, y_items, engines=None):
+    """Compare engines with pandas on one parsed upload.
+
+    Runs cleaning, mean and sum scoring, item frequencies and the first
+    X/Y item crosstab; returns one row per engine and step with ``ok`` and
+    the first line of any mismatch.
+    """
+    x_items, y_items = list(x_items), list(y_items)
+    ref = get_engine("pandas")
+
+    def run(engine):
+        cleaned, before, after = engine.clean_age(df, age_column)
+        out = {"clean_age": (cleaned, (before, after))}
+        for method in ("mean", "sum"):
+            out[f"scores_{method}"] = engine.add_composite_scores(cleaned, x_items, y_items, method)
+        scored = out["scores_mean"]
+        out["item_frequencies"] = engine.item_frequencies(scored, x_items + y_items)
+        out["crosstab"] = engine.crosstab(scored, x_items[0], y_items[0])
+        return out
+
+    expected = run(ref)
+    rows = []
+    for name in engines or [n for n in available_engines() if n != "pandas"]:
+        got = run(get_engine(name))
+        for step, want in expected.items():
+            have = got[step]
+            if step == "clean_age":
+                ok, detail = _same(pd.testing.assert_frame_equal, have[0], want[0])
+                if ok and have[1] != want[1]:
+                    ok, detail = False, f"counts {have[1]} != {want[1]}"
+            elif step == "item_frequencies":
+                ok, detail = True, ""
+                for item, counts in want.items():
+                    ok, detail = _same(pd.testing.assert_series_equal, have.get(item), counts)
+                    if not ok:
+                        detail = f"{item}: {detail}"
+                        break
+            else:
+                ok, detail = _same(pd.testing.assert_frame_equal, have, want)
+            rows.append({"engine": name, "step": step, "ok": ok, "detail": detail})
+    return pd.DataFrame(rows, columns=["engine", "step", "ok", "detail"])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from survey_helpers import (
+        AGE_KEYWORDS,
+        FIXED_X_ITEMS,
+        FIXED_Y_ITEMS,
+        find_column,
+        parse_upload,
+        rename_item_columns,
+    )
+
+    parser = argparse.ArgumentParser(description="Compare the dataframe engines with pandas on a survey file")
+    parser.add_argument("path")
+    parser.add_argument("--sheet", default=None)
+    args = parser.parse_args()
+
+    with open(args.path, "rb") as f:
+        raw = parse_upload(f.read(), os.path.basename(args.path), args.sheet)
+    age_column = find_column(raw.columns, AGE_KEYWORDS)
+    if age_column is None:
+        raise SystemExit("No age column found.")
+    print(check_parity(rename_item_columns(raw), age_column, FIXED_X_ITEMS, FIXED_Y_ITEMS).to_string(index=False))
@@ -0,0 +1,268 @@
+"""Plotly figures for the Visualizations tab.
+
+Every builder takes precomputed, language-neutral inputs (counts, scores)
+plus the language catalog and returns a finished ``go.Figure``. The app
+caches the figures per data hash and language, so reruns reuse them
+instead of building them again. Histograms are binned here and drawn as
+bars, so only the bin counts (not every respondent's score) go to the
+browser; all per-item bar charts share one faceted figure. Density
+overlays, violins and ridges are drawn from the curves evaluated by
+survey_density.group_densities().
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+HIST_BINS = 20
+ITEM_FACET_COLS = 2
+ITEM_FACET_ROW_HEIGHT = 260
+VIOLIN_HALF_WIDTH = 0.45
+RIDGE_HEIGHT = 0.9
+DENSITY_FLOOR = 1e-3  # curve points below this share of the peak are not sent
+
+
+def _curve(grid, density):
+    """Grid points where the density is visible (tails dropped)"""
+    visible = density >= DENSITY_FLOOR * density.max()
+    return grid[visible], density[visible]
+
+
+def _title(text):
+    return text.replace("#### ", "")
+
+
+def age_bar_figure(age_counts: pd.Series, lang_dict):
+    t = lang_dict
+    fig = go.Figure(
+        go.Bar(
+            x=age_counts.index.astype(str),
+            y=age_counts.values,
+            marker=dict(color=age_counts.values, colorscale="Blues"),
+            hovertemplate="%{x}<br>%{y}<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        title=_title(t["age_chart"]),
+        xaxis_title=t["age_group"],
+        yaxis_title=t["frequency"],
+        showlegend=False,
+        height=400,
+    )
+    return fig
+
+
+def score_histogram_figure(values: pd.Series, axis_label, title, bins=HIST_BINS, kde=None):
+    """Histogram from precomputed bin counts, optionally with a KDE curve.
+
+    ``kde`` is a single-group group_densities() result; the curve is scaled
+    to counts per bin.
+    """
+    finite = values.dropna().to_numpy(dtype=float)
+    counts, edges = np.histogram(finite, bins=bins)
+    centers = (edges[:-1] + edges[1:]) / 2
+    fig = go.Figure(
+        go.Bar(
+            x=centers,
+            y=counts,
+            width=np.diff(edges),
+            customdata=np.column_stack([edges[:-1], edges[1:]]),
+            hovertemplate="%{customdata[0]:.2f} – %{customdata[1]:.2f}<br>%{y}<extra></extra>",
+        )
+    )
+    if kde is not None and kde["labels"]:
+        grid, density = _curve(kde["grid"], kde["density"][0])
+        fig.add_trace(
+            go.Scatter(
+                x=grid,
+                y=density * len(finite) * np.diff(edges).mean(),
+                mode="lines",
+                name="KDE",
+                line=dict(color="black", width=2),
+                hoverinfo="skip",
+            )
+        )
+    fig.update_layout(
+        title=_title(title),
+        xaxis_title=axis_label,
+        yaxis_title="count",
+        bargap=0,
+        showlegend=False,
+        height=400,
+    )
+    return fig
+
+
+def scatter_regression_figure(valid_xy: pd.DataFrame, lang_dict):
+    """X_total vs Y_total scatter with the least-squares line"""
+    t = lang_dict
+    x = valid_xy["X_total"].to_numpy(dtype=float)
+    y = valid_xy["Y_total"].to_numpy(dtype=float)
+    fig = go.Figure(
+        go.Scatter(
+            x=x,
+            y=y,
+            mode="markers",
+            marker=dict(color=x, colorscale="Viridis", opacity=0.8, showscale=True),
+            showlegend=False,
+            hovertemplate="%{x}, %{y}<extra></extra>",
+        )
+    )
+    if len(x) > 1:
+        slope, intercept = np.polyfit(x, y, 1)
+        x_line = np.array([x.min(), x.max()])
+        fig.add_trace(
+            go.Scatter(
+                x=x_line,
+                y=slope * x_line + intercept,
+                mode="lines",
+                name=t["regression_line"],
+                line=dict(color="red", dash="dash", width=2),
+            )
+        )
+    fig.update_layout(
+        title=_title(t["scatter"]),
+        xaxis_title=t["x_total_score"],
+        yaxis_title=t["y_total_score"],
+        height=500,
+    )
+    return fig
+
+
+def item_bars_figure(item_counts: dict, lang_dict, item_labels=None):
+    """One faceted figure with a frequency bar chart per item.
+
+    ``item_counts`` maps item code to its value counts (see
+    ``item_frequencies``); items without answers are left out. The item's
+    question text, when known, is shown on hover.
+    """
+    t = lang_dict
+    item_labels = item_labels or {}
+    items = [item for item, counts in item_counts.items() if not counts.empty]
+    if not items:
+        return None
+    n_rows = math.ceil(len(items) / ITEM_FACET_COLS)
+    fig = make_subplots(
+        rows=n_rows,
+        cols=ITEM_FACET_COLS,
+        subplot_titles=items,
+        vertical_spacing=min(0.12, 0.5 / n_rows),
+        horizontal_spacing=0.08,
+    )
+    for idx, item in enumerate(items):
+        counts = item_counts[item]
+        label = item_labels.get(item, item)
+        fig.add_trace(
+            go.Bar(
+                x=counts.index.astype(str),
+                y=counts.values,
+                name=item,
+                customdata=[label] * len(counts),
+                hovertemplate="%{customdata}<br>%{x}: %{y}<extra></extra>",
+            ),
+            row=idx // ITEM_FACET_COLS + 1,
+            col=idx % ITEM_FACET_COLS + 1,
+        )
+    fig.update_yaxes(title_text=t["frequency"], col=1)
+    fig.update_layout(showlegend=False, height=ITEM_FACET_ROW_HEIGHT * n_rows + 80)
+    return fig
+
+
+def stacked_items_figure(item_counts: dict, lang_dict, response_labels):
+    """100 % stacked bar of the 1–5 answer shares per item"""
+    t = lang_dict
+    shares = pd.DataFrame(
+        {item: counts / counts.sum() * 100 for item, counts in item_counts.items() if not counts.empty}
+    ).T
+    shares = shares.reindex(columns=range(1, 6)).fillna(0.0).sort_index()
+
+    fig = go.Figure()
+    for score in range(1, 6):
+        fig.add_trace(
+            go.Bar(
+                name=response_labels[score],
+                x=shares.index,
+                y=shares[score],
+                text=shares[score].round(1),
+                textposition="inside",
+                hovertemplate="%{x}<br>%{y:.1f}%<extra></extra>",
+            )
+        )
+    fig.update_layout(
+        barmode="stack",
+        title=_title(t["stacked_chart"]),
+        xaxis_title=t["survey_item"],
+        yaxis_title=t["percentage"],
+        height=500,
+        legend_title=t["response_score"],
+    )
+    return fig
+
+
+def group_distribution_figure(densities: dict, axis_label, title, kind="violin"):
+    """Violins (one per group, each scaled to the same width) or ridge lines
+    (shared density scale) from group_densities() curves, with quartiles."""
+    labels = densities["labels"]
+    ticks = [f"{label} (n={n})" for label, n in zip(labels, densities["n"])]
+    colors = [f"hsl({int(360 * k / max(len(labels), 1))}, 55%, 55%)" for k in range(len(labels))]
+    fig = go.Figure()
+    peak = densities["density"].max() if len(labels) else 1.0
+    for k, label in enumerate(labels):
+        grid, density = _curve(densities["grid"], densities["density"][k])
+        q25, median, q75 = densities["quartiles"][k]
+        if kind == "violin":
+            half = density / density.max() * VIOLIN_HALF_WIDTH
+            fig.add_trace(
+                go.Scatter(
+                    x=np.concatenate([k - half, (k + half)[::-1]]),
+                    y=np.concatenate([grid, grid[::-1]]),
+                    fill="toself",
+                    mode="lines",
+                    line=dict(color=colors[k], width=1),
+                    name=label,
+                    hoverinfo="skip",
+                )
+            )
+            fig.add_trace(
+                go.Scatter(
+                    x=[k, k, k],
+                    y=[q25, median, q75],
+                    mode="lines+markers",
+                    line=dict(color="black", width=5),
+                    marker=dict(color=["black", "white", "black"], size=[1, 8, 1]),
+                    hovertemplate=f"{label}<br>Q1 {q25:.2f} · median {median:.2f} · Q3 {q75:.2f}<extra></extra>",
+                    showlegend=False,
+                )
+            )
+        else:
+            ridge = k + density / peak * RIDGE_HEIGHT
+            fig.add_trace(
+                go.Scatter(
+                    x=np.concatenate([grid, grid[::-1]]),
+                    y=np.concatenate([ridge, np.full(len(grid), k)]),
+                    fill="toself",
+                    mode="lines",
+                    line=dict(color=colors[k], width=1),
+                    name=label,
+                    hoverinfo="skip",
+                )
+            )
+            fig.add_trace(
+                go.Scatter(
+                    x=[median],
+                    y=[k],
+                    mode="markers",
+                    marker=dict(color="black", symbol="line-ns-open", size=14),
+                    hovertemplate=f"{label}<br>Q1 {q25:.2f} · median {median:.2f} · Q3 {q75:.2f}<extra></extra>",
+                    showlegend=False,
+                )
+            )
+    category_axis = dict(tickvals=list(range(len(labels))), ticktext=ticks)
+    if kind == "violin":
+        fig.update_layout(xaxis=category_axis, yaxis_title=axis_label)
+    else:
+        fig.update_layout(yaxis=category_axis, xaxis_title=axis_label)
+    fig.update_layout(title=_title(title), showlegend=False, height=max(400, 120 * len(labels) + 150))
+    return fig
@@ -0,0 +1,168 @@
+"""Nonparametric group comparisons of scores and items across demographics.
+
+Every variable (X_total, Y_total, items) is compared across every grouping
+column (gender, Age_Group):
+
+- two groups: Mann–Whitney U (normal approximation with tie and continuity
+  correction) with the rank-biserial correlation (positive when the first
+  group ranks higher)
+- three or more groups: Kruskal–Wallis H (tie-corrected) with epsilon²,
+  followed by Dunn's pairwise z tests
+
+All variables are ranked once, on the respondents with every grouping
+column present, and the rank sums per group come from one indicator-matrix
+product per grouping column. Omnibus p-values are adjusted over all
+variable × grouping tests and Dunn p-values within each variable ×
+grouping family.
+"""
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+P_ADJUST_METHODS = ("holm", "fdr_bh", "bonferroni")
+
+
+def adjust_pvalues(p, method="holm") -> np.ndarray:
+    """Holm, Benjamini–Hochberg or Bonferroni adjusted p-values (NaN kept)"""
+    p = np.asarray(p, dtype=float)
+    out = np.full(p.shape, np.nan)
+    valid = np.flatnonzero(np.isfinite(p))
+    m = len(valid)
+    if m == 0:
+        return out
+    pv = p[valid]
+    if method == "bonferroni":
+        adjusted = np.minimum(pv * m, 1.0)
+    elif method == "holm":
+        order = np.argsort(pv)
+        stepped = np.maximum.accumulate(pv[order] * (m - np.arange(m)))
+        adjusted = np.empty(m)
+        adjusted[order] = np.minimum(stepped, 1.0)
+    elif method == "fdr_bh":
+        order = np.argsort(pv)[::-1]
+        stepped = np.minimum.accumulate(pv[order] * m / np.arange(m, 0, -1))
+        adjusted = np.empty(m)
+        adjusted[order] = np.minimum(stepped, 1.0)
+    else:
+        raise ValueError(f"Unknown p-value adjustment: {method}")
+    out[valid] = adjusted
+    return out
+
+
+def _tie_sums(ranks: np.ndarray) -> np.ndarray:
+    """Σ (t³ − t) over groups of tied values, per column of ``ranks`` (NaN ignored)"""
+    sums = np.zeros(ranks.shape[1])
+    for k in range(ranks.shape[1]):
+        col = ranks[:, k]
+        _, counts = np.unique(col[~np.isnan(col)], return_counts=True)
+        sums[k] = float((counts ** 3 - counts).sum())
+    return sums
+
+
+def compare_groups(df: pd.DataFrame, variables, group_columns, correction="holm") -> dict:
+    """Mann–Whitney / Kruskal–Wallis + Dunn for every variable × grouping column.
+
+    Returns ``tests`` (one row per variable and grouping), ``posthoc``
+    (Dunn pairs) and ``groups`` (n, median and mean rank per group).
+    """
+    variables = [v for v in variables if v in df.columns]
+    group_columns = [g for g in group_columns if g is not None and g in df.columns]
+    empty = {"tests": pd.DataFrame(), "posthoc": pd.DataFrame(), "groups": pd.DataFrame()}
+    if not variables or not group_columns:
+        return empty
+
+    data = df[group_columns].notna().all(axis=1)
+    values = df.loc[data, variables].apply(pd.to_numeric, errors="coerce")
+    groups = df.loc[data, group_columns]
+    # ranks once per variable (average ties); rows missing the variable stay NaN
+    ranks = values.rank(method="average").to_numpy(dtype=float)
+    answered = ~np.isnan(ranks)
+    ranks0 = np.where(answered, ranks, 0.0)
+    tie_sums = _tie_sums(ranks)
+    medians = {}
+
+    test_rows, pair_rows, group_rows = [], [], []
+    for gcol in group_columns:
+        codes, levels = pd.factorize(groups[gcol], sort=True)
+        k = len(levels)
+        if k < 2:
+            continue
+        indicator = (codes[:, None] == np.arange(k)).astype(float)
+        n_g = indicator.T @ answered  # (k, V) answered counts per group
+        r_g = indicator.T @ ranks0  # (k, V) rank sums per group
+        medians[gcol] = values.groupby(codes).median()
+        n = n_g.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_rank = r_g / n_g
+            tie_factor = 1 - tie_sums / (n ** 3 - n)
+
+        for v, var in enumerate(variables):
+            present = n_g[:, v] > 0
+            n_v = n[v]
+            for g in range(k):
+                group_rows.append({
+                    "Variable": var,
+                    "Grouping": gcol,
+                    "Group": str(levels[g]),
+                    "N": int(n_g[g, v]),
+                    "Median": medians[gcol].iat[g, v] if g in medians[gcol].index else np.nan,
+                    "Mean rank": mean_rank[g, v],
+                })
+            if present.sum() < 2 or n_v < 3:
+                continue
+            if k == 2:
+                n1, n2 = n_g[0, v], n_g[1, v]
+                u1 = r_g[0, v] - n1 * (n1 + 1) / 2
+                sigma = np.sqrt(n1 * n2 / 12 * ((n_v + 1) - tie_sums[v] / (n_v * (n_v - 1))))
+                z = max(abs(u1 - n1 * n2 / 2) - 0.5, 0.0) / sigma if sigma > 0 else np.nan
+                test_rows.append({
+                    "Variable": var,
+                    "Grouping": gcol,
+                    "Test": "Mann–Whitney U",
+                    "N": int(n_v),
+                    "Groups": 2,
+                    "Statistic": u1,
+                    "p-value": 2 * stats.norm.sf(z) if np.isfinite(z) else np.nan,
+                    "Effect size": "rank-biserial r",
+                    "Effect": 2 * u1 / (n1 * n2) - 1,
+                })
+                continue
+
+            observed = np.flatnonzero(present)
+            h = (12 / (n_v * (n_v + 1)) * (r_g[observed, v] ** 2 / n_g[observed, v]).sum() - 3 * (n_v + 1))
+            h = h / tie_factor[v] if tie_factor[v] > 0 else np.nan
+            df_h = len(observed) - 1
+            test_rows.append({
+                "Variable": var,
+                "Grouping": gcol,
+                "Test": "Kruskal–Wallis H",
+                "N": int(n_v),
+                "Groups": len(observed),
+                "Statistic": h,
+                "p-value": stats.chi2.sf(h, df_h) if np.isfinite(h) else np.nan,
+                "Effect size": "epsilon²",
+                "Effect": h / (n_v - 1),
+            })
+            # Dunn: all pairs at once, tie-corrected variance
+            i, j = np.triu_indices(len(observed), 1)
+            a, b = observed[i], observed[j]
+            s2 = n_v * (n_v + 1) / 12 - tie_sums[v] / (12 * (n_v - 1))
+            with np.errstate(invalid="ignore", divide="ignore"):
+                z = (mean_rank[a, v] - mean_rank[b, v]) / np.sqrt(s2 * (1 / n_g[a, v] + 1 / n_g[b, v]))
+            p = 2 * stats.norm.sf(np.abs(z))
+            p_adj = adjust_pvalues(p, correction)
+            for idx in range(len(a)):
+                pair_rows.append({
+                    "Variable": var,
+                    "Grouping": gcol,
+                    "Group 1": str(levels[a[idx]]),
+                    "Group 2": str(levels[b[idx]]),
+                    "z": z[idx],
+                    "p-value": p[idx],
+                    "p (adjusted)": p_adj[idx],
+                })
+
+    tests = pd.DataFrame(test_rows)
+    if not tests.empty:
+        tests.insert(tests.columns.get_loc("p-value") + 1, "p (adjusted)", adjust_pvalues(tests["p-value"], correction))
+    return {"tests": tests, "posthoc": pd.DataFrame(pair_rows), "groups": pd.DataFrame(group_rows)}
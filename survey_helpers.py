@@ -0,0 +1,2216 @@
+"""Data cleaning, statistics and PDF helpers shared by the Streamlit app
+(data_olah.py) and the local HTTP analysis service (survey_service.py).
+
+Nothing in this module touches Streamlit, so it can be imported from any
+process without starting the UI.
+"""
+import pandas as pd
+import numpy as np
+from scipy import stats, special
+import matplotlib
+
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+
+from reportlab.platypus import (
+    SimpleDocTemplate,
+    Paragraph,
+    Spacer,
+    LongTable,
+    TableStyle,
+    Flowable,
+)
+from reportlab.lib.utils import ImageReader
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+
+from survey_cache import cached, content_hash
+from survey_density import group_densities
+from survey_irt import fit_grm
+from survey_regression import regression_summary, regression_tables
+
+import io
+import re
+import time
+
+# ------------------------------------------------------------------
+# MULTI-LANGUAGE SUPPORT
+# ------------------------------------------------------------------
+LANGUAGES = {
+    "en": {
+        "page_title": "📊 The Relationship between Fear of Missing Out (FOMO) and Social Media Addiction among Generation Z",
+        "subtitle": "Statistics 1 • Class 1",
+        "sidebar_members": "👥 Group Members",
+        "language_selector": "🌐 Language",
+        "upload_dataset": "1. Upload Dataset",
+        "upload_instruction": "Upload a CSV, Excel, Parquet or Feather file:",
+        "upload_info": "Please upload a dataset first.",
+        "preview_data": "Preview data (First 5 rows, before age cleaning):",
+        "see_columns": "See all column names (headers):",
+        "select_sheet": "Excel sheet:",
+        "age_detected": "Age column detected as:",
+        "age_not_found": "Age column not found. Make sure there's a column with 'Age' or 'Umur' in the name.",
+        "data_clean_success": "✅ Data cleaning & age grouping completed.",
+        "data_clean_summary": "**Data Cleaning Summary:**",
+        "respondents_before": "Respondents before cleaning:",
+        "respondents_after": "Respondents after cleaning (selected age groups only):",
+        "age_groups_input": "Age groups (inclusive ranges in years, comma-separated):",
+        "age_groups_help": "Numeric ages are binned into these groups; labels such as '19 - 23 tahun' are matched to them.",
+        "age_groups_invalid": "Age groups must be non-overlapping ranges like '13-18, 19-23'; using the defaults.",
+        "respondents_removed": "Removed respondents:",
+        "age_distribution": "**Age Group Distribution:**",
+        "num_respondents": "Number of respondents",
+        "preview_after_clean": "Preview data after cleaning & age grouping:",
+        "select_variables": "2. Select Variables X and Y (fixed item set)",
+        "fomo_items": "FOMO (X) – Choose Items:",
+        "fomo_help": "Select X1–X5 items (As per Questionnaire).",
+        "addiction_items": "Social Media Addiction (Y) – Choose Items:",
+        "addiction_help": "Select Y1–Y5 items (As per Questionnaire).",
+        "selected_fomo": "**Selected FOMO items:**",
+        "selected_addiction": "**Selected Addiction items:**",
+        "min_selection": "Please select at least 1 item for X and 1 item for Y.",
+        "composite_scores": "3. Composite Scores (X_total & Y_total)",
+        "composite_method": "Composite score method:",
+        "mean_items": "Mean of items (recommended)",
+        "sum_items": "Sum of items",
+        "irt_items": "IRT trait score (graded response model, EAP)",
+        "irt_min_items": "The IRT composite needs at least 2 items per scale; using the mean of items instead.",
+        "irt_title": "Graded response model – item parameters & test information",
+        "irt_caption": "a = discrimination, b1…b4 = category thresholds on the trait (θ) scale. {} respondents, {} distinct answer patterns, {} EM iterations.",
+        "irt_info": "Test information",
+        "composite_success": "✅ Composite scores X_total and Y_total have been successfully created.",
+        "export_clean": "Export cleaned dataset (age-filtered, X1–Y5, X_total & Y_total)",
+        "export_format": "File format:",
+        "prepare_export": "Prepare cleaned dataset",
+        "download_clean": "Download cleaned dataset",
+        "normality_test": "Normality Test (Shapiro–Wilk)",
+        "result": "### Result:",
+        "variable": "Variable",
+        "statistic": "Shapiro-Wilk Statistic",
+        "p_value": "p-value",
+        "normality": "Normality",
+        "normal": "Normal",
+        "not_normal": "Not Normal",
+        "recommended_method": "✅ Recommended association method based on normality test:",
+        "valid_respondents": "Valid respondents (after age filter)",
+        "avg_fomo": "Average FOMO (X_total)",
+        "avg_addiction": "Average Addiction (Y_total)",
+        "association_analysis": "4. Association Analysis – Choose Method",
+        "association_method": "Association method for X and Y (based on normality recommendation):",
+        "pearson": "Pearson Correlation",
+        "spearman": "Spearman Rank Correlation",
+        "chi_square": "Chi-square Test (categorical X & Y)",
+        "chi_instruction": "**Chi-square Test – Select categorical X and Y variables (Likert).**",
+        "categorical_x": "Categorical X variable:",
+        "categorical_y": "Categorical Y variable:",
+        "sparse_method": "Sparse tables (expected counts < 5):",
+        "sparse_auto": "Auto (exact / Monte Carlo when sparse)",
+        "sparse_mc": "Always Monte Carlo",
+        "sparse_asymptotic": "Asymptotic chi-square only",
+        "test_method": "Test used",
+        "mc_error": "Monte Carlo standard error",
+        "sparse_warning": "{:.0f}% of expected counts are below 5; the asymptotic chi-square p-value ({:.4f}) is unreliable.",
+        "tab_desc": "📋 Descriptive Statistics",
+        "tab_vis": "📈 Visualizations",
+        "tab_assoc": "🔗 Analysis Result",
+        "tab_pdf": "📄 PDF Report",
+        "active_view": "View",
+        "demographic_summary": "### 5.0 Demographic Summary",
+        "age_group_dist": "**Age Group Distribution**",
+        "gender_dist": "**Gender Distribution**",
+        "gender_not_detected": "Gender column was not detected, so gender distribution is not shown.",
+        "desc_items": "### 5.1 Descriptive Statistics – Each Survey Item",
+        "desc_composite": "### 5.2 Descriptive Statistics – Composite Scores (X_total & Y_total)",
+        "freq_table": "### 5.3 Frequency & Percentage Table (All X and Y Items)",
+        "freq_caption": "Table shows frequency distribution for each questionnaire item X1 to Y5. Charts available in '📈 Visualizations' tab.",
+        "result_for_item": "#### Result for Item:",
+        "frequency": "Frequency",
+        "percentage": "Percentage (%)",
+        "likert_note": "Note: SD=Strongly Disagree, SA=Strongly Agree.",
+        "efa_title": "### 5.4 Factor Structure (Exploratory Factor Analysis)",
+        "efa_toggle": "Run EFA with parallel analysis on the selected items",
+        "efa_corr": "Correlation input:",
+        "efa_extraction": "Extraction:",
+        "efa_rotation": "Rotation:",
+        "efa_n_factors": "Number of factors (0 = parallel analysis suggestion):",
+        "efa_suggested": "Parallel analysis suggests **{}** factor(s) (FA) / **{}** component(s) (PC); {} factor(s) extracted from {} complete responses.",
+        "efa_parallel": "**Parallel analysis (observed vs. random eigenvalues)**",
+        "efa_loadings": "**Factor loadings** (h² = communality, u² = uniqueness)",
+        "efa_variance": "**Variance explained**",
+        "efa_phi": "**Factor correlations**",
+        "visualizations": "### 6. Visualizations",
+        "age_chart": "#### 6.1 Distribution of Respondents by Age Group",
+        "hist_x": "#### 6.2 Distribution of X_total (FOMO)",
+        "hist_y": "#### 6.3 Distribution of Y_total (Social Media Addiction)",
+        "scatter": "#### 6.4 Scatterplot: X_total (FOMO) vs Y_total (Social Media Addiction)",
+        "item_charts": "#### 6.5 Interactive Bar Charts for Each Survey Item",
+        "item_caption": "Bar charts show response distribution for each questionnaire item.",
+        "stacked_chart": "#### 6.6 Interactive Stacked Bar Chart: Response Percentage Across All Items",
+        "stacked_caption": "This chart shows percentage distribution of responses for all questionnaire items (X1-Y5).",
+        "kde_overlay": "Show kernel density (KDE) curves on the histograms",
+        "dist_title": "#### 6.7 Score Distribution by Group",
+        "dist_caption": "Kernel density estimates per group (binned FFT on a fixed grid) with the median and quartiles marked.",
+        "dist_score": "Score",
+        "dist_group": "Group by",
+        "dist_kind": "Plot type",
+        "dist_kinds": {"violin": "Violin", "ridge": "Ridge"},
+        "item": "Item:",
+        "assoc_result": "### 7. Association Analysis",
+        "result_corr": "#### Result",
+        "corr_coef": "Correlation Coefficient (r)",
+        "direction": "Direction",
+        "strength": "Strength",
+        "significance": "Significance",
+        "interpretation": "#### Interpretation:",
+        "visual_check": "#### Visual Check: Scatterplot",
+        "chi_result": "#### Chi-square Test Result between",
+        "chi_value": "Chi-square Value (χ²)",
+        "dof": "Degrees of Freedom (dof)",
+        "contingency": "#### Contingency Table",
+        "ordinal_assoc": "#### Ordinal Association (Gamma, Kendall tau, Somers' d)",
+        "ordinal_caption": "Computed from the contingency table of the two ordered variables. ASE = asymptotic standard error; Somers' d (C|R) treats the second variable as dependent.",
+        "ordinal_x": "First (row) variable:",
+        "ordinal_y": "Second (column) variable:",
+        "chi_matrix": "#### All-pairs Chi-square & Cramér's V",
+        "power_title": "#### Sample-size Planner (Monte Carlo power)",
+        "power_caption": "Simulates 5-point answers for the selected items from two correlated factors (FOMO, addiction), using each item's loading and observed answer distribution, then scores and tests them like this app. rho = correlation between the factors; Mean r = expected X_total–Y_total correlation.",
+        "power_n_grid": "Sample sizes (after age cleaning, comma-separated):",
+        "power_rho_grid": "Factor correlations (comma-separated):",
+        "power_reps": "Replications per cell:",
+        "power_target": "Target power:",
+        "power_run": "Run power simulation",
+        "power_required": "**Required sample size** (N to recruit accounts for the {:.0f}% of respondents kept by age cleaning and screening)",
+        "power_irt_note": "IRT scores are simulated with the mean-of-items composite.",
+        "cache_stats": "Shared cache",
+        "engine_caption": "Dataframe engine: **{}**",
+        "cache_caption": "{} entries · {:.1f} / {:.0f} MB · {} hits · {} misses · {} evicted",
+        "report_languages": "Report languages",
+        "xlsx_export": "### 9. Export Excel Workbook",
+        "xlsx_caption": "Demographics, descriptives, frequency tables, normality, association results and the cleaned dataset, one sheet each.",
+        "prepare_xlsx": "Prepare Excel workbook",
+        "download_xlsx": "Download Excel workbook",
+        "snapshot_title": "💾 Analysis snapshots",
+        "snapshot_saved": "Saved snapshots",
+        "snapshot_restore": "Restore snapshot",
+        "snapshot_upload": "…or restore a snapshot file",
+        "snapshot_error": "Could not restore the snapshot: {}",
+        "snapshot_restored": "Restored snapshot of **{}** (saved {}). Upload a file to start a new analysis.",
+        "snapshot_name": "Snapshot name",
+        "snapshot_save": "Save snapshot",
+        "snapshot_saved_to": "Snapshot saved to {}",
+        "snapshot_download": "Download snapshot file",
+        "watch_title": "📈 Incremental mode (growing export)",
+        "watch_path": "Local survey file to watch",
+        "watch_interval": "Auto-refresh every … seconds (0 = manual)",
+        "watch_refresh": "Refresh now",
+        "watch_caption": "Running aggregates over the rows ingested so far (mean composites, no screening); only rows appended since the last refresh are read. Upload the file below for the full analysis.",
+        "watch_status": "+{} new rows read in {:.3f} s · last refresh {}",
+        "watch_reset": "The file no longer matches the stored watermark, so the aggregates were rebuilt from row one.",
+        "watch_error": "Incremental mode: {}",
+        "watch_rows": "Respondents",
+        "watch_clean": "After age cleaning",
+        "watch_latest": "Latest response",
+        "watch_r": "Pearson r (X_total, Y_total)",
+        "reg_title": "#### Multiple Regression / ANCOVA",
+        "reg_caption": "Y_total modelled on X_total, Age Group and gender (treatment coding), fitted by least squares. Standard errors are heteroskedasticity-robust (HC3); the ANOVA table uses type-II sums of squares.",
+        "reg_interactions": "Include X_total × covariate interactions",
+        "reg_summary": "n = {n}, R² = {r2:.3f}, adjusted R² = {adj_r2:.3f}, F({df_model}, {df_resid}) = {f:.2f}, p = {p:.4g}",
+        "reg_reference": "Reference levels: {}",
+        "reg_aliased": "Dropped (linearly dependent) columns: {}",
+        "reg_unavailable": "Not enough complete respondents to fit the regression model.",
+        "reg_coefficients": "**Coefficients (HC3 robust standard errors)**",
+        "reg_anova": "**Type-II ANOVA**",
+        "reg_term": "Term",
+        "reg_coef": "Coefficient",
+        "reg_se": "SE (HC3)",
+        "reg_ci_low": "95% CI low",
+        "reg_ci_high": "95% CI high",
+        "reg_ss": "Sum of squares",
+        "reg_partial_r2": "Partial R²",
+        "reg_residual": "Residual",
+        "include_regression": "Multiple regression / ANCOVA",
+        "screening_title": "Data Quality Screening",
+        "screening_caption": "Flags careless or invalid submissions among the age-cleaned respondents. Choose which checks remove respondents from the analysis.",
+        "screen_rules": "Exclude respondents flagged as:",
+        "screen_rule_labels": {
+            "straightline": "Straight-lining (same answer to every item)",
+            "long_run": "Long run of identical answers",
+            "duplicate": "Duplicate submission",
+            "incomplete": "Incomplete (unanswered items)",
+            "speeder": "Speeder (submitted right after the previous one)",
+            "mahalanobis": "Multivariate outlier (robust Mahalanobis distance)",
+            "guttman": "Guttman person-fit misfit",
+        },
+        "screen_run_share": "Long run = identical answers on at least this share of items:",
+        "screen_min_gap": "Speeder = seconds since the previous submission below:",
+        "screen_no_timestamp": "No timestamp column found; the speed check is skipped.",
+        "screen_check": "Check",
+        "screen_flagged": "Flagged",
+        "screen_excluded": "Excluded",
+        "screen_any": "Flagged by a selected check",
+        "respondents_before_screen": "Respondents before screening:",
+        "respondents_after_screen": "Respondents after screening:",
+        "strength_levels": ["very weak", "weak", "moderate", "strong", "very strong"],
+        "direction_positive": "positive",
+        "direction_negative": "negative",
+        "signif_yes": "significant (p < 0.05)",
+        "signif_no": "not significant (p ≥ 0.05)",
+        "corr_summary": (
+            "Using the {method} correlation, there is a {direction} and {strength} "
+            "relationship between FOMO (X_total) and social media addiction (Y_total), "
+            "with r = {r:.3f} and p = {p:.4f}, indicating that the association is {signif}."
+        ),
+        "chi_summary": (
+            "Using the Chi-square test between {x} and {y}, "
+            "the chi-square statistic is χ² = {chi2:.3f} with {dof} degrees of freedom "
+            "and p = {p_asymptotic:.4f}, indicating that the association is {signif}."
+        ),
+        "chi_sparse_summary": (
+            "Between {x} and {y}, χ² = {chi2:.3f} with {dof} degrees of freedom, "
+            "but {low_expected_pct:.0f}% of expected counts are below 5, so the "
+            "{method} test was used: p = {p:.4f}{mc}, indicating that the association is {signif}."
+        ),
+        "chi_mc_detail": " (± {mc_se:.4f}, {n_sim} simulated tables)",
+        "chi_matrix_toggle": "Test every pair of selected items (and items vs Age Group / Gender)",
+        "chi_matrix_caption": "Cramér's V: 0 = no association, 1 = perfect association. ⚠ marks tables where more than 20% of expected counts are below 5 or any is below 1.",
+        "group_tests": "#### Group Comparisons (Mann–Whitney / Kruskal–Wallis)",
+        "group_tests_toggle": "Compare X_total, Y_total and every selected item across Gender and Age Group",
+        "group_tests_caption": "Two groups: Mann–Whitney U with rank-biserial r (positive = first group ranks higher). Three or more: Kruskal–Wallis H with epsilon² and Dunn post-hoc tests. Adjusted p-values correct for testing every variable × grouping (Dunn: every pair within a test).",
+        "group_tests_correction": "P-value correction",
+        "group_tests_corrections": {"holm": "Holm", "fdr_bh": "Benjamini–Hochberg (FDR)", "bonferroni": "Bonferroni"},
+        "group_tests_posthoc": "**Dunn post-hoc comparisons**",
+        "group_tests_groups": "**Medians and mean ranks per group**",
+        "select_method": "Please select an association method in section **4. Association Analysis** above.",
+        "pdf_export": "### 8. Export PDF Report",
+        "pdf_filename": "PDF file name (without .pdf):",
+        "pdf_layout": "**PDF Visualization Layout Settings:**",
+        "charts_per_row": "Charts per Row:",
+        "select_content": "Select content to include in PDF:",
+        "include_items": "Descriptive statistics – items (X & Y)",
+        "include_comp": "Descriptive statistics – composite scores (X_total & Y_total)",
+        "include_corr": "Association analysis summary",
+        "include_demo": "Demographic summary (Age & Gender)",
+        "include_normality": "Normality test result (Shapiro–Wilk)",
+        "visualizations_pdf": "**Visualizations**",
+        "include_freq": "Frequency bar charts (All X and Y items)",
+        "include_stacked": "Stacked Bar Chart (All Item Response Percentage)",
+        "include_hist_x": "Histogram X_total",
+        "include_hist_y": "Histogram Y_total",
+        "include_scatter": "Scatterplot X_total vs Y_total",
+        "include_age": "Demographic bar chart (Age Group)",
+        "include_kde": "KDE curves on the histograms",
+        "include_violin": "Violin plots of X_total / Y_total by age group",
+        "include_quality": "Data quality screening",
+        "generate_pdf": "Generate PDF Report",
+        "pdf_success": "✅ PDF Report '{}' successfully created and ready for download.",
+        "pdf_error": "Failed to build PDF. Make sure all charts fit on the page. Error details: {}",
+        "download_pdf": "Download PDF Report",
+        "pdf_queued": "PDF report queued…",
+        "pdf_stage_tables": "Preparing tables",
+        "pdf_stage_build": "Building PDF",
+        "pdf_title": "Survey Analysis Report",
+        "pdf_subtitle": "FOMO & Social Media Addiction – Statistics 1 (Group 3)",
+        "pdf_members": "Group Members:",
+        "pdf_cleaning_title": "Data Cleaning (Age Filter & Grouping):",
+        "pdf_cleaning_text": (
+            "Only respondents whose age category was {groups} years were included in the analysis "
+            "to represent Generation Z. Other age categories such as below {low} or above {high} "
+            "years were excluded."
+        ),
+        "pdf_or": "or",
+        "pdf_respondents": (
+            "Respondents before cleaning: {before}<br/>"
+            "Respondents after cleaning: {after}<br/>"
+            "Removed respondents: {removed}"
+        ),
+        "pdf_normality": "Normality Test (Shapiro–Wilk)",
+        "pdf_demo_age": "Demographic Summary – Age Group",
+        "pdf_demo_gender": "Demographic Summary – Gender",
+        "pdf_desc_items": "Descriptive Statistics – Selected Items",
+        "pdf_desc_comp": "Descriptive Statistics – Composite Scores (X_total & Y_total)",
+        "pdf_freq_tables": "Frequency Tables for Survey Items",
+        "pdf_freq_table": "Frequency Table: {}",
+        "pdf_response": "Response",
+        "pdf_assoc": "Association Analysis Summary",
+        "pdf_visualizations": "Visualizations",
+        "pdf_age_chart": "Distribution of Respondents by Age Group",
+        "pdf_freq_chart": "Frequency Chart: {}",
+        "pdf_stacked_chart": "Response Percentage Across All Items (X & Y)",
+        "pdf_violin_chart": "Violin plots by age group",
+        "pdf_quality_title": "Data Quality Screening",
+        "pdf_quality_text": (
+            "Careless and invalid responses were screened with straight-lining, long runs of "
+            "identical answers, duplicate submissions, incomplete rows and submission speed, plus "
+            "two multivariate checks: the squared Mahalanobis distance from a robust minimum "
+            "covariance determinant (MCD) estimate, flagged above the chi-square 99.9% quantile, "
+            "and the normalized polytomous Guttman error count, flagged above the far-out fence "
+            "Q3 + 3 IQR. Checks marked as excluded removed respondents before the normality, "
+            "descriptive and association analyses."
+        ),
+        "pdf_quality_counts": "Respondents before screening: {}<br/>Respondents after screening: {}",
+        "pdf_regression_title": "Multiple Regression / ANCOVA",
+        "pdf_regression_text": (
+            "Y_total was regressed on X_total, age group and gender (treatment coding) by ordinary "
+            "least squares. Coefficients are reported with heteroskedasticity-robust HC3 standard "
+            "errors; the type-II ANOVA tests each term after all terms that do not contain it, and "
+            "partial R² is the share of the remaining variance explained by the term."
+        ),
+        "age_group": "Age Group",
+        "x_total_score": "X_total Score (FOMO)",
+        "y_total_score": "Y_total Score (Social Media Addiction)",
+        "response_score": "Response Score",
+        "survey_item": "Survey Item",
+        "regression_line": "Regression line",
+    },
+    "id": {
+        "page_title": "📊 Hubungan antara Fear of Missing Out (FOMO) dan Kecanduan Media Sosial pada Generasi Z",
+        "subtitle": "Statistika 1 • Kelas 1",
+        "sidebar_members": "👥 Anggota Kelompok",
+        "language_selector": "🌐 Bahasa",
+        "upload_dataset": "1. Unggah Dataset",
+        "upload_instruction": "Unggah file CSV, Excel, Parquet atau Feather:",
+        "upload_info": "Silakan unggah dataset terlebih dahulu.",
+        "preview_data": "Preview data (5 baris pertama, sebelum pembersihan usia):",
+        "see_columns": "Lihat semua nama kolom (header):",
+        "select_sheet": "Sheet Excel:",
+        "age_detected": "Kolom usia terdeteksi sebagai:",
+        "age_not_found": "Kolom usia tidak ditemukan. Pastikan ada kolom dengan nama mengandung 'Age' atau 'Umur'.",
+        "data_clean_success": "✅ Pembersihan data & pengelompokan usia selesai.",
+        "data_clean_summary": "**Ringkasan Pembersihan Data:**",
+        "respondents_before": "Responden sebelum pembersihan:",
+        "respondents_after": "Responden setelah pembersihan (hanya kelompok usia terpilih):",
+        "age_groups_input": "Kelompok usia (rentang tahun inklusif, dipisahkan koma):",
+        "age_groups_help": "Usia berupa angka dikelompokkan ke rentang ini; label seperti '19 - 23 tahun' dicocokkan ke kelompoknya.",
+        "age_groups_invalid": "Kelompok usia harus berupa rentang yang tidak tumpang tindih seperti '13-18, 19-23'; memakai bawaan.",
+        "respondents_removed": "Responden dihapus:",
+        "age_distribution": "**Distribusi Kelompok Usia:**",
+        "num_respondents": "Jumlah responden",
+        "preview_after_clean": "Preview data setelah pembersihan & pengelompokan usia:",
+        "select_variables": "2. Pilih Variabel X dan Y (set item tetap)",
+        "fomo_items": "FOMO (X) – Pilih Item:",
+        "fomo_help": "Pilih item X1–X5 (Sesuai Kuesioner).",
+        "addiction_items": "Kecanduan Media Sosial (Y) – Pilih Item:",
+        "addiction_help": "Pilih item Y1–Y5 (Sesuai Kuesioner).",
+        "selected_fomo": "**Item FOMO yang dipilih:**",
+        "selected_addiction": "**Item Kecanduan yang dipilih:**",
+        "min_selection": "Minimal pilih 1 item untuk X dan 1 item untuk Y.",
+        "composite_scores": "3. Skor Komposit (X_total & Y_total)",
+        "composite_method": "Metode skor komposit:",
+        "mean_items": "Rata-rata item (direkomendasikan)",
+        "sum_items": "Jumlah item",
+        "irt_items": "Skor trait IRT (graded response model, EAP)",
+        "irt_min_items": "Komposit IRT membutuhkan minimal 2 item per skala; menggunakan rata-rata item sebagai gantinya.",
+        "irt_title": "Graded response model – parameter item & informasi tes",
+        "irt_caption": "a = daya beda, b1…b4 = ambang kategori pada skala trait (θ). {} responden, {} pola jawaban berbeda, {} iterasi EM.",
+        "irt_info": "Informasi tes",
+        "composite_success": "✅ Skor komposit X_total dan Y_total berhasil dibuat.",
+        "export_clean": "Ekspor dataset bersih (filter usia, X1–Y5, X_total & Y_total)",
+        "export_format": "Format file:",
+        "prepare_export": "Siapkan dataset bersih",
+        "download_clean": "Unduh dataset bersih",
+        "normality_test": "Uji Normalitas (Shapiro–Wilk)",
+        "result": "### Hasil:",
+        "variable": "Variabel",
+        "statistic": "Statistik Shapiro-Wilk",
+        "p_value": "nilai-p",
+        "normality": "Normalitas",
+        "normal": "Normal",
+        "not_normal": "Tidak Normal",
+        "recommended_method": "✅ Metode asosiasi yang direkomendasikan berdasarkan uji normalitas:",
+        "valid_respondents": "Responden valid (setelah filter usia)",
+        "avg_fomo": "Rata-rata FOMO (X_total)",
+        "avg_addiction": "Rata-rata Kecanduan (Y_total)",
+        "association_analysis": "4. Analisis Asosiasi – Pilih Metode",
+        "association_method": "Metode asosiasi untuk X dan Y (berdasarkan rekomendasi normalitas):",
+        "pearson": "Korelasi Pearson",
+        "spearman": "Korelasi Rank Spearman",
+        "chi_square": "Uji Chi-square (X & Y kategorikal)",
+        "chi_instruction": "**Uji Chi-square – Pilih variabel X dan Y kategorikal (Likert).**",
+        "categorical_x": "Variabel X kategorikal:",
+        "categorical_y": "Variabel Y kategorikal:",
+        "sparse_method": "Tabel jarang (frekuensi harapan < 5):",
+        "sparse_auto": "Otomatis (eksak / Monte Carlo jika jarang)",
+        "sparse_mc": "Selalu Monte Carlo",
+        "sparse_asymptotic": "Hanya chi-square asimptotik",
+        "test_method": "Uji yang digunakan",
+        "mc_error": "Galat baku Monte Carlo",
+        "sparse_warning": "{:.0f}% frekuensi harapan di bawah 5; nilai-p chi-square asimptotik ({:.4f}) tidak dapat diandalkan.",
+        "tab_desc": "📋 Statistik Deskriptif",
+        "tab_vis": "📈 Visualisasi",
+        "tab_assoc": "🔗 Hasil Analisis",
+        "tab_pdf": "📄 Laporan PDF",
+        "active_view": "Tampilan",
+        "demographic_summary": "### 5.0 Ringkasan Demografi",
+        "age_group_dist": "**Distribusi Kelompok Usia**",
+        "gender_dist": "**Distribusi Jenis Kelamin**",
+        "gender_not_detected": "Kolom jenis kelamin tidak terdeteksi, sehingga distribusi jenis kelamin tidak ditampilkan.",
+        "desc_items": "### 5.1 Statistik Deskriptif – Setiap Item Survei",
+        "desc_composite": "### 5.2 Statistik Deskriptif – Skor Komposit (X_total & Y_total)",
+        "freq_table": "### 5.3 Tabel Frekuensi & Persentase (Semua Item X dan Y)",
+        "freq_caption": "Tabel menunjukkan distribusi frekuensi untuk setiap item kuesioner X1 hingga Y5. Grafik tersedia di tab '📈 Visualisasi'.",
+        "result_for_item": "#### Hasil untuk Item:",
+        "frequency": "Frekuensi",
+        "percentage": "Persentase (%)",
+        "likert_note": "Keterangan: STS=Sangat Tidak Setuju, SS=Sangat Setuju.",
+        "efa_title": "### 5.4 Struktur Faktor (Analisis Faktor Eksploratori)",
+        "efa_toggle": "Jalankan EFA dengan analisis paralel pada item terpilih",
+        "efa_corr": "Input korelasi:",
+        "efa_extraction": "Ekstraksi:",
+        "efa_rotation": "Rotasi:",
+        "efa_n_factors": "Jumlah faktor (0 = saran analisis paralel):",
+        "efa_suggested": "Analisis paralel menyarankan **{}** faktor (FA) / **{}** komponen (PC); {} faktor diekstraksi dari {} respons lengkap.",
+        "efa_parallel": "**Analisis paralel (eigenvalue observasi vs. acak)**",
+        "efa_loadings": "**Muatan faktor** (h² = komunalitas, u² = keunikan)",
+        "efa_variance": "**Varians yang dijelaskan**",
+        "efa_phi": "**Korelasi antar faktor**",
+        "visualizations": "### 6. Visualisasi",
+        "age_chart": "#### 6.1 Distribusi Responden Berdasarkan Kelompok Usia",
+        "hist_x": "#### 6.2 Distribusi X_total (FOMO)",
+        "hist_y": "#### 6.3 Distribusi Y_total (Kecanduan Media Sosial)",
+        "scatter": "#### 6.4 Scatterplot: X_total (FOMO) vs Y_total (Kecanduan Media Sosial)",
+        "item_charts": "#### 6.5 Grafik Batang Interaktif untuk Setiap Item Survei",
+        "item_caption": "Grafik batang menunjukkan distribusi jawaban untuk setiap item kuesioner.",
+        "stacked_chart": "#### 6.6 Grafik Batang Bertumpuk Interaktif: Persentase Respons untuk Semua Item",
+        "stacked_caption": "Grafik ini menunjukkan persentase distribusi jawaban untuk semua item kuesioner (X1-Y5).",
+        "kde_overlay": "Tampilkan kurva densitas kernel (KDE) pada histogram",
+        "dist_title": "#### 6.7 Distribusi Skor per Kelompok",
+        "dist_caption": "Estimasi densitas kernel per kelompok (FFT terbin pada grid tetap) dengan median dan kuartil ditandai.",
+        "dist_score": "Skor",
+        "dist_group": "Kelompokkan menurut",
+        "dist_kind": "Jenis grafik",
+        "dist_kinds": {"violin": "Violin", "ridge": "Ridge"},
+        "item": "Item:",
+        "assoc_result": "### 7. Analisis Asosiasi",
+        "result_corr": "#### Hasil",
+        "corr_coef": "Koefisien Korelasi (r)",
+        "direction": "Arah",
+        "strength": "Kekuatan",
+        "significance": "Signifikansi",
+        "interpretation": "#### Interpretasi:",
+        "visual_check": "#### Pemeriksaan Visual: Scatterplot",
+        "chi_result": "#### Hasil Uji Chi-square antara",
+        "chi_value": "Nilai Chi-square (χ²)",
+        "dof": "Derajat Kebebasan (dof)",
+        "contingency": "#### Tabel Kontingensi",
+        "ordinal_assoc": "#### Asosiasi Ordinal (Gamma, Kendall tau, Somers' d)",
+        "ordinal_caption": "Dihitung dari tabel kontingensi dua variabel berurutan. ASE = galat baku asimptotik; Somers' d (C|R) memperlakukan variabel kedua sebagai variabel terikat.",
+        "ordinal_x": "Variabel pertama (baris):",
+        "ordinal_y": "Variabel kedua (kolom):",
+        "chi_matrix": "#### Chi-square & Cramér's V Semua Pasangan",
+        "power_title": "#### Perencana Ukuran Sampel (power Monte Carlo)",
+        "power_caption": "Mensimulasikan jawaban 5 poin untuk item terpilih dari dua faktor berkorelasi (FOMO, kecanduan), memakai muatan dan distribusi jawaban tiap item, lalu menghitung skor dan mengujinya seperti aplikasi ini. rho = korelasi antar faktor; Mean r = perkiraan korelasi X_total–Y_total.",
+        "power_n_grid": "Ukuran sampel (setelah pembersihan usia, pisahkan dengan koma):",
+        "power_rho_grid": "Korelasi faktor (pisahkan dengan koma):",
+        "power_reps": "Replikasi per sel:",
+        "power_target": "Target power:",
+        "power_run": "Jalankan simulasi power",
+        "power_required": "**Ukuran sampel yang dibutuhkan** (N yang direkrut memperhitungkan {:.0f}% responden yang lolos pembersihan usia dan penyaringan)",
+        "power_irt_note": "Skor IRT disimulasikan dengan komposit rata-rata item.",
+        "cache_stats": "Cache bersama",
+        "engine_caption": "Mesin dataframe: **{}**",
+        "cache_caption": "{} entri · {:.1f} / {:.0f} MB · {} hit · {} miss · {} dikeluarkan",
+        "report_languages": "Bahasa laporan",
+        "xlsx_export": "### 9. Ekspor Workbook Excel",
+        "xlsx_caption": "Demografi, statistik deskriptif, tabel frekuensi, normalitas, hasil asosiasi dan dataset bersih, masing-masing dalam satu sheet.",
+        "prepare_xlsx": "Siapkan workbook Excel",
+        "download_xlsx": "Unduh workbook Excel",
+        "snapshot_title": "💾 Snapshot analisis",
+        "snapshot_saved": "Snapshot tersimpan",
+        "snapshot_restore": "Pulihkan snapshot",
+        "snapshot_upload": "…atau pulihkan dari file snapshot",
+        "snapshot_error": "Snapshot tidak dapat dipulihkan: {}",
+        "snapshot_restored": "Snapshot **{}** dipulihkan (disimpan {}). Unggah file untuk memulai analisis baru.",
+        "snapshot_name": "Nama snapshot",
+        "snapshot_save": "Simpan snapshot",
+        "snapshot_saved_to": "Snapshot disimpan di {}",
+        "snapshot_download": "Unduh file snapshot",
+        "watch_title": "📈 Mode inkremental (ekspor yang terus bertambah)",
+        "watch_path": "File survei lokal yang dipantau",
+        "watch_interval": "Muat ulang otomatis setiap … detik (0 = manual)",
+        "watch_refresh": "Muat ulang sekarang",
+        "watch_caption": "Agregat berjalan atas baris yang sudah dibaca (komposit rata-rata, tanpa penyaringan); hanya baris yang ditambahkan sejak pemuatan terakhir yang dibaca. Unggah file di bawah untuk analisis lengkap.",
+        "watch_status": "+{} baris baru dibaca dalam {:.3f} dtk · pemuatan terakhir {}",
+        "watch_reset": "File tidak lagi cocok dengan watermark tersimpan, sehingga agregat dihitung ulang dari baris pertama.",
+        "watch_error": "Mode inkremental: {}",
+        "watch_rows": "Responden",
+        "watch_clean": "Setelah pembersihan usia",
+        "watch_latest": "Respons terakhir",
+        "watch_r": "r Pearson (X_total, Y_total)",
+        "reg_title": "#### Regresi Berganda / ANCOVA",
+        "reg_caption": "Y_total dimodelkan dengan X_total, Kelompok Usia dan jenis kelamin (kode perlakuan), diestimasi dengan kuadrat terkecil. Galat baku tahan heteroskedastisitas (HC3); tabel ANOVA memakai jumlah kuadrat tipe II.",
+        "reg_interactions": "Sertakan interaksi X_total × kovariat",
+        "reg_summary": "n = {n}, R² = {r2:.3f}, R² disesuaikan = {adj_r2:.3f}, F({df_model}, {df_resid}) = {f:.2f}, p = {p:.4g}",
+        "reg_reference": "Kategori acuan: {}",
+        "reg_aliased": "Kolom yang dihapus (bergantung linear): {}",
+        "reg_unavailable": "Responden lengkap tidak cukup untuk mengestimasi model regresi.",
+        "reg_coefficients": "**Koefisien (galat baku robust HC3)**",
+        "reg_anova": "**ANOVA Tipe II**",
+        "reg_term": "Suku",
+        "reg_coef": "Koefisien",
+        "reg_se": "GB (HC3)",
+        "reg_ci_low": "Batas bawah IK 95%",
+        "reg_ci_high": "Batas atas IK 95%",
+        "reg_ss": "Jumlah kuadrat",
+        "reg_partial_r2": "R² parsial",
+        "reg_residual": "Residual",
+        "include_regression": "Regresi berganda / ANCOVA",
+        "screening_title": "Penyaringan Kualitas Data",
+        "screening_caption": "Menandai jawaban yang asal-asalan atau tidak valid di antara responden yang lolos pembersihan usia. Pilih pemeriksaan yang mengeluarkan responden dari analisis.",
+        "screen_rules": "Keluarkan responden yang ditandai sebagai:",
+        "screen_rule_labels": {
+            "straightline": "Straight-lining (jawaban sama untuk semua item)",
+            "long_run": "Deretan panjang jawaban identik",
+            "duplicate": "Pengiriman ganda",
+            "incomplete": "Tidak lengkap (ada item yang tidak dijawab)",
+            "speeder": "Terlalu cepat (dikirim tepat setelah pengiriman sebelumnya)",
+            "mahalanobis": "Pencilan multivariat (jarak Mahalanobis robust)",
+            "guttman": "Ketidaksesuaian person-fit Guttman",
+        },
+        "screen_run_share": "Deretan panjang = jawaban identik pada minimal proporsi item ini:",
+        "screen_min_gap": "Terlalu cepat = detik sejak pengiriman sebelumnya kurang dari:",
+        "screen_no_timestamp": "Kolom timestamp tidak ditemukan; pemeriksaan kecepatan dilewati.",
+        "screen_check": "Pemeriksaan",
+        "screen_flagged": "Ditandai",
+        "screen_excluded": "Dikeluarkan",
+        "screen_any": "Ditandai oleh pemeriksaan terpilih",
+        "respondents_before_screen": "Responden sebelum penyaringan:",
+        "respondents_after_screen": "Responden setelah penyaringan:",
+        "strength_levels": ["sangat lemah", "lemah", "sedang", "kuat", "sangat kuat"],
+        "direction_positive": "positif",
+        "direction_negative": "negatif",
+        "signif_yes": "signifikan (p < 0,05)",
+        "signif_no": "tidak signifikan (p ≥ 0,05)",
+        "corr_summary": (
+            "Menggunakan korelasi {method}, terdapat hubungan {direction} dan {strength} "
+            "antara FOMO (X_total) dan kecanduan media sosial (Y_total), "
+            "dengan r = {r:.3f} dan p = {p:.4f}, menunjukkan bahwa asosiasi tersebut {signif}."
+        ),
+        "chi_summary": (
+            "Menggunakan uji Chi-square antara {x} dan {y}, "
+            "statistik chi-square adalah χ² = {chi2:.3f} dengan {dof} derajat kebebasan "
+            "dan p = {p_asymptotic:.4f}, menunjukkan bahwa asosiasi tersebut {signif}."
+        ),
+        "chi_sparse_summary": (
+            "Antara {x} dan {y}, χ² = {chi2:.3f} dengan {dof} derajat kebebasan, "
+            "namun {low_expected_pct:.0f}% frekuensi harapan di bawah 5, sehingga digunakan uji "
+            "{method}: p = {p:.4f}{mc}, menunjukkan bahwa asosiasi tersebut {signif}."
+        ),
+        "chi_mc_detail": " (± {mc_se:.4f}, {n_sim} tabel simulasi)",
+        "chi_matrix_toggle": "Uji setiap pasangan item terpilih (dan item vs Kelompok Usia / Jenis Kelamin)",
+        "chi_matrix_caption": "Cramér's V: 0 = tidak ada asosiasi, 1 = asosiasi sempurna. ⚠ menandai tabel dengan lebih dari 20% frekuensi harapan di bawah 5 atau ada yang di bawah 1.",
+        "group_tests": "#### Perbandingan Kelompok (Mann–Whitney / Kruskal–Wallis)",
+        "group_tests_toggle": "Bandingkan X_total, Y_total dan setiap item terpilih antar Jenis Kelamin dan Kelompok Usia",
+        "group_tests_caption": "Dua kelompok: Mann–Whitney U dengan rank-biserial r (positif = kelompok pertama berperingkat lebih tinggi). Tiga atau lebih: Kruskal–Wallis H dengan epsilon² dan uji lanjut Dunn. p terkoreksi memperhitungkan pengujian setiap variabel × pengelompokan (Dunn: setiap pasangan dalam satu uji).",
+        "group_tests_correction": "Koreksi nilai p",
+        "group_tests_corrections": {"holm": "Holm", "fdr_bh": "Benjamini–Hochberg (FDR)", "bonferroni": "Bonferroni"},
+        "group_tests_posthoc": "**Perbandingan lanjut Dunn**",
+        "group_tests_groups": "**Median dan rata-rata peringkat per kelompok**",
+        "select_method": "Silakan pilih metode asosiasi di bagian **4. Analisis Asosiasi** di atas.",
+        "pdf_export": "### 8. Ekspor Laporan PDF",
+        "pdf_filename": "Nama file PDF (tanpa .pdf):",
+        "pdf_layout": "**Pengaturan Layout Visualisasi dalam PDF:**",
+        "charts_per_row": "Grafik per Baris:",
+        "select_content": "Pilih konten yang ingin dimasukkan ke PDF:",
+        "include_items": "Statistik deskriptif – item (X & Y)",
+        "include_comp": "Statistik deskriptif – skor komposit (X_total & Y_total)",
+        "include_corr": "Ringkasan analisis asosiasi",
+        "include_demo": "Ringkasan demografi (Usia & Jenis Kelamin)",
+        "include_normality": "Hasil uji normalitas (Shapiro–Wilk)",
+        "visualizations_pdf": "**Visualisasi**",
+        "include_freq": "Grafik batang frekuensi (Semua item X dan Y)",
+        "include_stacked": "Grafik Batang Bertumpuk (Persentase Respons Semua Item)",
+        "include_hist_x": "Histogram X_total",
+        "include_hist_y": "Histogram Y_total",
+        "include_scatter": "Scatterplot X_total vs Y_total",
+        "include_age": "Grafik batang demografi (Kelompok Usia)",
+        "include_kde": "Kurva KDE pada histogram",
+        "include_violin": "Grafik violin X_total / Y_total per kelompok usia",
+        "include_quality": "Penyaringan kualitas data",
+        "generate_pdf": "Buat Laporan PDF",
+        "pdf_success": "✅ Laporan PDF '{}' berhasil dibuat dan siap diunduh.",
+        "pdf_error": "Gagal membangun PDF. Pastikan semua grafik muat di halaman. Detail Error: {}",
+        "download_pdf": "Unduh Laporan PDF",
+        "pdf_queued": "Laporan PDF dalam antrean…",
+        "pdf_stage_tables": "Menyiapkan tabel",
+        "pdf_stage_build": "Menyusun PDF",
+        "pdf_title": "Laporan Analisis Survei",
+        "pdf_subtitle": "FOMO & Kecanduan Media Sosial – Statistika 1 (Kelompok 3)",
+        "pdf_members": "Anggota Kelompok:",
+        "pdf_cleaning_title": "Pembersihan Data (Filter & Pengelompokan Usia):",
+        "pdf_cleaning_text": (
+            "Hanya responden dengan kategori usia {groups} tahun yang disertakan dalam analisis "
+            "untuk mewakili Generasi Z. Kategori usia lain di bawah {low} atau di atas {high} "
+            "tahun dikeluarkan."
+        ),
+        "pdf_or": "atau",
+        "pdf_respondents": (
+            "Responden sebelum pembersihan: {before}<br/>"
+            "Responden setelah pembersihan: {after}<br/>"
+            "Responden dihapus: {removed}"
+        ),
+        "pdf_normality": "Uji Normalitas (Shapiro–Wilk)",
+        "pdf_demo_age": "Ringkasan Demografi – Kelompok Usia",
+        "pdf_demo_gender": "Ringkasan Demografi – Jenis Kelamin",
+        "pdf_desc_items": "Statistik Deskriptif – Item Terpilih",
+        "pdf_desc_comp": "Statistik Deskriptif – Skor Komposit (X_total & Y_total)",
+        "pdf_freq_tables": "Tabel Frekuensi untuk Item Survei",
+        "pdf_freq_table": "Tabel Frekuensi: {}",
+        "pdf_response": "Respons",
+        "pdf_assoc": "Ringkasan Analisis Asosiasi",
+        "pdf_visualizations": "Visualisasi",
+        "pdf_age_chart": "Distribusi Responden Berdasarkan Kelompok Usia",
+        "pdf_freq_chart": "Grafik Frekuensi: {}",
+        "pdf_stacked_chart": "Persentase Respons untuk Semua Item (X & Y)",
+        "pdf_violin_chart": "Grafik violin per kelompok usia",
+        "pdf_quality_title": "Penyaringan Kualitas Data",
+        "pdf_quality_text": (
+            "Jawaban yang asal-asalan dan tidak valid disaring dengan pemeriksaan straight-lining, "
+            "deretan panjang jawaban identik, pengiriman ganda, baris tidak lengkap dan kecepatan "
+            "pengiriman, serta dua pemeriksaan multivariat: kuadrat jarak Mahalanobis dari estimasi "
+            "robust minimum covariance determinant (MCD), ditandai di atas kuantil chi-square 99,9%, "
+            "dan jumlah kesalahan Guttman politomus ternormalisasi, ditandai di atas batas "
+            "Q3 + 3 IQR. Pemeriksaan yang ditandai sebagai dikeluarkan menghapus responden sebelum "
+            "analisis normalitas, deskriptif dan asosiasi."
+        ),
+        "pdf_quality_counts": "Responden sebelum penyaringan: {}<br/>Responden setelah penyaringan: {}",
+        "pdf_regression_title": "Regresi Berganda / ANCOVA",
+        "pdf_regression_text": (
+            "Y_total diregresikan pada X_total, kelompok usia dan jenis kelamin (kode perlakuan) "
+            "dengan kuadrat terkecil biasa. Koefisien dilaporkan dengan galat baku robust HC3 yang "
+            "tahan heteroskedastisitas; ANOVA tipe II menguji setiap suku setelah semua suku yang "
+            "tidak memuatnya, dan R² parsial adalah bagian varians sisa yang dijelaskan suku tersebut."
+        ),
+        "age_group": "Kelompok Usia",
+        "x_total_score": "Skor X_total (FOMO)",
+        "y_total_score": "Skor Y_total (Kecanduan Media Sosial)",
+        "response_score": "Skor Respons",
+        "survey_item": "Item Survei",
+        "regression_line": "Garis regresi",
+    }
+}
+
+RESPONSE_LABELS_EN = {
+    1: "1 (SD: Strongly Disagree)",
+    2: "2 (D: Disagree)",
+    3: "3 (N: Neutral)",
+    4: "4 (A: Agree)",
+    5: "5 (SA: Strongly Agree)",
+}
+
+RESPONSE_LABELS_ID = {
+    1: "1 (STS: Sangat Tidak Setuju)",
+    2: "2 (TS: Tidak Setuju)",
+    3: "3 (N: Netral)",
+    4: "4 (S: Setuju)",
+    5: "5 (SS: Sangat Setuju)",
+}
+
+RESPONSE_LABELS = {"en": RESPONSE_LABELS_EN, "id": RESPONSE_LABELS_ID}
+
+FOMO_LABELS_EN = {
+    "X1": "I feel anxious if I don't know the latest updates on social media.",
+    "X2": "I feel the urge to constantly check social media to stay connected.",
+    "X3": "I'm afraid of being left behind when others talk about trending topics.",
+    "X4": "I feel the need to follow viral trends to stay 'included'.",
+    "X5": "I feel uncomfortable when I see others participating in activities that I am not part of.",
+}
+
+FOMO_LABELS_ID = {
+    "X1": "Saya merasa cemas jika tidak tahu update terbaru di media sosial.",
+    "X2": "Saya merasa perlu terus mengecek media sosial agar tetap terhubung.",
+    "X3": "Saya takut ketinggalan saat orang lain membahas topik yang sedang tren.",
+    "X4": "Saya merasa perlu mengikuti tren viral agar tetap 'masuk'.",
+    "X5": "Saya merasa tidak nyaman saat melihat orang lain mengikuti aktivitas yang tidak saya ikuti.",
+}
+
+ADDICTION_LABELS_EN = {
+    "Y1": "I find it difficult to reduce the amount of time I spend on social media.",
+    "Y2": "I prefer using social media over doing offline activities.",
+    "Y3": "Social media usage disrupts my sleep, study time, or other important activities.",
+    "Y4": "I often spend more time on social media than I originally planned.",
+    "Y5": "I often open social media automatically without any clear purpose.",
+}
+
+ADDICTION_LABELS_ID = {
+    "Y1": "Saya kesulitan mengurangi waktu yang saya habiskan di media sosial.",
+    "Y2": "Saya lebih suka menggunakan media sosial daripada melakukan aktivitas offline.",
+    "Y3": "Penggunaan media sosial mengganggu tidur, waktu belajar, atau aktivitas penting lainnya.",
+    "Y4": "Saya sering menghabiskan lebih banyak waktu di media sosial dari yang saya rencanakan.",
+    "Y5": "Saya sering membuka media sosial secara otomatis tanpa tujuan yang jelas.",
+}
+
+# ------------------------------------------------------------------
+# DATA LOADING & CLEANING
+# ------------------------------------------------------------------
+FIXED_X_ITEMS = list(FOMO_LABELS_EN.keys())
+FIXED_Y_ITEMS = list(ADDICTION_LABELS_EN.keys())
+
+AGE_KEYWORDS = ("age", "umur")
+GENDER_KEYWORDS = ("gender", "jenis kelamin")
+TIMESTAMP_KEYWORDS = ("timestamp", "stempel waktu")
+
+# Gen Z age groups as inclusive (lowest, highest) ages; labels come from age_group_label()
+AGE_GROUPS = ((13, 18), (19, 23), (24, 28))
+# words that make a single age open-ended ("below 13", "28+") rather than an age
+AGE_OPEN_ENDED = ("<", ">", "≤", "≥", "+", "below", "above", "under", "over", "bawah", "atas", "kurang", "lebih")
+AGE_NUMBER = re.compile(r"\d+(?:[.,]\d+)?")
+
+# Question phrases used to auto-rename Google Forms headers to X1..Y5
+ITEM_PHRASES = {
+    "X1": "anxious if i don't know the latest updates",
+    "X2": "urge to constantly check social media",
+    "X3": "afraid of being left behind when others talk about trending topics",
+    "X4": "need to follow viral trends to stay",
+    "X5": "uncomfortable when i see others participating in activities that i am not part of",
+    "Y1": "difficult to reduce the amount of time i spend on social media",
+    "Y2": "prefer using social media over doing offline activities",
+    "Y3": "disrupts my sleep, study time, or other important activities",
+    "Y4": "spend more time on social media than i originally planned",
+    "Y5": "open social media automatically without any clear purpose",
+}
+
+
+SURVEY_FILE_TYPES = ["csv", "xlsx", "parquet", "feather", "arrow"]
+COLUMNAR_FILE_TYPES = ("parquet", "feather", "arrow")
+
+
+def file_type(filename: str) -> str:
+    """Lower-case extension of an upload name ('xlsx' if unknown)"""
+    ext = str(filename).lower().rsplit(".", 1)[-1]
+    return ext if ext in SURVEY_FILE_TYPES else "xlsx"
+
+
+def read_survey(file_obj, filename: str, sheet_name=None, engine=None) -> pd.DataFrame:
+    """Read an uploaded CSV / Excel / Parquet / Feather survey export.
+
+    CSV files are parsed by ``engine`` (see survey_engine) when given.
+    """
+    ext = file_type(filename)
+    if ext == "csv":
+        return engine.read_csv(file_obj) if engine is not None else pd.read_csv(file_obj)
+    if ext in COLUMNAR_FILE_TYPES:
+        return read_columnar_projected(file_obj, ext)
+    return read_excel_projected(file_obj, sheet_name)
+
+
+def parse_upload(data: bytes, filename: str, sheet_name=None, engine=None) -> pd.DataFrame:
+    """read_survey() through the shared cache (content hash + file type + sheet).
+
+    The returned frame is shared with other sessions; derive new frames from
+    it instead of modifying it in place.
+    """
+    key = (content_hash(data), file_type(filename), sheet_name)
+    return cached("parse", key, lambda: read_survey(io.BytesIO(data), filename, sheet_name, engine))
+
+
+def find_column(columns, keywords):
+    """Return the first column whose lower-cased name contains any keyword"""
+    for col in columns:
+        col_lower = str(col).lower()
+        if any(k in col_lower for k in keywords):
+            return col
+    return None
+
+
+def resolve_survey_columns(columns):
+    """Columns the analysis needs: age, gender, timestamp and the X/Y items.
+
+    Items are matched by code (X1..Y5) or by their question phrase, the same
+    way rename_item_columns() does it later on.
+    """
+    wanted = []
+    for keywords in (AGE_KEYWORDS, GENDER_KEYWORDS, TIMESTAMP_KEYWORDS):
+        col = find_column(columns, keywords)
+        if col is not None:
+            wanted.append(col)
+
+    lower_cols = {c: str(c).lower() for c in columns}
+    for code, phrase in ITEM_PHRASES.items():
+        if code in lower_cols:
+            wanted.append(code)
+            continue
+        for col, col_low in lower_cols.items():
+            if phrase in col_low:
+                wanted.append(col)
+
+    wanted = set(wanted)
+    return [c for c in columns if c in wanted]
+
+
+def list_excel_sheets(file_obj):
+    """Sheet names of an XLSX upload (read-only, no cell parsing)"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_obj, read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+        file_obj.seek(0)
+
+
+def read_excel_projected(file_obj, sheet_name=None) -> pd.DataFrame:
+    """Stream an XLSX sheet and keep only the columns the analysis uses.
+
+    The header row is read first to resolve the age, gender and X/Y columns,
+    then the remaining rows are streamed with openpyxl's read-only reader,
+    limited to the span of those columns. Item columns are converted to
+    numbers and the rest kept as text. If the needed columns cannot be found
+    the whole sheet is returned, so the app can still show the headers.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_obj, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name else wb.active
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        header = [f"Unnamed: {i}" if h is None else h for i, h in enumerate(header)]
+
+        wanted = resolve_survey_columns(header)
+        has_age = find_column(wanted, AGE_KEYWORDS) is not None
+        if not has_age or len(wanted) < 3:
+            # Not a recognisable export: keep every column
+            wanted = header
+
+        positions = [header.index(c) for c in wanted]
+        first, last = min(positions), max(positions)
+        offsets = [p - first for p in positions]
+        columns = {c: [] for c in wanted}
+        appenders = [columns[c].append for c in wanted]
+
+        for row in ws.iter_rows(
+            min_row=2, min_col=first + 1, max_col=last + 1, values_only=True
+        ):
+            if not any(v is not None for v in row):
+                continue
+            n = len(row)
+            for append, off in zip(appenders, offsets):
+                append(row[off] if off < n else None)
+    finally:
+        wb.close()
+
+    item_cols = set(resolve_survey_columns(wanted)) - {
+        find_column(wanted, AGE_KEYWORDS),
+        find_column(wanted, GENDER_KEYWORDS),
+        find_column(wanted, TIMESTAMP_KEYWORDS),
+    }
+    data = {}
+    for col, values in columns.items():
+        if col in item_cols:
+            data[col] = pd.to_numeric(pd.Series(values, dtype="object"), errors="coerce")
+        else:
+            data[col] = pd.Series(values, dtype="object")
+    df = pd.DataFrame(data)
+    df.attrs["source_columns"] = list(header)
+    return df
+
+
+def _survey_columns_to_pandas(table) -> pd.DataFrame:
+    """Arrow table -> DataFrame with the dtypes the analysis code expects.
+
+    Numeric columns become int64 (float64 if they contain blanks) so the
+    frequency tables keep their Likert labels; dictionary / string columns
+    become plain object columns.
+    """
+    df = table.to_pandas()
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(s.dtype):
+            df[col] = s.astype("object")
+        elif pd.api.types.is_integer_dtype(s.dtype) and not s.isna().any():
+            df[col] = s.astype("int64")
+        elif pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+            df[col] = s.astype("float64")
+    return df
+
+
+def read_columnar_projected(file_obj, ext: str) -> pd.DataFrame:
+    """Read a Parquet / Feather (Arrow IPC) file, loading only needed columns.
+
+    The schema is read first; age, gender, X/Y items and, for files written
+    by export_clean_dataset(), Age_Group and X_total / Y_total are loaded.
+    Unrecognised files are read in full.
+    """
+    import pyarrow.feather as feather
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+
+    if ext == "parquet":
+        parquet_file = pq.ParquetFile(file_obj)
+        source_columns = list(parquet_file.schema_arrow.names)
+    else:
+        source_columns = list(ipc.open_file(file_obj).schema.names)
+        file_obj.seek(0)
+
+    wanted = resolve_survey_columns(source_columns)
+    wanted += [c for c in ("Age_Group", "X_total", "Y_total") if c in source_columns and c not in wanted]
+    if find_column(wanted, AGE_KEYWORDS) is None or len(wanted) < 3:
+        wanted = None
+
+    if ext == "parquet":
+        table = parquet_file.read(columns=wanted)
+    else:
+        table = feather.read_table(file_obj, columns=wanted, memory_map=False)
+
+    df = _survey_columns_to_pandas(table)
+    df.attrs["source_columns"] = source_columns
+    return df
+
+
+def export_clean_dataset(df: pd.DataFrame, columns, fmt: str = "parquet") -> bytes:
+    """Serialize the cleaned dataset compactly as Parquet or Feather bytes.
+
+    Likert items are stored as int8 (float32 when they contain blanks) and
+    text columns as dictionary-encoded categories; the file can be uploaded
+    again and is read back with read_columnar_projected().
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    out = pd.DataFrame(index=df.index)
+    for col in columns:
+        if col not in df.columns:
+            continue
+        s = df[col]
+        if col in FIXED_X_ITEMS + FIXED_Y_ITEMS:
+            s = pd.to_numeric(s, errors="coerce")
+            out[col] = s.astype("float32") if s.isna().any() else s.astype("int8")
+        elif pd.api.types.is_numeric_dtype(s.dtype):
+            out[col] = s
+        else:
+            out[col] = s.astype("object").astype("category")
+    out.columns = [str(c) for c in out.columns]
+
+    table = pa.Table.from_pandas(out, preserve_index=False)
+    buffer = io.BytesIO()
+    if fmt == "parquet":
+        pq.write_table(table, buffer, compression="zstd")
+    else:
+        feather.write_feather(table, buffer, compression="zstd")
+    return buffer.getvalue()
+
+
+# Excel sheets hold at most 1,048,576 rows (one is the header)
+XLSX_MAX_ROWS = 1_048_576
+XLSX_CHUNK_ROWS = 50_000
+
+
+def _xlsx_frame_rows(frame: pd.DataFrame, index=True):
+    """Header + body rows of a DataFrame as plain Python values (NaN -> empty)"""
+    if index:
+        frame = frame.reset_index()
+    header = [str(c) for c in frame.columns]
+    body = frame.astype(object).where(frame.notna(), None).to_numpy().tolist()
+    return [header] + body
+
+
+def export_analysis_xlsx(output, sheets, data=None, data_columns=None):
+    """Write analysis tables and the cleaned dataset to an .xlsx workbook.
+
+    ``sheets`` maps sheet name -> list of (title, DataFrame) blocks written
+    one under the other (title may be None). The workbook is written in
+    openpyxl's write-only mode and the dataset is streamed in chunks of
+    XLSX_CHUNK_ROWS rows, continuing on "Data (2)", … past Excel's row
+    limit, so no full workbook model is kept in memory. ``output`` is a
+    path or a binary file object.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    bold = Font(bold=True)
+    wb = Workbook(write_only=True)
+
+    def styled(ws, values):
+        row = []
+        for v in values:
+            cell = WriteOnlyCell(ws, value=v)
+            cell.font = bold
+            row.append(cell)
+        return row
+
+    for sheet_name, blocks in sheets.items():
+        ws = wb.create_sheet(sheet_name[:31])
+        for title, table in blocks:
+            if table is None or table.empty:
+                continue
+            if title:
+                ws.append(styled(ws, [title]))
+            rows = _xlsx_frame_rows(table)
+            ws.append(styled(ws, rows[0]))
+            for row in rows[1:]:
+                ws.append(row)
+            ws.append([])
+
+    if data is not None:
+        columns = [c for c in (data_columns or data.columns) if c in data.columns]
+        data = data[columns]
+        per_sheet = XLSX_MAX_ROWS - 1
+        for part, sheet_start in enumerate(range(0, max(len(data), 1), per_sheet), start=1):
+            ws = wb.create_sheet("Data" if part == 1 else f"Data ({part})")
+            ws.append(styled(ws, [str(c) for c in columns]))
+            sheet_end = min(sheet_start + per_sheet, len(data))
+            for start in range(sheet_start, sheet_end, XLSX_CHUNK_ROWS):
+                chunk = data.iloc[start:min(start + XLSX_CHUNK_ROWS, sheet_end)]
+                for row in _xlsx_frame_rows(chunk, index=False)[1:]:
+                    ws.append(row)
+
+    wb.save(output)
+    return output
+
+
+def association_table(assoc_stats: dict, summary_text: str = "") -> pd.DataFrame:
+    """Scalar fields of an association result as a Metric / Value table"""
+    rows = [
+        (key, value) for key, value in assoc_stats.items()
+        if value is not None and not isinstance(value, (pd.DataFrame, pd.Series, dict, list, tuple))
+    ]
+    if summary_text:
+        rows.append(("summary", summary_text))
+    return pd.DataFrame(rows, columns=["Metric", "Value"]).set_index("Metric")
+
+
+def age_group_label(low, high) -> str:
+    return f"{low}–{high} years / tahun"
+
+
+def parse_age_groups(text):
+    """Age groups from text like "13-18, 19-23, 24-28" (None if unreadable or overlapping)"""
+    groups = []
+    for part in str(text).split(","):
+        numbers = AGE_NUMBER.findall(part)
+        if len(numbers) != 2:
+            return None
+        low, high = sorted(int(float(n.replace(",", "."))) for n in numbers)
+        groups.append((low, high))
+    groups.sort()
+    if not groups or any(a[1] >= b[0] for a, b in zip(groups, groups[1:])):
+        return None
+    return tuple(groups)
+
+
+def _age_label_code(label: str, groups, bins) -> int:
+    """Group index of one age label: "19 - 23 tahun", "13–18 years", "17" …"""
+    text = label.strip().lower()
+    if any(word in text for word in AGE_OPEN_ENDED):
+        return -1
+    numbers = sorted(float(n.replace(",", ".")) for n in AGE_NUMBER.findall(text))
+    if len(numbers) == 1:
+        return int(bins.get_indexer(numbers)[0])
+    if len(numbers) == 2:
+        for k, (low, high) in enumerate(groups):
+            if low <= numbers[0] and numbers[1] <= high:
+                return k
+    return -1
+
+
+def age_group_codes(values: pd.Series, groups=AGE_GROUPS) -> np.ndarray:
+    """Age group index per row, -1 outside the groups or unreadable.
+
+    Each distinct value is classified once (numeric ages binned, label
+    variants normalized) and the result is broadcast through the factorized
+    codes, so the per-row work is a single integer lookup.
+    """
+    codes, uniques = pd.factorize(values)
+    if len(uniques) == 0:
+        return np.full(len(values), -1, dtype=np.int64)
+    bins = pd.IntervalIndex.from_tuples([(low, high + 1) for low, high in groups], closed="left")
+    numeric = pd.to_numeric(pd.Series(np.asarray(uniques, dtype=object)), errors="coerce").to_numpy(dtype=float)
+    lookup = bins.get_indexer(numeric).astype(np.int64)
+    for k in np.flatnonzero(np.isnan(numeric)):
+        lookup[k] = _age_label_code(str(uniques[k]), groups, bins)
+    return np.where(codes >= 0, lookup[codes], -1)
+
+
+def age_group_frame(df: pd.DataFrame, positions, codes, groups=AGE_GROUPS):
+    """Rows at ``positions`` plus the ordered categorical Age_Group from their group ``codes``"""
+    before_clean = len(df)
+    df = df.iloc[positions]
+    labels = [age_group_label(low, high) for low, high in groups]
+    df["Age_Group"] = pd.Categorical.from_codes(
+        codes, categories=labels, ordered=True
+    ).remove_unused_categories()
+    return df, before_clean, len(df)
+
+
+def clean_age(df: pd.DataFrame, age_column, groups=AGE_GROUPS):
+    """Keep Gen Z respondents only and add the ordered categorical Age_Group column"""
+    codes = age_group_codes(df[age_column], groups)
+    keep = np.flatnonzero(codes >= 0)
+    return age_group_frame(df, keep, codes[keep], groups)
+
+
+def rename_item_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Rename full question headers to X1..Y5 if the codes are not present"""
+    if all(c in df.columns for c in FIXED_X_ITEMS + FIXED_Y_ITEMS):
+        return df
+
+    lower_cols = {c: str(c).lower() for c in df.columns}
+    renamed = {}
+    for code, phrase in ITEM_PHRASES.items():
+        phrase_low = phrase.lower()
+        for col, col_low in lower_cols.items():
+            if phrase_low in col_low:
+                renamed[col] = code
+
+    if renamed:
+        df = df.rename(columns=renamed)
+    return df
+
+
+def add_composite_scores(df: pd.DataFrame, x_items, y_items, method: str = "mean"):
+    """Convert items to numeric and add X_total / Y_total.
+
+    ``method`` is 'mean', 'sum' or 'irt' (EAP trait scores from a graded
+    response model fitted per scale, see survey_irt.fit_grm).
+    """
+    df = df.copy()
+    for col in list(x_items) + list(y_items):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    if method == "mean":
+        df["X_total"] = df[x_items].mean(axis=1)
+        df["Y_total"] = df[y_items].mean(axis=1)
+    elif method == "irt":
+        df["X_total"] = fit_grm(df[x_items])["scores"]
+        df["Y_total"] = fit_grm(df[y_items])["scores"]
+    else:
+        df["X_total"] = df[x_items].sum(axis=1)
+        df["Y_total"] = df[y_items].sum(axis=1)
+    return df
+
+
+def demographic_table(counts: pd.Series, label: str, lang_dict):
+    """Frequency / percentage table for a demographic value_counts() series"""
+    t = lang_dict
+    demo_df = pd.DataFrame(
+        {
+            label: counts.index,
+            t["frequency"]: counts.values,
+        }
+    )
+    demo_df[t["percentage"]] = (
+        demo_df[t["frequency"]] / demo_df[t["frequency"]].sum() * 100
+    ).round(2)
+    return demo_df
+
+
+def screening_table(counts: dict, checks, rules, lang_dict):
+    """Flagged respondents per screening check (see survey_quality)"""
+    t = lang_dict
+    labels = t["screen_rule_labels"]
+    return pd.DataFrame(
+        {
+            t["screen_check"]: [labels[c] for c in checks] + [t["screen_any"]],
+            t["screen_flagged"]: [counts[c] for c in checks] + [counts["any"]],
+            t["screen_excluded"]: ["✓" if c in rules else "" for c in checks] + [""],
+        }
+    )
+
+
+# ------------------------------------------------------------------
+# HELPER FUNCTIONS
+# ------------------------------------------------------------------
+def item_frequencies(df: pd.DataFrame, items):
+    """Language-neutral value counts per item, sorted by response value"""
+    return {item: df[item].dropna().value_counts().sort_index() for item in items if item in df.columns}
+
+
+def frequency_table(counts: pd.Series, lang_dict, response_labels=None):
+    """Frequency / percentage table for one item; 1–5 codes get Likert labels"""
+    t = lang_dict
+    perc = (counts / counts.sum() * 100).round(2)
+    freq_table = pd.DataFrame({t["frequency"]: counts, t["percentage"]: perc})
+    if response_labels is not None and freq_table.index.dtype in [int, float] and freq_table.index.max() <= 5:
+        freq_table.index = freq_table.index.map(lambda x: response_labels.get(x, x))
+    return freq_table
+
+
+def describe_columns(data: pd.DataFrame, cols):
+    """Language-neutral descriptive statistics, one row per column"""
+    rows = []
+    for col in cols:
+        if col not in data.columns:
+            continue
+        s = data[col].dropna()
+        if s.empty:
+            continue
+        mode_vals = s.mode()
+        mode_val = mode_vals.iloc[0] if not mode_vals.empty else np.nan
+        rows.append({
+            "variable": col,
+            "N": len(s),
+            "Mean": s.mean(),
+            "Median": s.median(),
+            "Mode": mode_val,
+            "Min": s.min(),
+            "Max": s.max(),
+            "Std Dev": s.std(ddof=1),
+        })
+    if not rows:
+        return pd.DataFrame(columns=["variable", "N", "Mean", "Median", "Mode", "Min", "Max", "Std Dev"]).set_index("variable")
+    return pd.DataFrame(rows).set_index("variable").round(3)
+
+
+def descriptive_table(data: pd.DataFrame, cols, lang_dict):
+    return describe_columns(data, cols).rename_axis(lang_dict["variable"])
+
+
+def normality_test(valid_xy: pd.DataFrame):
+    """Shapiro–Wilk for X_total / Y_total and the recommended correlation key"""
+    shapiro_x = stats.shapiro(valid_xy["X_total"])
+    shapiro_y = stats.shapiro(valid_xy["Y_total"])
+    both_normal = shapiro_x.pvalue >= 0.05 and shapiro_y.pvalue >= 0.05
+    return {
+        "X_total": shapiro_x,
+        "Y_total": shapiro_y,
+        "recommended": "pearson" if both_normal else "spearman",
+    }
+
+
+def normality_table(norm, lang_dict):
+    t = lang_dict
+    cols = ["X_total", "Y_total"]
+    return pd.DataFrame({
+        t["variable"]: cols,
+        t["statistic"]: [norm[c].statistic for c in cols],
+        t["p_value"]: [norm[c].pvalue for c in cols],
+        t["normality"]: [t["normal"] if norm[c].pvalue >= 0.05 else t["not_normal"] for c in cols],
+    }).round(4)
+
+
+def compute_normality(valid_xy: pd.DataFrame, lang_dict):
+    norm = normality_test(valid_xy)
+    return normality_table(norm, lang_dict), lang_dict[norm["recommended"]], (norm["X_total"], norm["Y_total"])
+
+
+def interpret_strength(r, lang_code):
+    a = abs(r)
+    level = int(np.searchsorted([0.2, 0.4, 0.6, 0.8], a, side="right"))
+    return LANGUAGES[lang_code]["strength_levels"][level]
+
+
+def correlation_test(valid_xy: pd.DataFrame, method: str = "pearson"):
+    """Language-neutral X_total–Y_total correlation ('pearson' or 'spearman')"""
+    x_corr = valid_xy["X_total"]
+    y_corr = valid_xy["Y_total"]
+    if method == "pearson":
+        r_value, p_value = stats.pearsonr(x_corr, y_corr)
+    else:
+        r_value, p_value = stats.spearmanr(x_corr, y_corr)
+    return {
+        "type": "correlation",
+        "method": "Pearson" if method == "pearson" else "Spearman",
+        "r": r_value,
+        "p": p_value,
+    }
+
+
+def describe_association(assoc, lang_code):
+    """Localized labels and summary sentence for a correlation / chi-square result.
+
+    Returns (assoc_stats with direction / strength / signif_text added, summary text).
+    """
+    t = LANGUAGES[lang_code]
+    assoc_stats = dict(assoc)
+    signif = t["signif_yes"] if assoc["p"] < 0.05 else t["signif_no"]
+    assoc_stats["signif_text"] = signif
+
+    if assoc["type"] == "correlation":
+        assoc_stats["direction"] = t["direction_positive"] if assoc["r"] > 0 else t["direction_negative"]
+        assoc_stats["strength"] = interpret_strength(assoc["r"], lang_code)
+        text = t["corr_summary"].format(
+            method=assoc["method"],
+            direction=assoc_stats["direction"],
+            strength=assoc_stats["strength"],
+            r=assoc["r"],
+            p=assoc["p"],
+            signif=signif,
+        )
+    elif assoc["method"] == "Chi-square":
+        text = t["chi_summary"].format(signif=signif, **assoc)
+    else:
+        mc = t["chi_mc_detail"].format(**assoc) if assoc["mc_se"] is not None else ""
+        text = t["chi_sparse_summary"].format(signif=signif, mc=mc, **assoc)
+    return assoc_stats, text
+
+
+def compute_correlation(valid_xy: pd.DataFrame, method: str, lang_code: str, lang_dict):
+    method_key = "pearson" if method in ("pearson", lang_dict["pearson"]) else "spearman"
+    return describe_association(correlation_test(valid_xy, method_key), lang_code)
+
+
+SPARSE_LOW_EXPECTED_PCT = 20
+EXACT_MAX_TABLES = 50_000
+MC_DEFAULT_SIMULATIONS = 20_000
+MC_DEFAULT_TIME_BUDGET = 2.0
+
+
+def is_sparse_table(expected) -> bool:
+    """Cochran's rule: >20% of expected counts below 5, or any below 1"""
+    expected = np.asarray(expected, dtype=float)
+    return bool(
+        (expected < 5).mean() * 100 > SPARSE_LOW_EXPECTED_PCT or (expected < 1).any()
+    )
+
+
+def _log_factorials(n: int):
+    return special.gammaln(np.arange(n + 1) + 1.0)
+
+
+def ffh_exact_test(observed, max_tables=EXACT_MAX_TABLES, time_budget=MC_DEFAULT_TIME_BUDGET):
+    """Fisher–Freeman–Halton exact p-value by enumerating tables with fixed margins.
+
+    Returns None when more than ``max_tables`` tables (or ``time_budget``
+    seconds) would be needed; the caller then falls back to Monte Carlo.
+    """
+    observed = np.asarray(observed, dtype=np.int64)
+    row_sums = observed.sum(axis=1)
+    col_sums = observed.sum(axis=0)
+    n = int(observed.sum())
+    lf = _log_factorials(n)
+    const = lf[row_sums].sum() + lf[col_sums].sum() - lf[n]
+    obs_stat = lf[observed].sum()
+    tol = 1e-7 * max(1.0, abs(obs_stat))
+
+    n_rows, n_cols = observed.shape
+    state = {"p": 0.0, "tables": 0}
+    deadline = time.perf_counter() + time_budget
+
+    class _TooLarge(Exception):
+        pass
+
+    def fill_row(i, remaining_cols, acc):
+        if i == n_rows - 1:
+            # Last row is fixed by the remaining column margins
+            stat = acc + lf[remaining_cols].sum()
+            state["tables"] += 1
+            if state["tables"] > max_tables or (
+                state["tables"] % 1000 == 0 and time.perf_counter() > deadline
+            ):
+                raise _TooLarge
+            if stat >= obs_stat - tol:
+                state["p"] += np.exp(const - stat)
+            return
+        fill_cell(i, 0, row_sums[i], remaining_cols, acc)
+
+    def fill_cell(i, j, left, remaining_cols, acc):
+        if j == n_cols - 1:
+            if left > remaining_cols[j]:
+                return
+            new_cols = remaining_cols.copy()
+            new_cols[j] -= left
+            fill_row(i + 1, new_cols, acc + lf[left])
+            return
+        # the rest of the row must still fit into the later columns
+        room_after = remaining_cols[j + 1:].sum()
+        lo = max(0, left - room_after)
+        hi = min(left, remaining_cols[j])
+        for v in range(lo, hi + 1):
+            new_cols = remaining_cols.copy()
+            new_cols[j] -= v
+            fill_cell(i, j + 1, left - v, new_cols, acc + lf[v])
+
+    try:
+        fill_row(0, col_sums.copy(), 0.0)
+    except _TooLarge:
+        return None
+    return min(1.0, state["p"])
+
+
+def ffh_monte_carlo_test(
+    x_codes,
+    y_codes,
+    observed,
+    n_sim=MC_DEFAULT_SIMULATIONS,
+    time_budget=MC_DEFAULT_TIME_BUDGET,
+    seed=None,
+):
+    """Monte Carlo Fisher–Freeman–Halton p-value with fixed margins.
+
+    Tables are simulated in vectorized batches by permuting the Y codes
+    against the X codes (which keeps both margins fixed) and counting the
+    batch with one bincount. Stops after ``n_sim`` tables or ``time_budget``
+    seconds. Returns (p_value, standard_error, n_simulated).
+    """
+    observed = np.asarray(observed, dtype=np.int64)
+    n_rows, n_cols = observed.shape
+    x_codes = np.asarray(x_codes, dtype=np.int64)
+    y_codes = np.asarray(y_codes, dtype=np.int64)
+    n = len(x_codes)
+    lf = _log_factorials(n)
+    obs_stat = lf[observed].sum()
+    tol = 1e-7 * max(1.0, abs(obs_stat))
+
+    rng = np.random.default_rng(seed)
+    batch = int(max(1, min(n_sim, 2_000_000 // max(n, 1))))
+    cells = n_rows * n_cols
+    hits = 0
+    done = 0
+    start = time.perf_counter()
+    while done < n_sim:
+        b = min(batch, n_sim - done)
+        y_perm = rng.permuted(np.broadcast_to(y_codes, (b, n)), axis=1)
+        combined = np.arange(b)[:, None] * cells + x_codes[None, :] * n_cols + y_perm
+        tables = np.bincount(combined.ravel(), minlength=b * cells).reshape(b, cells)
+        hits += int((lf[tables].sum(axis=1) >= obs_stat - tol).sum())
+        done += b
+        if time.perf_counter() - start > time_budget:
+            break
+
+    p_value = (hits + 1) / (done + 1)
+    std_err = float(np.sqrt(p_value * (1 - p_value) / done))
+    return p_value, std_err, done
+
+
+def chi_square_test(
+    df: pd.DataFrame,
+    x_col: str,
+    y_col: str,
+    sparse_method: str = "auto",
+    n_sim: int = MC_DEFAULT_SIMULATIONS,
+    time_budget: float = MC_DEFAULT_TIME_BUDGET,
+    seed=None,
+    engine=None,
+):
+    """Chi-square test of independence between two categorical items.
+
+    With ``sparse_method="auto"`` a table that fails Cochran's rule is tested
+    with Fisher's exact test (2x2), an exact Fisher–Freeman–Halton test when
+    the table space is small enough, or a Monte Carlo FFH test otherwise.
+    ``"monte-carlo"`` forces the simulation, ``"asymptotic"`` keeps the
+    plain chi-square p-value. The result is language-neutral; see
+    describe_association() for the labels and summary text. ``engine``
+    (see survey_engine) builds the contingency table when given.
+    """
+    mask = df[x_col].notna() & df[y_col].notna()
+    x_values = df.loc[mask, x_col]
+    y_values = df.loc[mask, y_col]
+    if engine is not None:
+        contingency = engine.crosstab(df, x_col, y_col)
+    else:
+        contingency = pd.crosstab(x_values, y_values)
+    chi2_value, p_chi, dof, expected = stats.chi2_contingency(contingency)
+
+    sparse = is_sparse_table(expected)
+    low_expected_pct = float((np.asarray(expected) < 5).mean() * 100)
+    test_method = "Chi-square"
+    p_value = p_chi
+    mc_se = None
+    n_simulated = None
+
+    observed = contingency.to_numpy()
+    if sparse_method == "monte-carlo" or (sparse and sparse_method == "auto"):
+        p_exact = None
+        if sparse_method == "auto":
+            if observed.shape == (2, 2):
+                p_exact = stats.fisher_exact(observed).pvalue
+                test_method = "Fisher exact"
+            else:
+                p_exact = ffh_exact_test(observed, time_budget=time_budget / 2)
+                test_method = "Fisher–Freeman–Halton (exact)"
+        if p_exact is not None:
+            p_value = p_exact
+        else:
+            x_codes = pd.Categorical(x_values, categories=contingency.index).codes
+            y_codes = pd.Categorical(y_values, categories=contingency.columns).codes
+            p_value, mc_se, n_simulated = ffh_monte_carlo_test(
+                x_codes, y_codes, observed, n_sim=n_sim, time_budget=time_budget, seed=seed
+            )
+            test_method = "Fisher–Freeman–Halton (Monte Carlo)"
+
+    return {
+        "type": "chi-square",
+        "method": test_method,
+        "chi2": chi2_value,
+        "p": p_value,
+        "p_asymptotic": p_chi,
+        "dof": dof,
+        "x": x_col,
+        "y": y_col,
+        "contingency": contingency,
+        "sparse": sparse,
+        "low_expected_pct": low_expected_pct,
+        "mc_se": mc_se,
+        "n_sim": n_simulated,
+    }
+
+
+def compute_chi_square(df: pd.DataFrame, x_col: str, y_col: str, lang_code: str, lang_dict, **kwargs):
+    """chi_square_test() plus localized labels and summary text"""
+    return describe_association(chi_square_test(df, x_col, y_col, **kwargs), lang_code)
+
+
+def _sum_before(table):
+    """out[i, j] = sum of table[i' < i, j' < j] via a padded 2-D cumsum"""
+    out = np.zeros((table.shape[0] + 1, table.shape[1] + 1))
+    out[1:, 1:] = table.cumsum(axis=0).cumsum(axis=1)
+    return out[:-1, :-1]
+
+
+def ordinal_association_from_table(table):
+    """Gamma, Kendall tau-b / tau-c and Somers' d from an ordered r x c table.
+
+    Concordant (A) and discordant (D) counts for every cell come from four
+    2-D cumulative sums, so the cost is O(r·c) whatever the sample size.
+    Asymptotic standard errors (ASE1) follow Agresti / the SAS FREQ
+    formulas; z and p are the Wald test of each measure against 0.
+    """
+    n_ij = np.asarray(table, dtype=float)
+    n = n_ij.sum()
+    rows = n_ij.sum(axis=1)
+    cols = n_ij.sum(axis=0)
+
+    upper_left = _sum_before(n_ij)
+    lower_right = _sum_before(n_ij[::-1, ::-1])[::-1, ::-1]
+    upper_right = _sum_before(n_ij[:, ::-1])[:, ::-1]
+    lower_left = _sum_before(n_ij[::-1, :])[::-1, :]
+    A = upper_left + lower_right
+    D = upper_right + lower_left
+    P = (n_ij * A).sum()
+    Q = (n_ij * D).sum()
+    d_ij = A - D
+
+    w_r = n ** 2 - (rows ** 2).sum()
+    w_c = n ** 2 - (cols ** 2).sum()
+    w = np.sqrt(w_r * w_c)
+    m = min(n_ij.shape)
+
+    def _nan_div(a, b):
+        return a / b if b > 0 else np.nan
+
+    gamma = _nan_div(P - Q, P + Q)
+    ase_gamma = _nan_div(4 * np.sqrt((n_ij * (Q * A - P * D) ** 2).sum()), (P + Q) ** 2)
+
+    tau_b = _nan_div(P - Q, w)
+    v_ij = rows[:, None] * w_c + cols[None, :] * w_r
+    var_b = (n_ij * (2 * w * d_ij + tau_b * v_ij) ** 2).sum() - n ** 3 * tau_b ** 2 * (w_r + w_c) ** 2
+    ase_tau_b = _nan_div(np.sqrt(max(var_b, 0.0)), w ** 2)
+
+    tau_c = _nan_div(m * (P - Q), n ** 2 * (m - 1)) if m > 1 else np.nan
+    var_c = (n_ij * d_ij ** 2).sum() - (P - Q) ** 2 / n if n > 0 else np.nan
+    ase_tau_c = _nan_div(2 * m * np.sqrt(max(var_c, 0.0)), (m - 1) * n ** 2) if m > 1 else np.nan
+
+    d_cr = _nan_div(P - Q, w_r)
+    ase_d_cr = _nan_div(2 * np.sqrt((n_ij * (w_r * d_ij - (P - Q) * (n - rows[:, None])) ** 2).sum()), w_r ** 2)
+    d_rc = _nan_div(P - Q, w_c)
+    ase_d_rc = _nan_div(2 * np.sqrt((n_ij * (w_c * d_ij - (P - Q) * (n - cols[None, :])) ** 2).sum()), w_c ** 2)
+
+    results = {}
+    for name, value, ase in [
+        ("Goodman–Kruskal gamma", gamma, ase_gamma),
+        ("Kendall tau-b", tau_b, ase_tau_b),
+        ("Kendall tau-c", tau_c, ase_tau_c),
+        ("Somers' d (C|R)", d_cr, ase_d_cr),
+        ("Somers' d (R|C)", d_rc, ase_d_rc),
+    ]:
+        z = value / ase if ase and ase > 0 else np.nan
+        p = 2 * stats.norm.sf(abs(z)) if np.isfinite(z) else np.nan
+        results[name] = {"value": value, "ase": ase, "z": z, "p": p}
+    results["concordant_pairs"] = P / 2
+    results["discordant_pairs"] = Q / 2
+    return results
+
+
+def compute_ordinal_association(df: pd.DataFrame, x_col: str, y_col: str, lang_dict):
+    """Ordinal association table for two ordered variables (items or totals).
+
+    Somers' d (C|R) treats ``y_col`` as dependent on ``x_col``.
+    """
+    t = lang_dict
+    mask = df[x_col].notna() & df[y_col].notna()
+    table = pd.crosstab(df.loc[mask, x_col], df.loc[mask, y_col])
+    res = ordinal_association_from_table(table.to_numpy())
+    rows = []
+    for name in ["Goodman–Kruskal gamma", "Kendall tau-b", "Kendall tau-c", "Somers' d (C|R)", "Somers' d (R|C)"]:
+        r = res[name]
+        rows.append({
+            "Measure": name,
+            "Value": r["value"],
+            "ASE": r["ase"],
+            "z": r["z"],
+            t["p_value"]: r["p"],
+        })
+    return pd.DataFrame(rows).set_index("Measure").round(4), res
+
+
+def encode_categories(df: pd.DataFrame, cols):
+    """Encode columns as integer codes in one pass.
+
+    Returns (codes, levels): codes is an (n, k) int array where 0 means
+    missing and 1..L are the sorted category levels of each column.
+    """
+    codes = np.zeros((len(df), len(cols)), dtype=np.int64)
+    levels = []
+    for j, col in enumerate(cols):
+        col_codes, uniques = pd.factorize(df[col], sort=True)
+        codes[:, j] = col_codes + 1
+        levels.append(list(uniques))
+    return codes, levels
+
+
+def batched_contingency(codes: np.ndarray, pairs, n_levels: int, chunk_cells: int = 20_000_000):
+    """Contingency tables for many column pairs with a single bincount per chunk.
+
+    Each pair's combined code ``pair * L² + a * L + b`` (L = n_levels + 1,
+    code 0 = missing) is counted at once; the missing row/column is dropped
+    afterwards. Returns an array of shape (n_pairs, n_levels, n_levels).
+    """
+    n = codes.shape[0]
+    L = n_levels + 1
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    tables = np.zeros((len(pairs), L, L), dtype=np.int64)
+    step = max(1, chunk_cells // max(n, 1))
+    for start in range(0, len(pairs), step):
+        chunk = pairs[start:start + step]
+        offsets = np.arange(len(chunk), dtype=np.int64)[:, None] * (L * L)
+        combined = offsets + codes[:, chunk[:, 0]].T * L + codes[:, chunk[:, 1]].T
+        counts = np.bincount(combined.ravel(), minlength=len(chunk) * L * L)
+        tables[start:start + len(chunk)] = counts.reshape(len(chunk), L, L)
+    return tables[:, 1:, 1:]
+
+
+def chi_square_from_tables(tables: np.ndarray):
+    """Vectorized Pearson chi-square for a stack of contingency tables.
+
+    Empty rows/columns are ignored (as if the table were cropped), Yates'
+    correction is applied to 2x2 tables like stats.chi2_contingency.
+    """
+    tables = tables.astype(float)
+    n = tables.sum(axis=(1, 2))
+    row = tables.sum(axis=2)
+    col = tables.sum(axis=1)
+    n_safe = np.where(n > 0, n, 1.0)
+    expected = row[:, :, None] * col[:, None, :] / n_safe[:, None, None]
+
+    r = (row > 0).sum(axis=1)
+    c = (col > 0).sum(axis=1)
+    dof = np.maximum((r - 1) * (c - 1), 0)
+
+    diff = np.abs(tables - expected)
+    yates = (dof == 1)[:, None, None]
+    diff = np.where(yates, np.maximum(diff - 0.5, 0.0), diff)
+    used = expected > 0
+    contrib = np.where(used, diff ** 2 / np.where(used, expected, 1.0), 0.0)
+    chi2 = contrib.sum(axis=(1, 2))
+    p = np.where(dof > 0, stats.chi2.sf(chi2, np.maximum(dof, 1)), np.nan)
+
+    k = np.minimum(r, c) - 1
+    # Cramér's V uses the uncorrected statistic
+    raw = np.where(used, (tables - expected) ** 2 / np.where(used, expected, 1.0), 0.0).sum(axis=(1, 2))
+    cramers_v = np.where((k > 0) & (n > 0), np.sqrt(raw / (n_safe * np.maximum(k, 1))), np.nan)
+
+    n_cells = np.maximum(r * c, 1)
+    low_expected = (used & (expected < 5)).sum(axis=(1, 2)) / n_cells * 100
+    min_expected = np.where(used, expected, np.inf).min(axis=(1, 2))
+    return {
+        "n": n.astype(int),
+        "chi2": chi2,
+        "dof": dof,
+        "p": p,
+        "cramers_v": cramers_v,
+        "low_expected_pct": low_expected,
+        "min_expected": min_expected,
+    }
+
+
+def compute_chi_square_matrix(df: pd.DataFrame, items, extra_cols=()):
+    """Chi-square, p, Cramér's V and expected-count warnings for all pairs.
+
+    Pairs are every two items plus each item against the ``extra_cols``
+    (e.g. Age_Group and gender). Returns (results, v_matrix): a long table
+    sorted by Cramér's V and a square Cramér's V matrix for the heatmap.
+    """
+    items = [c for c in items if c in df.columns]
+    extra_cols = [c for c in extra_cols if c is not None and c in df.columns]
+    cols = items + extra_cols
+    if len(items) < 1 or len(cols) < 2:
+        return pd.DataFrame(), pd.DataFrame()
+
+    codes, levels = encode_categories(df, cols)
+    n_levels = max(1, max(len(lv) for lv in levels))
+
+    pairs = [(i, j) for i in range(len(items)) for j in range(i + 1, len(items))]
+    pairs += [(i, len(items) + e) for e in range(len(extra_cols)) for i in range(len(items))]
+    if not pairs:
+        return pd.DataFrame(), pd.DataFrame()
+
+    tables = batched_contingency(codes, pairs, n_levels)
+    res = chi_square_from_tables(tables)
+
+    low = (res["low_expected_pct"] > 20) | (res["min_expected"] < 1)
+    results = pd.DataFrame(
+        {
+            "Var 1": [cols[i] for i, _ in pairs],
+            "Var 2": [cols[j] for _, j in pairs],
+            "N": res["n"],
+            "χ²": res["chi2"],
+            "dof": res["dof"],
+            "p-value": res["p"],
+            "Cramér's V": res["cramers_v"],
+            "Expected < 5 (%)": res["low_expected_pct"],
+            "Warning": np.where(low, "⚠", ""),
+        }
+    ).round(4)
+    results = results.sort_values("Cramér's V", ascending=False).reset_index(drop=True)
+
+    v_matrix = pd.DataFrame(np.nan, index=cols, columns=cols)
+    for (i, j), v in zip(pairs, res["cramers_v"]):
+        v_matrix.iat[i, j] = v
+        v_matrix.iat[j, i] = v
+    for i in range(len(cols)):
+        v_matrix.iat[i, i] = 1.0
+    return results, v_matrix.round(3)
+
+
+# ------------------------------------------------------------------
+# PDF REPORT
+# ------------------------------------------------------------------
+PDF_CHART_DPI = 100
+PDF_TABLE_STYLE = TableStyle(
+    [
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("ALIGN", (1, 1), (-1, -1), "CENTER"),
+    ]
+)
+
+
+class ChartImage(Flowable):
+    """Matplotlib chart that is only rendered when reportlab places it.
+
+    ``draw_chart(fig)`` fills a fresh Figure; the PNG is drawn on the page
+    and both are dropped straight away, so a report never holds more than
+    one chart in memory. With a ``cache_key`` the PNG bytes are kept in the
+    shared cache and reused by later reports (e.g. the other language).
+    """
+
+    def __init__(self, draw_chart, figsize, width=400, height=250, dpi=PDF_CHART_DPI, cache_key=None):
+        super().__init__()
+        self.draw_chart = draw_chart
+        self.cache_key = cache_key
+        self.figsize = figsize
+        self.width = width
+        self.height = height
+        self.dpi = dpi
+
+    def wrap(self, avail_width, avail_height):
+        return self.width, self.height
+
+    def render(self) -> bytes:
+        # Figure without pyplot: no global state, nothing to close
+        fig = Figure(figsize=self.figsize)
+        self.draw_chart(fig)
+        fig.tight_layout()
+        png = io.BytesIO()
+        fig.savefig(png, format="png", dpi=self.dpi, bbox_inches="tight")
+        return png.getvalue()
+
+    def draw(self):
+        if self.cache_key is None:
+            png = self.render()
+        else:
+            png = cached("pdf_chart", self.cache_key + (self.figsize, self.dpi), self.render)
+        self.canv.drawImage(ImageReader(io.BytesIO(png)), 0, 0, width=self.width, height=self.height)
+
+
+def localized_report_inputs(
+    lang_code, norm, assoc, age_counts, gender_counts, desc_items, desc_comp, screening=None, regression=None
+):
+    """Language-specific tables and summary text for generate_pdf_report().
+
+    Everything is derived from language-neutral results (normality_test(),
+    correlation_test() / chi_square_test(), describe_columns()), so reports in
+    several languages share one set of computations. ``screening`` holds the
+    screening counts, checks, excluded rules and before / after sizes;
+    ``regression`` is a survey_regression.fit_regression() result.
+    """
+    t = LANGUAGES[lang_code]
+    if norm is not None:
+        result_norm = normality_table(norm, t)
+    else:
+        result_norm = pd.DataFrame(columns=[t["variable"], t["statistic"], t["p_value"], t["normality"]])
+    regression_inputs = None
+    if regression is not None:
+        coefficients, anova = regression_tables(regression, t)
+        references = ", ".join(f"{k} = {v}" for k, v in regression["references"].items())
+        regression_inputs = {
+            "coefficients": coefficients,
+            "anova": anova,
+            "summary": regression_summary(regression, t),
+            "reference": t["reg_reference"].format(references),
+        }
+    return {
+        "t": t,
+        "age_demo_df": demographic_table(age_counts, t["age_group"], t),
+        "gender_demo_df": demographic_table(gender_counts, "Gender", t) if gender_counts is not None else None,
+        "result_norm": result_norm,
+        "desc_items": desc_items.rename_axis(t["variable"]),
+        "desc_comp": desc_comp.rename_axis(t["variable"]),
+        "assoc_summary_text": describe_association(assoc, lang_code)[1] if assoc else "",
+        "quality": None if screening is None else {
+            "table": screening_table(screening["counts"], screening["checks"], screening["rules"], t),
+            "before": screening["before"],
+            "after": screening["after"],
+        },
+        "regression": regression_inputs,
+    }
+
+
+def pdf_table(df_table: pd.DataFrame):
+    """LongTable of a DataFrame (index as first column) with a repeating header row"""
+    df_reset = df_table.reset_index()
+    table_data = [df_reset.columns.tolist()] + df_reset.values.tolist()
+    tbl = LongTable(table_data, repeatRows=1)
+    tbl.setStyle(PDF_TABLE_STYLE)
+    return tbl
+
+
+def generate_pdf_report(
+    lang_code,
+    t,
+    pdf_filename,
+    before_clean,
+    after_clean,
+    age_demo_df,
+    gender_demo_df,
+    result_norm,
+    desc_items,
+    desc_comp,
+    assoc_summary_text,
+    age_counts,
+    df,
+    x_items,
+    y_items,
+    valid_xy,
+    include_items,
+    include_comp,
+    include_corr,
+    include_demo,
+    include_normality,
+    include_freq_plot,
+    include_stacked_plot,
+    include_hist_x_plot,
+    include_hist_y_plot,
+    include_scatter_plot,
+    include_age_plot,
+    quality=None,
+    regression=None,
+    kde=False,
+    violin=False,
+    age_groups=AGE_GROUPS,
+    progress=None,
+    output_path=None,
+):
+    """Build PDF and return (filename, bytes, error).
+
+    ``quality`` and ``regression`` (see localized_report_inputs()) add the
+    data-quality screening and the regression / ANCOVA sections; ``kde``
+    draws density curves on the histograms and ``violin`` adds violin plots
+    of the composites by age group. ``age_groups`` are the (low, high) groups
+    the age filter kept, as passed to clean_age().
+
+    Charts are rendered one at a time while the document is laid out (see
+    ChartImage). With ``output_path`` the PDF is written straight to that
+    file and the path is returned instead of the bytes.
+    ``progress(fraction, stage)`` is called while the report is assembled
+    and built (used by the background PDF job).
+    """
+    styles = getSampleStyleSheet()
+    story = []
+
+    def report(fraction, stage):
+        if progress is not None:
+            progress(fraction, stage)
+
+    report(0.0, t["pdf_stage_tables"])
+
+    safe_filename = "".join(c for c in pdf_filename if c.isalnum() or c in (" ", "_")).rstrip()
+    final_filename = (safe_filename if safe_filename else "Laporan_Analisis") + ".pdf"
+
+    buffer = output_path if output_path is not None else io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+
+    def add_table(title, df_table):
+        if df_table is None or df_table.empty:
+            return
+        story.append(Paragraph(title, styles["Heading3"]))
+        story.append(pdf_table(df_table))
+        story.append(Spacer(1, 10))
+
+    def add_frequency_table(item_name, freq_table):
+        """Add frequency table for a single item"""
+        if freq_table is None or freq_table.empty:
+            return
+        story.append(Paragraph(t["pdf_freq_table"].format(item_name), styles["Heading4"]))
+        story.append(pdf_table(freq_table))
+        story.append(Spacer(1, 8))
+
+    def add_plot(draw_chart, title_text, figsize, cache_key=None, width=400, height=250):
+        story.append(Paragraph(title_text, styles["Heading4"]))
+        story.append(ChartImage(draw_chart, figsize, width, height, cache_key=cache_key))
+        story.append(Spacer(1, 10))
+
+    story.append(Paragraph(t["pdf_title"], styles["Title"]))
+    story.append(Spacer(1, 12))
+    story.append(Paragraph(t["pdf_subtitle"], styles["Heading2"]))
+    story.append(Spacer(1, 8))
+    story.append(Paragraph(t["pdf_members"], styles["Heading3"]))
+    story.append(
+        Paragraph(
+            "- Delon Raphael Andianto (004202200050)<br/>"
+            "- Kallista Viasta (004202200039)<br/>"
+            "- Nabila Putri Amalia (004202200049)<br/>"
+            "- Pingkan R G Lumingkewas (004202200035)",
+            styles["Normal"],
+        )
+    )
+    story.append(Spacer(1, 12))
+
+    story.append(Paragraph(t["pdf_cleaning_title"], styles["Heading3"]))
+    group_ranges = [f"{low}–{high}" for low, high in age_groups]
+    if len(group_ranges) > 1:
+        group_ranges = [", ".join(group_ranges[:-1]) + f" {t['pdf_or']} " + group_ranges[-1]]
+    cleaning_text = t["pdf_cleaning_text"].format(
+        groups=group_ranges[0], low=age_groups[0][0], high=age_groups[-1][1]
+    )
+    story.append(Paragraph(cleaning_text, styles["Normal"]))
+    story.append(Spacer(1, 8))
+    story.append(
+        Paragraph(
+            t["pdf_respondents"].format(
+                before=before_clean, after=after_clean, removed=before_clean - after_clean
+            ),
+            styles["Normal"],
+        )
+    )
+    story.append(Spacer(1, 12))
+
+    if quality is not None:
+        story.append(Paragraph(t["pdf_quality_title"], styles["Heading3"]))
+        story.append(Paragraph(t["pdf_quality_text"], styles["Normal"]))
+        story.append(Spacer(1, 8))
+        story.append(Paragraph(t["pdf_quality_counts"].format(quality["before"], quality["after"]), styles["Normal"]))
+        story.append(Spacer(1, 8))
+        story.append(pdf_table(quality["table"].set_index(quality["table"].columns[0])))
+        story.append(Spacer(1, 12))
+
+    # Tables - Ensure data exists
+    if include_normality and result_norm is not None and not result_norm.empty:
+        add_table(t["pdf_normality"], result_norm)
+
+    if include_demo:
+        if age_demo_df is not None and not age_demo_df.empty:
+            add_table(t["pdf_demo_age"], age_demo_df)
+        if gender_demo_df is not None and not gender_demo_df.empty:
+            add_table(t["pdf_demo_gender"], gender_demo_df)
+
+    if include_items and desc_items is not None and not desc_items.empty:
+        add_table(t["pdf_desc_items"], desc_items)
+
+    if include_comp and desc_comp is not None and not desc_comp.empty:
+        add_table(t["pdf_desc_comp"], desc_comp)
+
+    # Add frequency tables for all items
+    if include_items:
+        story.append(Paragraph(t["pdf_freq_tables"], styles["Heading3"]))
+        story.append(Spacer(1, 10))
+        
+        all_items_list = list(x_items) + list(y_items)
+        for var in all_items_list:
+            if var not in df.columns:
+                continue
+            s_freq = df[var].dropna()
+            if s_freq.empty:
+                continue
+            freq = s_freq.value_counts().sort_index()
+            perc = (freq / freq.sum() * 100).round(2)
+            freq_table = pd.DataFrame({t["frequency"]: freq, t["percentage"]: perc})
+            
+            # Add response labels if applicable
+            if freq_table.index.dtype in [int, float] and freq_table.index.max() <= 5:
+                # Create a copy with labeled index for display
+                freq_table_display = freq_table.copy()
+                response_labels = RESPONSE_LABELS[lang_code]
+                labeled_index = freq_table.index.map(lambda x: response_labels.get(x, x))
+                freq_table_display.index = labeled_index
+                freq_table_display.index.name = t["pdf_response"]
+            else:
+                freq_table_display = freq_table
+            
+            add_frequency_table(var, freq_table_display)
+
+    if include_corr and assoc_summary_text:
+        story.append(Paragraph(t["pdf_assoc"], styles["Heading3"]))
+        story.append(Paragraph(assoc_summary_text, styles["Normal"]))
+        story.append(Spacer(1, 10))
+
+    if regression is not None:
+        story.append(Paragraph(t["pdf_regression_title"], styles["Heading3"]))
+        story.append(Paragraph(t["pdf_regression_text"], styles["Normal"]))
+        story.append(Spacer(1, 8))
+        story.append(Paragraph(regression["summary"], styles["Normal"]))
+        story.append(Paragraph(regression["reference"], styles["Normal"]))
+        story.append(Spacer(1, 8))
+        story.append(pdf_table(regression["coefficients"]))
+        story.append(Spacer(1, 8))
+        story.append(pdf_table(regression["anova"]))
+        story.append(Spacer(1, 12))
+
+    # Visualizations - each chart is a draw function, rendered during the build.
+    # Axis labels and titles are localized, so rendered PNGs are cached per
+    # report language (lang_code is appended to every chart cache key).
+    charts = []
+
+    # Age bar
+    if include_age_plot and age_counts is not None and not age_counts.empty:
+        def draw_age(fig):
+            ax = fig.subplots()
+            age_counts.plot(kind="bar", ax=ax, color="skyblue", edgecolor="black")
+            ax.set_title(t["pdf_age_chart"])
+            ax.set_xlabel(t["age_group"])
+            ax.set_ylabel(t["frequency"])
+
+        charts.append((draw_age, t["pdf_age_chart"], (6, 4), ("age", content_hash(age_counts))))
+
+    # Per-item frequency plots
+    all_items_list = list(x_items) + list(y_items)
+    if include_freq_plot and all_items_list:
+        for var in all_items_list:
+            if var not in df.columns or df[var].dropna().empty:
+                continue
+            bar_title = t["pdf_freq_chart"].format(var)
+
+            def draw_bar(fig, var=var, bar_title=bar_title):
+                freq = df[var].dropna().value_counts().sort_index()
+                ax = fig.subplots()
+                ax.bar(freq.index.astype(str), freq.values)
+                ax.set_title(bar_title)
+                ax.set_xlabel(var)
+                ax.set_ylabel(t["frequency"])
+
+            charts.append((draw_bar, bar_title, (5, 3), ("item", content_hash(df[var]))))
+
+    # Stacked bar (percentage)
+    if include_stacked_plot and all_items_list:
+        # Ensure we only use available columns
+        available_items = [item for item in all_items_list if item in df.columns]
+        if available_items:
+            def draw_stacked(fig):
+                freq_data = df[available_items].apply(lambda x: x.value_counts(normalize=True)).T * 100
+                freq_data = freq_data.fillna(0).sort_index()
+                for i in range(1, 6):
+                    if i not in freq_data.columns:
+                        freq_data[i] = 0.0
+                freq_data = freq_data.sort_index(axis=1)
+
+                ax = fig.subplots()
+                freq_data.plot(
+                    kind="bar",
+                    stacked=True,
+                    ax=ax,
+                    color=matplotlib.colormaps["RdYlBu"](np.linspace(0.1, 0.9, 5)),
+                )
+                ax.set_title(t["pdf_stacked_chart"])
+                ax.set_xlabel(t["survey_item"])
+                ax.set_ylabel(t["percentage"])
+                ax.legend(title=t["response_score"], bbox_to_anchor=(1.05, 1), loc="upper left")
+
+            charts.append((draw_stacked, t["pdf_stacked_chart"], (8, 5), ("stacked", content_hash(df[available_items]))))
+
+    # Histograms X_total / Y_total
+    for include_hist, col, color, label in (
+        (include_hist_x_plot, "X_total", "lightcoral", t["x_total_score"]),
+        (include_hist_y_plot, "Y_total", "lightgreen", t["y_total_score"]),
+    ):
+        if include_hist and valid_xy is not None and col in valid_xy.columns:
+
+            def draw_hist(fig, col=col, color=color, label=label):
+                ax = fig.subplots()
+                values = valid_xy[col].dropna()
+                _, edges, _ = ax.hist(values, bins=10, edgecolor="black", color=color)
+                if kde:
+                    density = group_densities(values)
+                    if density["labels"]:
+                        scale = len(values) * np.diff(edges).mean()
+                        ax.plot(density["grid"], density["density"][0] * scale, color="black", linewidth=1.5)
+                ax.set_title(f"Histogram {col}")
+                ax.set_xlabel(label)
+                ax.set_ylabel(t["frequency"])
+
+            charts.append(
+                (draw_hist, f"Histogram {col}", (6, 4), ("hist", content_hash(valid_xy[col]), color, kde))
+            )
+
+    # Violins of X_total / Y_total by age group (binned FFT densities)
+    if violin and valid_xy is not None and df is not None and "Age_Group" in df.columns:
+        score_groups = df.loc[valid_xy.index, "Age_Group"]
+
+        def draw_violins(fig):
+            axes = fig.subplots(1, 2)
+            for ax, col, color, label in zip(
+                axes, ("X_total", "Y_total"), ("lightcoral", "lightgreen"), (t["x_total_score"], t["y_total_score"])
+            ):
+                density = group_densities(valid_xy[col], score_groups)
+                for k, label in enumerate(density["labels"]):
+                    half = density["density"][k] / density["density"][k].max() * 0.45
+                    ax.fill_betweenx(density["grid"], k - half, k + half, color=color, edgecolor="black")
+                    q25, median, q75 = density["quartiles"][k]
+                    ax.vlines(k, q25, q75, color="black", linewidth=4)
+                    ax.scatter([k], [median], color="white", zorder=3, s=12)
+                ax.set_xticks(range(len(density["labels"])))
+                ax.set_xticklabels([label.split(" ")[0] for label in density["labels"]])
+                ax.set_xlabel(t["age_group"])
+                ax.set_ylabel(label)
+            fig.suptitle(t["pdf_violin_chart"])
+
+        charts.append(
+            (draw_violins, t["pdf_violin_chart"], (8, 4), ("violin", content_hash(valid_xy), content_hash(score_groups)))
+        )
+
+    # Scatter
+    if include_scatter_plot and valid_xy is not None and {"X_total", "Y_total"}.issubset(valid_xy.columns):
+
+        def draw_scatter(fig):
+            ax = fig.subplots()
+            ax.scatter(valid_xy["X_total"], valid_xy["Y_total"], alpha=0.7)
+            z = np.polyfit(valid_xy["X_total"], valid_xy["Y_total"], 1)
+            p_line = np.poly1d(z)
+            x_line = np.linspace(valid_xy["X_total"].min(), valid_xy["X_total"].max(), 100)
+            ax.plot(x_line, p_line(x_line), color="red", linestyle="--")
+            ax.set_title("Scatterplot X_total vs Y_total")
+            ax.set_xlabel(t["x_total_score"])
+            ax.set_ylabel(t["y_total_score"])
+
+        charts.append((draw_scatter, "Scatterplot X_total vs Y_total", (6, 4), ("scatter", content_hash(valid_xy))))
+
+    # Add visualizations section if any plot exists
+    if charts:
+        story.append(Paragraph(t["pdf_visualizations"], styles["Heading2"]))
+        story.append(Spacer(1, 10))
+        for draw_chart, title, figsize, cache_key in charts:
+            add_plot(draw_chart, title, figsize, cache_key + (lang_code,))
+
+    # Build PDF
+    report(0.05, t["pdf_stage_build"])
+    n_flowables = [max(len(story), 1)]
+
+    def on_build_progress(kind, value):
+        if kind == "SIZE_EST":
+            n_flowables[0] = max(value, 1)
+        elif kind == "PROGRESS":
+            report(0.05 + 0.95 * min(value / n_flowables[0], 1.0), t["pdf_stage_build"])
+
+    doc.setProgressCallBack(on_build_progress)
+    try:
+        doc.build(story)
+        if output_path is not None:
+            return final_filename, output_path, None
+        return final_filename, buffer.getvalue(), None
+    except Exception as e:
+        return final_filename, None, str(e)
@@ -0,0 +1,480 @@
+"""Incremental analysis of a survey export that keeps growing.
+
+A form that stays open for weeks only ever gains rows at the end of its
+export. IncrementalSurvey watches one local file and keeps a watermark of
+what it has already ingested, so a refresh only reads, cleans and scores
+the new rows and merges them into running aggregates:
+
+- raw / age-cleaned respondent counts and age-group counts
+- count, mean and variance of every item and composite (Welford's update,
+  merged batch-wise with Chan's formula)
+- the co-moment matrix of complete rows (Pearson correlations)
+- answer frequencies per item and the pairwise item contingency tables
+  (chi-square tests)
+
+The watermark is the byte offset after the last complete CSV line plus a
+hash of the bytes just before it, so a refresh seeks straight to the new
+data. Excel / Parquet / Feather files cannot be read from an offset: they
+are reread, and the row count plus the hash of the last ingested row
+decide which rows are new. If the watermark no longer matches (the file
+was replaced or edited), the state starts again from row one.
+
+Screening and IRT scoring look at all respondents at once, so incremental
+mode uses mean / sum composites and no screening. The state is stored on
+disk after every refresh and picked up again by the next process.
+
+Usage:
+    python survey_incremental.py responses.csv --interval 60
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from survey_helpers import (
+    AGE_GROUPS,
+    AGE_KEYWORDS,
+    FIXED_X_ITEMS,
+    FIXED_Y_ITEMS,
+    TIMESTAMP_KEYWORDS,
+    add_composite_scores,
+    age_group_label,
+    clean_age,
+    file_type,
+    find_column,
+    read_survey,
+    rename_item_columns,
+)
+
+STATE_VERSION = 1
+STATE_DIR = os.environ.get("SURVEY_STATE_DIR", os.path.join(os.path.expanduser("~"), ".survey_incremental"))
+INCREMENTAL_METHODS = ("mean", "sum")
+RESPONSE_LEVELS = (1, 2, 3, 4, 5)
+TAIL_BYTES = 4096
+TABLE_BLOCK_ROWS = 50_000
+
+
+class IncrementalError(Exception):
+    """Watched file is missing or cannot be analysed incrementally"""
+
+
+# ------------------------------------------------------------------
+# RUNNING AGGREGATES
+# ------------------------------------------------------------------
+class RunningMoments:
+    """Per-column count / mean / M2 and the co-moment matrix of complete rows.
+
+    Batches are merged with Chan's parallel form of Welford's update, so the
+    aggregates never need the rows that were already ingested.
+    """
+
+    def __init__(self, columns):
+        k = len(columns)
+        self.columns = list(columns)
+        self.n = np.zeros(k)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.n_complete = 0
+        self.complete_mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+    def update(self, values: np.ndarray):
+        valid = ~np.isnan(values)
+        n_b = valid.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_b = np.where(n_b > 0, np.nansum(values, axis=0) / n_b, 0.0)
+            m2_b = np.nansum((values - mean_b) ** 2, axis=0)
+            n = self.n + n_b
+            delta = mean_b - self.mean
+            self.mean = np.where(n > 0, self.mean + delta * n_b / n, self.mean)
+            self.m2 = self.m2 + m2_b + np.where(n > 0, delta ** 2 * self.n * n_b / n, 0.0)
+        self.n = n
+
+        rows = values[valid.all(axis=1)]
+        if len(rows):
+            n_b = len(rows)
+            mean_b = rows.mean(axis=0)
+            centered = rows - mean_b
+            n = self.n_complete + n_b
+            delta = mean_b - self.complete_mean
+            self.comoment += centered.T @ centered + np.outer(delta, delta) * self.n_complete * n_b / n
+            self.complete_mean += delta * n_b / n
+            self.n_complete = n
+
+    def variance(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.n > 1, self.m2 / (self.n - 1), np.nan)
+
+    def correlation(self) -> np.ndarray:
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.comoment / np.outer(scale, scale)
+
+    def to_dict(self):
+        return {
+            "columns": self.columns,
+            "n": self.n.tolist(),
+            "mean": self.mean.tolist(),
+            "m2": self.m2.tolist(),
+            "n_complete": self.n_complete,
+            "complete_mean": self.complete_mean.tolist(),
+            "comoment": self.comoment.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        moments = cls(data["columns"])
+        moments.n = np.array(data["n"], dtype=float)
+        moments.mean = np.array(data["mean"], dtype=float)
+        moments.m2 = np.array(data["m2"], dtype=float)
+        moments.n_complete = int(data["n_complete"])
+        moments.complete_mean = np.array(data["complete_mean"], dtype=float)
+        moments.comoment = np.array(data["comoment"], dtype=float)
+        return moments
+
+
+class RunningTables:
+    """Answer counts per item and the contingency table of every item pair"""
+
+    def __init__(self, items, levels=RESPONSE_LEVELS):
+        self.items = list(items)
+        self.levels = tuple(levels)
+        j, k = len(self.items), len(self.levels)
+        self.item_counts = np.zeros((j, k), dtype=np.int64)
+        self.pair_counts = np.zeros((j, j, k, k), dtype=np.int64)
+
+    def update(self, values: np.ndarray):
+        # one-hot answers (missing / off-scale rows are all zero), then one einsum for all pairs
+        onehot = np.stack([values == level for level in self.levels], axis=2).astype(np.int64)
+        self.item_counts += onehot.sum(axis=0)
+        self.pair_counts += np.einsum("nja,nkb->jkab", onehot, onehot)
+
+    def frequencies(self, item) -> pd.Series:
+        counts = pd.Series(self.item_counts[self.items.index(item)], index=list(self.levels), name="count")
+        return counts[counts > 0]
+
+    def crosstab(self, x_item, y_item) -> pd.DataFrame:
+        table = pd.DataFrame(
+            self.pair_counts[self.items.index(x_item), self.items.index(y_item)],
+            index=pd.Index(self.levels, name=x_item),
+            columns=pd.Index(self.levels, name=y_item),
+        )
+        # same shape as pd.crosstab: only observed answers
+        return table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+
+    def to_dict(self):
+        return {
+            "items": self.items,
+            "levels": list(self.levels),
+            "item_counts": self.item_counts.tolist(),
+            "pair_counts": self.pair_counts.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        tables = cls(data["items"], data["levels"])
+        tables.item_counts = np.array(data["item_counts"], dtype=np.int64).reshape(tables.item_counts.shape)
+        tables.pair_counts = np.array(data["pair_counts"], dtype=np.int64).reshape(tables.pair_counts.shape)
+        return tables
+
+
+# ------------------------------------------------------------------
+# WATCHED SURVEY
+# ------------------------------------------------------------------
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _row_hash(df: pd.DataFrame, position: int) -> str:
+    return str(int(pd.util.hash_pandas_object(df.iloc[[position]], index=False).iloc[0]))
+
+
+def state_path(path: str, directory=STATE_DIR) -> str:
+    return os.path.join(directory, _sha256(os.path.abspath(path).encode("utf-8"))[:24] + ".json")
+
+
+class IncrementalSurvey:
+    """Running analysis of one append-only survey file (see module docstring)"""
+
+    def __init__(self, path, method="mean", age_groups=AGE_GROUPS, sheet_name=None, state_dir=STATE_DIR):
+        if method not in INCREMENTAL_METHODS:
+            raise IncrementalError(f"Incremental mode supports the {INCREMENTAL_METHODS} composites, not {method!r}.")
+        self.path = os.path.abspath(path)
+        self.method = method
+        self.age_groups = tuple(tuple(g) for g in age_groups)
+        self.sheet_name = sheet_name
+        self.state_dir = state_dir
+        self.lock = threading.Lock()
+        self.reset()
+        self._load_state()
+
+    @property
+    def config(self):
+        return {
+            "path": self.path,
+            "method": self.method,
+            "age_groups": [list(g) for g in self.age_groups],
+            "sheet": self.sheet_name,
+        }
+
+    def reset(self):
+        """Forget everything ingested so far"""
+        self.watermark = {"rows": 0, "offset": 0, "tail_hash": None, "row_hash": None}
+        self.columns = None
+        self.age_column = None
+        self.timestamp_column = None
+        self.rows_raw = 0
+        self.rows_clean = 0
+        self.latest_response = None
+        self.age_counts = {}
+        self.items = FIXED_X_ITEMS + FIXED_Y_ITEMS
+        self.items_moments = RunningMoments(self.items)
+        self.totals = RunningMoments(["X_total", "Y_total"])
+        self.tables = RunningTables(self.items)
+        self.last_refresh = None
+
+    # -- reading ----------------------------------------------------
+    def _read_csv_tail(self):
+        """New complete CSV lines after the watermark (None: watermark lost)"""
+        mark = self.watermark
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if mark["offset"] > size:
+                return None
+            start = max(0, mark["offset"] - TAIL_BYTES)
+            f.seek(start)
+            data = f.read()
+        if mark["offset"] and _sha256(data[:mark["offset"] - start]) != mark["tail_hash"]:
+            return None
+        # a writer may still be appending: stop at the last complete line
+        end = data.rfind(b"\n") + 1
+        chunk = data[mark["offset"] - start:end]
+        if mark["offset"] == 0:
+            if not chunk.strip():
+                # not even a complete header line yet
+                return pd.DataFrame()
+            batch = pd.read_csv(io.BytesIO(chunk))
+            self.columns = list(batch.columns)
+        elif chunk.strip():
+            batch = pd.read_csv(io.BytesIO(chunk), header=None, names=self.columns)
+        else:
+            batch = pd.DataFrame(columns=self.columns)
+        new_offset = start + end if end else mark["offset"]
+        mark["offset"] = new_offset
+        mark["tail_hash"] = _sha256(data[max(0, new_offset - TAIL_BYTES) - start:new_offset - start])
+        mark["rows"] += len(batch)
+        return batch
+
+    def _read_full(self):
+        """Rows after the watermark of a file that has to be reread (None: watermark lost)"""
+        with open(self.path, "rb") as f:
+            df = read_survey(f, self.path, self.sheet_name)
+        mark = self.watermark
+        rows = mark["rows"]
+        if len(df) < rows or (rows and _row_hash(df, rows - 1) != mark["row_hash"]):
+            return None
+        self.columns = list(df.columns)
+        batch = df.iloc[rows:]
+        mark["rows"] = len(df)
+        mark["row_hash"] = _row_hash(df, len(df) - 1) if len(df) else None
+        return batch
+
+    def _read_new_rows(self):
+        reader = self._read_csv_tail if file_type(self.path) == "csv" else self._read_full
+        batch = reader()
+        if batch is None:
+            self.reset()
+            return reader(), True
+        return batch, False
+
+    # -- ingesting --------------------------------------------------
+    def _ingest(self, batch: pd.DataFrame):
+        if batch.empty:
+            return
+        # check everything before touching the aggregates
+        age_column = self.age_column or find_column(batch.columns, AGE_KEYWORDS)
+        if age_column is None:
+            raise IncrementalError("No age column found.")
+        missing = [c for c in self.items if c not in rename_item_columns(batch.iloc[:0]).columns]
+        if missing:
+            raise IncrementalError(f"Missing items: {missing}")
+        if self.age_column is None:
+            self.age_column = age_column
+            self.timestamp_column = find_column(batch.columns, TIMESTAMP_KEYWORDS)
+
+        self.rows_raw += len(batch)
+        if self.timestamp_column is not None:
+            latest = pd.to_datetime(batch[self.timestamp_column], errors="coerce").max()
+            if pd.notna(latest) and (self.latest_response is None or latest > pd.Timestamp(self.latest_response)):
+                self.latest_response = latest.isoformat()
+
+        batch, _, _ = clean_age(batch, self.age_column, self.age_groups)
+        for label, count in batch["Age_Group"].value_counts().items():
+            self.age_counts[label] = self.age_counts.get(label, 0) + int(count)
+        self.rows_clean += len(batch)
+
+        batch = add_composite_scores(rename_item_columns(batch), FIXED_X_ITEMS, FIXED_Y_ITEMS, self.method)
+        items = batch[self.items].to_numpy(dtype=float, na_value=np.nan)
+        self.items_moments.update(items)
+        self.totals.update(batch[["X_total", "Y_total"]].to_numpy(dtype=float, na_value=np.nan))
+        for start in range(0, len(items), TABLE_BLOCK_ROWS):
+            self.tables.update(items[start:start + TABLE_BLOCK_ROWS])
+
+    def refresh(self) -> dict:
+        """Ingest the rows appended since the last refresh"""
+        if not os.path.isfile(self.path):
+            raise IncrementalError(f"File not found: {self.path}")
+        with self.lock:
+            start = time.perf_counter()
+            watermark, columns = dict(self.watermark), self.columns
+            batch, was_reset = self._read_new_rows()
+            try:
+                self._ingest(batch)
+            except IncrementalError:
+                # leave the rows unread so the next refresh sees them again
+                self.watermark, self.columns = watermark, columns
+                raise
+            self.last_refresh = time.strftime("%Y-%m-%d %H:%M:%S")
+            self._save_state()
+            return {
+                "new_rows": len(batch),
+                "reset": was_reset,
+                "rows": self.rows_raw,
+                "seconds": time.perf_counter() - start,
+            }
+
+    # -- results ----------------------------------------------------
+    @staticmethod
+    def _descriptives(moments: RunningMoments) -> pd.DataFrame:
+        variance = moments.variance()
+        return pd.DataFrame(
+            {"n": moments.n.astype(int), "mean": moments.mean, "std": np.sqrt(variance), "variance": variance},
+            index=moments.columns,
+        )
+
+    def summary(self) -> dict:
+        """Language-neutral running results (counts, descriptives, correlation)"""
+        with self.lock:
+            descriptives = pd.concat([self._descriptives(self.items_moments), self._descriptives(self.totals)])
+            n_xy = self.totals.n_complete
+            r = self.totals.correlation()[0, 1] if n_xy > 2 else np.nan
+            df_r = n_xy - 2
+            if np.isfinite(r) and df_r > 0 and abs(r) < 1:
+                p = 2 * stats.t.sf(abs(r) * np.sqrt(df_r / (1 - r ** 2)), df_r)
+            else:
+                p = np.nan
+            labels = [age_group_label(low, high) for low, high in self.age_groups]
+            return {
+                "rows": self.rows_raw,
+                "rows_clean": self.rows_clean,
+                "latest_response": self.latest_response,
+                "last_refresh": self.last_refresh,
+                "age_counts": pd.Series({g: self.age_counts[g] for g in labels if g in self.age_counts}, dtype=int),
+                "descriptives": descriptives,
+                "correlation": {"method": "Pearson", "r": r, "p": p, "n": n_xy},
+                "item_correlation": pd.DataFrame(
+                    self.items_moments.correlation(), index=self.items, columns=self.items
+                ),
+            }
+
+    def chi_square(self, x_item, y_item) -> dict:
+        """Chi-square test of independence on the running contingency table"""
+        with self.lock:
+            table = self.tables.crosstab(x_item, y_item)
+        if table.shape[0] < 2 or table.shape[1] < 2:
+            return {"table": table, "chi2": np.nan, "p": np.nan, "dof": 0}
+        chi2, p, dof, _ = stats.chi2_contingency(table.to_numpy())
+        return {"table": table, "chi2": chi2, "p": p, "dof": dof}
+
+    # -- stored state -----------------------------------------------
+    def _save_state(self):
+        state = {
+            "version": STATE_VERSION,
+            "config": self.config,
+            "watermark": self.watermark,
+            "columns": [str(c) for c in self.columns] if self.columns is not None else None,
+            "age_column": self.age_column,
+            "timestamp_column": self.timestamp_column,
+            "rows_raw": self.rows_raw,
+            "rows_clean": self.rows_clean,
+            "latest_response": self.latest_response,
+            "age_counts": self.age_counts,
+            "items_moments": self.items_moments.to_dict(),
+            "totals": self.totals.to_dict(),
+            "tables": self.tables.to_dict(),
+            "last_refresh": self.last_refresh,
+        }
+        os.makedirs(self.state_dir, exist_ok=True)
+        path = state_path(self.path, self.state_dir)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(path + ".tmp", path)
+
+    def _load_state(self):
+        path = state_path(self.path, self.state_dir)
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get("version") != STATE_VERSION or state.get("config") != self.config:
+            # other settings: start from row one instead of mixing aggregates
+            return
+        self.watermark = state["watermark"]
+        self.columns = state["columns"]
+        self.age_column = state["age_column"]
+        self.timestamp_column = state["timestamp_column"]
+        self.rows_raw = state["rows_raw"]
+        self.rows_clean = state["rows_clean"]
+        self.latest_response = state["latest_response"]
+        self.age_counts = state["age_counts"]
+        self.items_moments = RunningMoments.from_dict(state["items_moments"])
+        self.totals = RunningMoments.from_dict(state["totals"])
+        self.tables = RunningTables.from_dict(state["tables"])
+        self.last_refresh = state["last_refresh"]
+
+
+_WATCHERS = {}
+_WATCHERS_LOCK = threading.Lock()
+
+
+def watch(path, method="mean", age_groups=AGE_GROUPS, sheet_name=None) -> IncrementalSurvey:
+    """Process-wide IncrementalSurvey for ``path`` and settings (shared by sessions)"""
+    key = (os.path.abspath(path), method, tuple(tuple(g) for g in age_groups), sheet_name)
+    with _WATCHERS_LOCK:
+        if key not in _WATCHERS:
+            _WATCHERS[key] = IncrementalSurvey(path, method, age_groups, sheet_name)
+        return _WATCHERS[key]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Follow a growing survey export.")
+    parser.add_argument("path")
+    parser.add_argument("--method", choices=INCREMENTAL_METHODS, default="mean")
+    parser.add_argument("--interval", type=float, default=0, help="seconds between refreshes (0: refresh once)")
+    args = parser.parse_args(argv)
+
+    survey = watch(args.path, args.method)
+    while True:
+        result = survey.refresh()
+        summary = survey.summary()
+        corr = summary["correlation"]
+        print(
+            f"{summary['last_refresh']}  +{result['new_rows']} rows ({result['seconds']:.3f}s)"
+            f"{'  [restarted]' if result['reset'] else ''}  total {summary['rows']}, "
+            f"clean {summary['rows_clean']}, r = {corr['r']:.3f} (n = {corr['n']})"
+        )
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Background job queue for slow report builds.
+
+Jobs run on a small bounded thread pool, so the Streamlit script run that
+submitted them returns immediately and later reruns (widget changes) only
+poll the job by id. Each job reports progress as a fraction plus a stage
+label. Submitting a job with the same key as a queued, running or finished
+job returns the existing job instead of starting a new one.
+
+With a ``cache``, finished results are stored in the shared cache instead
+of on the job, so they count against its memory budget; a job whose result
+was evicted is forgotten and the next identical submission runs it again.
+"""
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from survey_cache import SHARED_CACHE, estimate_size
+
+DEFAULT_WORKERS = 1
+MAX_FINISHED_JOBS = 32
+
+# job ids are unique per process, so results of every queue can share one cache
+_JOB_IDS = itertools.count(1)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobError(Exception):
+    """A finished job whose result cannot be kept"""
+
+
+class Job:
+    """State of one background job (read by the UI, written by the worker)"""
+
+    def __init__(self, job_id, key, cache=None):
+        self.id = job_id
+        self.key = key
+        self.cache = cache
+        self.status = QUEUED
+        self.progress = 0.0
+        self.stage = ""
+        self._result = None
+        self.error = None
+        self.submitted = time.time()
+        self.finished = None
+
+    @property
+    def done(self):
+        return self.status in (DONE, FAILED)
+
+    @property
+    def result_key(self):
+        return ("job_result", self.id)
+
+    @property
+    def result(self):
+        if self.cache is None:
+            return self._result
+        return self.cache.peek(self.result_key)
+
+    @result.setter
+    def result(self, value):
+        if self.cache is None:
+            self._result = value
+        elif not self.cache.put(self.result_key, value):
+            raise JobError(
+                f"The result ({estimate_size(value) / 2**20:.1f} MB) exceeds the shared cache budget "
+                f"({self.cache.budget_bytes / 2**20:.0f} MB); raise SURVEY_CACHE_MB."
+            )
+
+    @property
+    def expired(self):
+        """Finished, but its result has been evicted from the cache"""
+        return self.status == DONE and self.cache is not None and self.result_key not in self.cache
+
+    def report(self, fraction, stage=None):
+        """Progress callback handed to the job function"""
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        if stage is not None:
+            self.stage = stage
+
+
+class JobQueue:
+    """Bounded executor with job ids, progress and de-duplication by key"""
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_finished=MAX_FINISHED_JOBS, name="jobs", cache=None):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self.cache = cache
+        self.max_finished = max_finished
+        self._jobs = OrderedDict()
+        self._by_key = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, *args, **kwargs):
+        """Queue ``fn(*args, progress=job.report, **kwargs)`` and return its job id.
+
+        A failed or expired job with the same key is replaced; any other
+        existing job with that key is returned as is.
+        """
+        with self._lock:
+            job_id = self._by_key.get(key)
+            if job_id is not None:
+                existing = self._jobs[job_id]
+                if existing.status != FAILED and not existing.expired:
+                    return job_id
+                self._forget(existing)
+            job = Job(f"{next(_JOB_IDS)}", key, self.cache)
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+            self._prune()
+        self.executor.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = RUNNING
+        try:
+            job.result = fn(*args, progress=job.report, **kwargs)
+            job.report(1.0)
+            job.status = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished = time.time()
+
+    def _forget(self, job):
+        del self._jobs[job.id]
+        if self._by_key.get(job.key) == job.id:
+            del self._by_key[job.key]
+        if job.cache is not None:
+            job.cache.discard(job.result_key)
+
+    def _prune(self):
+        for job in [j for j in self._jobs.values() if j.expired]:
+            self._forget(job)
+        finished = [j for j in self._jobs.values() if j.done]
+        for job in finished[: max(0, len(finished) - self.max_finished)]:
+            self._forget(job)
+
+    def get(self, job_id):
+        """The job, or None if unknown or its result has been evicted"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.expired:
+                self._forget(job)
+                return None
+            return job
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# PDF builds are CPU-bound; one at a time keeps the UI responsive. The PDF
+# bytes live in the shared cache, under its memory budget.
+PDF_JOBS = JobQueue(workers=DEFAULT_WORKERS, name="pdf", cache=SHARED_CACHE)
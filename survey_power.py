@@ -0,0 +1,201 @@
+"""Monte Carlo power and sample-size planner for the X_total–Y_total correlation.
+
+Simulates 5-point Likert answers for the current instrument from a
+two-factor model (FOMO and addiction factors with a chosen correlation),
+using each item's loading and observed answer thresholds. The simulated
+items are then scored like the app does (mean / sum) and tested with
+Pearson or Spearman. Replications for one grid cell are drawn as one
+batched NumPy array, and grid cells are spread over a process pool.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from survey_cache import cached
+from survey_efa import extract_factors, item_correlation
+
+DEFAULT_N_GRID = (50, 100, 150, 200, 300, 400)
+DEFAULT_RHO_GRID = (0.1, 0.2, 0.3, 0.4)
+DEFAULT_REPS = 2000
+BATCH_CELLS = 4_000_000
+POOL_MIN_CELLS = 50_000_000
+
+
+def instrument_from_data(df: pd.DataFrame, x_items, y_items):
+    """Item loadings (1-factor minres per scale) and answer thresholds from data"""
+    scales = []
+    for items in (list(x_items), list(y_items)):
+        data = df[items].apply(pd.to_numeric, errors="coerce").dropna()
+        if len(items) > 1:
+            R = item_correlation(data, items, "pearson").to_numpy()
+            loadings = np.abs(extract_factors(R, 1, "minres")[:, 0])
+        else:
+            loadings = np.array([1.0])
+        loadings = np.clip(loadings, 0.05, 0.99)
+
+        thresholds = []
+        for col in items:
+            values = data[col].to_numpy()
+            cats = np.arange(1, 6)
+            props = np.array([(values <= c).mean() for c in cats[:-1]])
+            thresholds.append(stats.norm.ppf(np.clip(props, 1e-4, 1 - 1e-4)))
+        scales.append({"items": items, "loadings": loadings, "thresholds": np.array(thresholds)})
+    return {"x": scales[0], "y": scales[1]}
+
+
+def _simulate_scale(factor, scale, rng):
+    """Discretized 1..5 answers for one scale: array (B, N, J)"""
+    lam = scale["loadings"]
+    noise = rng.standard_normal(factor.shape + (len(lam),))
+    latent = factor[..., None] * lam + noise * np.sqrt(1 - lam ** 2)
+    answers = np.ones(latent.shape, dtype=np.int8)
+    for k in range(scale["thresholds"].shape[1]):
+        answers += latent > scale["thresholds"][:, k]
+    return answers
+
+
+def _batched_corr(x, y):
+    """Row-wise Pearson correlation of (B, N) arrays"""
+    x = x - x.mean(axis=1, keepdims=True)
+    y = y - y.mean(axis=1, keepdims=True)
+    denom = np.sqrt((x ** 2).sum(axis=1) * (y ** 2).sum(axis=1))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (x * y).sum(axis=1) / denom
+
+
+def simulate_cell(args):
+    """Power for one (N, rho) grid cell. Returns a result row dict."""
+    instrument, n, rho, n_reps, method, composite, alpha, seed = args
+    rng = np.random.default_rng(seed)
+    n_items = len(instrument["x"]["items"]) + len(instrument["y"]["items"])
+    batch = max(1, min(n_reps, BATCH_CELLS // (n * n_items)))
+    cov = np.array([[1.0, rho], [rho, 1.0]])
+    chol = np.linalg.cholesky(cov)
+
+    rejections = 0
+    r_values = []
+    done = 0
+    while done < n_reps:
+        b = min(batch, n_reps - done)
+        z = rng.standard_normal((b, n, 2)) @ chol.T
+        x_ans = _simulate_scale(z[..., 0], instrument["x"], rng)
+        y_ans = _simulate_scale(z[..., 1], instrument["y"], rng)
+        if composite == "sum":
+            x_tot = x_ans.sum(axis=2, dtype=np.float64)
+            y_tot = y_ans.sum(axis=2, dtype=np.float64)
+        else:
+            x_tot = x_ans.mean(axis=2, dtype=np.float64)
+            y_tot = y_ans.mean(axis=2, dtype=np.float64)
+        if method == "spearman":
+            x_tot = stats.rankdata(x_tot, axis=1)
+            y_tot = stats.rankdata(y_tot, axis=1)
+        r = np.nan_to_num(_batched_corr(x_tot, y_tot))
+        # same t-based p-value as stats.pearsonr / stats.spearmanr
+        t_stat = r * np.sqrt((n - 2) / np.clip(1 - r ** 2, 1e-12, None))
+        p = 2 * stats.t.sf(np.abs(t_stat), n - 2)
+        rejections += int((p < alpha).sum())
+        r_values.append(r)
+        done += b
+
+    power = rejections / n_reps
+    r_all = np.concatenate(r_values)
+    return {
+        "N": n,
+        "rho": rho,
+        "Power": power,
+        "MC SE": np.sqrt(power * (1 - power) / n_reps),
+        "Mean r": r_all.mean(),
+    }
+
+
+def plan_power(
+    instrument,
+    n_grid=DEFAULT_N_GRID,
+    rho_grid=DEFAULT_RHO_GRID,
+    n_reps=DEFAULT_REPS,
+    method="pearson",
+    composite="mean",
+    alpha=0.05,
+    n_jobs=None,
+    seed=0,
+    progress=None,
+):
+    """Estimate power across a grid of sample sizes and factor correlations.
+
+    ``progress`` is called with the fraction of finished grid cells.
+    Results are cached per instrument and settings. Returns a long table
+    with one row per (N, rho) cell. Raises ValueError for an empty grid,
+    a sample size below 4 or a correlation outside (-1, 1).
+    """
+    n_grid = [int(n) for n in n_grid]
+    rho_grid = [float(rho) for rho in rho_grid]
+    if not n_grid:
+        raise ValueError("The sample size grid is empty; enter at least one N of 4 or more.")
+    if not rho_grid:
+        raise ValueError("The correlation grid is empty; enter at least one rho.")
+    if min(n_grid) < 4:
+        raise ValueError("Every sample size N must be at least 4.")
+    if not all(abs(rho) < 1 for rho in rho_grid):
+        raise ValueError("Every correlation rho must lie strictly between -1 and 1.")
+    key = (
+        repr({k: (v["items"], np.round(v["loadings"], 6).tolist(), np.round(v["thresholds"], 6).tolist())
+              for k, v in instrument.items()}),
+        tuple(n_grid), tuple(rho_grid), n_reps, method, composite, alpha, seed,
+    )
+    results = cached(
+        "power", key,
+        lambda: _run_power_grid(instrument, n_grid, rho_grid, n_reps, method, composite, alpha, n_jobs, seed, progress),
+    )
+    if progress is not None:
+        progress(1.0)
+    return results
+
+
+def _run_power_grid(instrument, n_grid, rho_grid, n_reps, method, composite, alpha, n_jobs, seed, progress):
+    cells = [(int(n), float(rho)) for rho in rho_grid for n in n_grid]
+    seeds = np.random.SeedSequence(seed).spawn(len(cells))
+    tasks = [
+        (instrument, n, rho, n_reps, method, composite, alpha, s)
+        for (n, rho), s in zip(cells, seeds)
+    ]
+    n_items = len(instrument["x"]["items"]) + len(instrument["y"]["items"])
+    total_cells = sum(n for n, _ in cells) * n_reps * n_items
+    n_jobs = n_jobs or os.cpu_count() or 1
+
+    rows = []
+    if n_jobs > 1 and total_cells >= POOL_MIN_CELLS:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as pool:
+            futures = [pool.submit(simulate_cell, task) for task in tasks]
+            for i, future in enumerate(as_completed(futures), start=1):
+                rows.append(future.result())
+                if progress is not None:
+                    progress(i / len(tasks))
+    else:
+        for i, task in enumerate(tasks, start=1):
+            rows.append(simulate_cell(task))
+            if progress is not None:
+                progress(i / len(tasks))
+
+    return pd.DataFrame(rows).sort_values(["rho", "N"]).reset_index(drop=True).round(4)
+
+
+def required_sample_size(results: pd.DataFrame, target_power=0.8, retention=1.0):
+    """Smallest simulated N reaching ``target_power`` for each rho.
+
+    ``retention`` is the share of respondents kept by age cleaning, used to
+    convert the analysed N into respondents to recruit.
+    """
+    rows = []
+    for rho, group in results.groupby("rho"):
+        ok = group[group["Power"] >= target_power]
+        n_needed = int(ok["N"].min()) if not ok.empty else np.nan
+        rows.append({
+            "rho": rho,
+            "Mean r": group["Mean r"].mean(),
+            "N (after cleaning)": n_needed,
+            "N to recruit": int(np.ceil(n_needed / retention)) if retention > 0 and not np.isnan(n_needed) else np.nan,
+        })
+    return pd.DataFrame(rows).round(3)
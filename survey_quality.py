@@ -0,0 +1,270 @@
+"""Data-quality screening of survey respondents.
+
+Flags careless or invalid submissions with column-wise vectorized passes
+over the item matrix, so screening stays linear in the number of rows:
+
+- straightline: every answered item has the same value (zero row variance)
+- long_run: the longest run of identical consecutive answers covers at
+  least ``run_share`` of the items
+- duplicate: the same submission again (row hash over every column except
+  the timestamp); the first copy is kept
+- incomplete: at least one item unanswered
+- speeder: submitted less than ``min_gap_seconds`` after the previous
+  submission (needs a timestamp column)
+- mahalanobis: multivariate outlier, squared Mahalanobis distance from a
+  robust (minimum covariance determinant) centre above the chi-square
+  ``1 - outlier_alpha`` quantile
+- guttman: normalized Guttman errors (answers that contradict the
+  item-step difficulty order) above ``guttman_cutoff``, by default the
+  far-out Tukey fence Q3 + 3 IQR of the sample
+
+Flags are computed once per upload; which rules remove respondents is
+chosen afterwards.
+"""
+import math
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy import linalg, stats
+
+SCREEN_RULES = ("straightline", "long_run", "duplicate", "incomplete", "speeder", "mahalanobis", "guttman")
+DEFAULT_RUN_SHARE = 0.8
+DEFAULT_MIN_GAP_SECONDS = 10
+DEFAULT_OUTLIER_ALPHA = 0.001
+MCD_SUPPORT = 0.75
+MCD_STARTS = 20
+MCD_SUBSAMPLE = 2000
+MCD_REFINE = 2
+RESPONSE_LEVELS = (1, 2, 3, 4, 5)
+
+
+def item_matrix(df: pd.DataFrame, items) -> np.ndarray:
+    """(N, J) float matrix of item answers, NaN where unanswered"""
+    values = np.empty((len(df), len(items)))
+    for k, col in enumerate(items):
+        values[:, k] = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+    return values
+
+
+def longest_identical_run(values: np.ndarray) -> np.ndarray:
+    """Length of the longest run of equal consecutive answers per row"""
+    n, j = values.shape
+    if j == 0:
+        return np.zeros(n, dtype=np.int64)
+    answered = ~np.isnan(values)
+    run = answered[:, 0].astype(np.int64)
+    best = run.copy()
+    for k in range(1, j):
+        same = values[:, k] == values[:, k - 1]  # NaN never equals anything
+        run = np.where(same, run + 1, answered[:, k].astype(np.int64))
+        np.maximum(best, run, out=best)
+    return best
+
+
+def submission_gaps(timestamps: pd.Series) -> pd.Series:
+    """Seconds since the previous submission (NaN for the first / unparsable)"""
+    ts = pd.to_datetime(timestamps.reset_index(drop=True), errors="coerce")
+    ordered = ts.dropna().sort_values(kind="stable")
+    gaps = ordered.diff().dt.total_seconds().reindex(range(len(ts)))
+    return pd.Series(gaps.to_numpy(), index=timestamps.index)
+
+
+# ------------------------------------------------------------------
+# ROBUST MAHALANOBIS DISTANCE (MCD)
+# ------------------------------------------------------------------
+def _mahalanobis_sq(values, location, covariance):
+    """Squared distances of all rows at once (one Cholesky solve)"""
+    chol = np.linalg.cholesky(covariance)
+    z = linalg.solve_triangular(chol, (values - location).T, lower=True, check_finite=False)
+    return np.einsum("ij,ij->j", z, z)
+
+
+def _fit_subset(values, idx, ridge):
+    subset = values[idx]
+    location = subset.mean(axis=0)
+    covariance = np.cov(subset, rowvar=False) + ridge
+    return location, covariance, np.linalg.slogdet(covariance)[1]
+
+
+def _c_steps(values, idx, h, ridge, max_steps):
+    """Concentration steps: refit on the h closest rows until the subset is stable"""
+    location, covariance, logdet = _fit_subset(values, idx, ridge)
+    for _ in range(max_steps):
+        idx = np.argpartition(_mahalanobis_sq(values, location, covariance), h - 1)[:h]
+        location, covariance, new_logdet = _fit_subset(values, idx, ridge)
+        # each C-step can only lower the determinant; stop once it stalls
+        converged = new_logdet >= logdet - 1e-9
+        logdet = new_logdet
+        if converged:
+            break
+    return idx, location, covariance, logdet
+
+
+def robust_mahalanobis(values: np.ndarray, support=MCD_SUPPORT, n_starts=MCD_STARTS, seed=0):
+    """Squared Mahalanobis distances from a reweighted MCD estimate.
+
+    FastMCD-style search: random (p + 1)-row starts are concentrated on a
+    subsample, the best two are iterated on all rows, and the winning
+    estimate is made consistent at the normal model and reweighted on the
+    rows within the 97.5% chi-square quantile. A small ridge keeps the
+    covariance of tied Likert answers invertible. Rows with missing answers
+    get NaN. Returns (distances, location, covariance).
+    """
+    n, p = values.shape
+    complete = ~np.isnan(values).any(axis=1)
+    d2 = np.full(n, np.nan)
+    X = values[complete]
+    if len(X) <= p + 1:
+        return d2, None, None
+
+    rng = np.random.default_rng(seed)
+    ridge = np.eye(p) * 1e-3 * max(float(np.mean(np.var(X, axis=0))), 1e-12)
+    sub = X if len(X) <= MCD_SUBSAMPLE else X[rng.choice(len(X), MCD_SUBSAMPLE, replace=False)]
+    h_sub = max(p + 1, int(np.ceil(support * len(sub))))
+    candidates = []
+    for _ in range(n_starts):
+        start = rng.choice(len(sub), p + 1, replace=False)
+        idx, _, _, logdet = _c_steps(sub, start, h_sub, ridge, max_steps=2)
+        candidates.append((logdet, idx))
+    candidates.sort(key=lambda c: c[0])
+
+    h = max(p + 1, int(np.ceil(support * len(X))))
+    best = None
+    for _, idx in candidates[:MCD_REFINE]:
+        location, covariance, _ = _fit_subset(sub, idx, ridge)
+        start = np.argpartition(_mahalanobis_sq(X, location, covariance), h - 1)[:h]
+        result = _c_steps(X, start, h, ridge, max_steps=50)
+        if best is None or result[3] < best[3]:
+            best = result
+    _, location, covariance, _ = best
+
+    # consistency at the normal model, then one reweighting step
+    dist = _mahalanobis_sq(X, location, covariance)
+    covariance = covariance * np.median(dist) / stats.chi2.ppf(0.5, p)
+    dist = _mahalanobis_sq(X, location, covariance)
+    inliers = dist <= stats.chi2.ppf(0.975, p)
+    if inliers.sum() > p + 1:
+        location = X[inliers].mean(axis=0)
+        covariance = np.cov(X[inliers], rowvar=False) + ridge
+        dist = _mahalanobis_sq(X, location, covariance)
+    d2[complete] = dist
+    return d2, location, covariance
+
+
+# ------------------------------------------------------------------
+# GUTTMAN PERSON-FIT
+# ------------------------------------------------------------------
+def guttman_errors(values: np.ndarray, levels=RESPONSE_LEVELS):
+    """Polytomous Guttman errors per respondent (raw and normalized).
+
+    Every item is split into item steps "answer >= k" for the levels above
+    the lowest. Steps are ordered from most to least popular; an error is a
+    pair where a more popular step is failed but a less popular one is
+    passed. The normalized value divides by r * (S - r) for r passed of S
+    steps. Rows with missing answers get NaN.
+    """
+    n, j = values.shape
+    complete = ~np.isnan(values).any(axis=1)
+    steps = np.concatenate([values >= k for k in levels[1:]], axis=1)
+    if not complete.any():
+        return np.full(n, np.nan), np.full(n, np.nan)
+    order = np.argsort(-steps[complete].mean(axis=0), kind="stable")
+    passed = steps[:, order].astype(np.int64)
+    # failures among the more popular steps before each passed step
+    fails_before = np.cumsum(1 - passed, axis=1) - (1 - passed)
+    errors = (passed * fails_before).sum(axis=1).astype(float)
+    r = passed.sum(axis=1)
+    max_errors = (r * (passed.shape[1] - r)).astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        normalized = np.where(max_errors > 0, errors / max_errors, 0.0)
+    errors[~complete] = np.nan
+    normalized[~complete] = np.nan
+    return errors, normalized
+
+
+def guttman_fence(normalized: np.ndarray) -> float:
+    """Far-out Tukey fence (Q3 + 3 IQR) of the normalized Guttman errors"""
+    finite = normalized[np.isfinite(normalized)]
+    if finite.size == 0:
+        return np.inf
+    q1, q3 = np.percentile(finite, [25, 75])
+    return float(q3 + 3 * (q3 - q1))
+
+
+# ------------------------------------------------------------------
+# SCREENING
+# ------------------------------------------------------------------
+def screen_responses(
+    df: pd.DataFrame,
+    items,
+    timestamp_column=None,
+    run_share: float = DEFAULT_RUN_SHARE,
+    min_gap_seconds: float = DEFAULT_MIN_GAP_SECONDS,
+    outlier_alpha: float = DEFAULT_OUTLIER_ALPHA,
+    guttman_cutoff=None,
+) -> pd.DataFrame:
+    """Per-respondent quality flags plus the metrics behind them.
+
+    Returns a frame aligned with ``df`` with one boolean column per rule in
+    SCREEN_RULES and the ``answered``, ``row_variance``, ``longest_run``,
+    ``gap_seconds``, ``mahalanobis_d2`` and ``guttman_norm`` metrics.
+    """
+    items = [c for c in items if c in df.columns]
+    values = item_matrix(df, items)
+    answered = (~np.isnan(values)).sum(axis=1)
+    with warnings.catch_warnings():
+        # rows without any answer have no variance
+        warnings.simplefilter("ignore", RuntimeWarning)
+        row_variance = np.nanvar(values, axis=1)
+    longest = longest_identical_run(values)
+    min_run = max(2, math.ceil(run_share * len(items)))
+
+    d2, _, _ = robust_mahalanobis(values)
+    _, guttman_norm = guttman_errors(values)
+    d2_cutoff = stats.chi2.ppf(1 - outlier_alpha, len(items)) if len(items) else np.inf
+    if guttman_cutoff is None:
+        guttman_cutoff = guttman_fence(guttman_norm)
+
+    hashed_cols = [c for c in df.columns if c != timestamp_column]
+    row_hash = pd.util.hash_pandas_object(df[hashed_cols], index=False)
+
+    flags = pd.DataFrame(
+        {
+            "straightline": (answered >= 2) & (row_variance == 0),
+            "long_run": longest >= min_run,
+            "duplicate": row_hash.duplicated(keep="first").to_numpy(),
+            "incomplete": answered < len(items),
+            "mahalanobis": d2 > d2_cutoff,
+            "guttman": guttman_norm > guttman_cutoff,
+            "answered": answered,
+            "row_variance": row_variance,
+            "longest_run": longest,
+            "mahalanobis_d2": d2,
+            "guttman_norm": guttman_norm,
+        },
+        index=df.index,
+    )
+    if timestamp_column is not None and timestamp_column in df.columns:
+        gaps = submission_gaps(df[timestamp_column])
+        flags["speeder"] = (gaps < min_gap_seconds).to_numpy()
+        flags["gap_seconds"] = gaps.to_numpy()
+    else:
+        flags["speeder"] = False
+        flags["gap_seconds"] = np.nan
+    return flags
+
+
+def screening_mask(flags: pd.DataFrame, rules) -> pd.Series:
+    """True for respondents flagged by any of ``rules``"""
+    rules = [r for r in rules if r in flags.columns]
+    if not rules:
+        return pd.Series(False, index=flags.index)
+    return flags[rules].any(axis=1)
+
+
+def screening_counts(flags: pd.DataFrame, rules=SCREEN_RULES) -> dict:
+    """Number of respondents flagged per rule and by any of ``rules``"""
+    counts = {rule: int(flags[rule].sum()) for rule in SCREEN_RULES}
+    counts["any"] = int(screening_mask(flags, rules).sum())
+    return counts
@@ -0,0 +1,227 @@
+"""Multiple regression / ANCOVA of Y_total on X_total and demographic covariates.
+
+The design matrix (intercept, X_total, treatment-coded dummies for
+Age_Group and gender, optional X_total × covariate interactions) is built
+column-wise from factorized codes, without Python loops over rows. The
+model is fitted with one pivoted QR decomposition of the centered
+predictors, so the intercept is never the column dropped. Everything else
+comes from the small R factor and Q'y:
+
+- HC3 robust standard errors from the leverages (row sums of Q²)
+- type-II sums of squares for every term, from sub-model fits on R
+  (each term is tested after all terms that do not contain it)
+- partial R² = SS_term / (SS_term + SS_residual)
+
+Columns that are linear combinations of others (e.g. an empty
+interaction cell or a constant X_total) are dropped and listed in
+``aliased``.
+"""
+import numpy as np
+import pandas as pd
+from scipy import linalg, stats
+
+RANK_TOL = 1e-10
+
+
+# ------------------------------------------------------------------
+# DESIGN MATRIX
+# ------------------------------------------------------------------
+def _dummies(values: pd.Series):
+    """Treatment-coded dummy columns (first level is the reference)"""
+    codes, levels = pd.factorize(values, sort=True)
+    columns = (codes[:, None] == np.arange(1, len(levels))).astype(float)
+    return columns, [str(level) for level in levels]
+
+
+def build_design(df: pd.DataFrame, y="Y_total", x="X_total", covariates=("Age_Group",), interactions=False):
+    """Design matrix, response, column names, terms and reference levels (complete rows only).
+
+    ``terms`` maps each model term to its ``factors`` (the variables it is
+    built from) and its design ``columns``.
+    """
+    covariates = [c for c in covariates if c is not None and c in df.columns]
+    used = [y, x] + covariates
+    data = df[used]
+    complete = data.notna().all(axis=1).to_numpy()
+    data = data[complete]
+
+    x_values = pd.to_numeric(data[x], errors="coerce").to_numpy(dtype=float)
+    blocks = [np.ones((len(data), 1)), x_values[:, None]]
+    names = ["Intercept", x]
+    terms = {x: {"factors": {x}, "columns": [1]}}
+    references = {}
+    for cov in covariates:
+        columns, levels = _dummies(data[cov])
+        if columns.shape[1] == 0:
+            continue
+        references[cov] = levels[0]
+        start = sum(b.shape[1] for b in blocks)
+        blocks.append(columns)
+        names += [f"{cov}[{level}]" for level in levels[1:]]
+        terms[cov] = {"factors": {cov}, "columns": list(range(start, start + columns.shape[1]))}
+        if interactions:
+            start += columns.shape[1]
+            blocks.append(columns * x_values[:, None])
+            names += [f"{x}:{cov}[{level}]" for level in levels[1:]]
+            terms[f"{x}:{cov}"] = {"factors": {x, cov}, "columns": list(range(start, start + columns.shape[1]))}
+    design = np.hstack(blocks)
+    response = pd.to_numeric(data[y], errors="coerce").to_numpy(dtype=float)
+    return design, response, names, terms, references
+
+
+# ------------------------------------------------------------------
+# FIT
+# ------------------------------------------------------------------
+def _sub_rss(r_factor, qty, columns, rss_full):
+    """RSS of the sub-model on ``columns`` (positions in the fitted R)"""
+    if not columns:
+        return rss_full + float(qty @ qty)
+    coef, *_ = linalg.lstsq(r_factor[:, columns], qty)
+    resid = qty - r_factor[:, columns] @ coef
+    return rss_full + float(resid @ resid)
+
+
+def fit_regression(
+    df: pd.DataFrame, y="Y_total", x="X_total", covariates=("Age_Group",), interactions=False, alpha=0.05
+) -> dict:
+    """OLS fit with HC3 standard errors, partial R² and a type-II ANOVA table.
+
+    Returns a language-neutral dict: ``n``, ``r2``, ``adj_r2``, ``f``,
+    ``f_p``, ``df_model``, ``df_resid``, ``formula``, ``references`` (reference
+    level per covariate), ``aliased`` (dropped columns) and the
+    ``coefficients`` / ``anova`` DataFrames.
+    """
+    design, response, names, terms, references = build_design(df, y, x, covariates, interactions)
+    n, p = design.shape
+    formula = f"{y} ~ " + " + ".join(terms)
+    if n <= p:
+        return None
+
+    # the intercept is always kept: the other columns are centered (projected
+    # off the intercept) before the pivoted QR, and Q / R of the full design
+    # are assembled from that factorization
+    means = design[:, 1:].mean(axis=0)
+    qc, rc, piv = linalg.qr(design[:, 1:] - means, mode="economic", pivoting=True)
+    scale = np.linalg.norm(design[:, 1:], axis=0).max()
+    rank_c = int((np.abs(np.diag(rc)) > RANK_TOL * scale).sum())
+    # the first ``rank_c`` pivoted columns are identifiable; the rest are aliased
+    kept = np.concatenate([[0], 1 + piv[:rank_c]])
+    rank = rank_c + 1
+    sqrt_n = np.sqrt(n)
+    q = np.hstack([np.full((n, 1), 1 / sqrt_n), qc[:, :rank_c]])
+    r = np.zeros((rank, rank))
+    r[0, 0] = sqrt_n
+    r[0, 1:] = sqrt_n * means[piv[:rank_c]]
+    r[1:, 1:] = rc[:rank_c, :rank_c]
+    aliased = [names[1 + j] for j in sorted(piv[rank_c:])]
+    position = {col: k for k, col in enumerate(kept)}
+
+    qty = q.T @ response
+    coef = linalg.solve_triangular(r, qty)
+    fitted = q @ qty
+    resid = response - fitted
+    rss = float(resid @ resid)
+    df_resid = n - rank
+    tss = float(((response - response.mean()) ** 2).sum())
+    r2 = 1 - rss / tss if tss > 0 else np.nan
+    df_model = rank - 1
+    adj_r2 = 1 - (1 - r2) * (n - 1) / df_resid if df_resid > 0 else np.nan
+    sigma2 = rss / df_resid
+
+    # HC3: (X'X)^-1 X' diag(e² / (1 - h)²) X (X'X)^-1 with X = QR
+    leverage = np.einsum("ij,ij->i", q, q)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = np.where(leverage < 1 - 1e-12, resid ** 2 / (1 - leverage) ** 2, 0.0)
+    r_inv = linalg.solve_triangular(r, np.eye(rank))
+    meat = (q * weights[:, None]).T @ q
+    cov_hc3 = r_inv @ meat @ r_inv.T
+    se = np.sqrt(np.diag(cov_hc3))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_values = coef / se
+    p_values = 2 * stats.t.sf(np.abs(t_values), df_resid)
+    t_crit = stats.t.ppf(1 - alpha / 2, df_resid)
+    coefficients = pd.DataFrame(
+        {
+            "coef": coef,
+            "se_hc3": se,
+            "t": t_values,
+            "p": p_values,
+            "ci_low": coef - t_crit * se,
+            "ci_high": coef + t_crit * se,
+        },
+        index=[names[j] for j in kept],
+    ).loc[[names[j] for j in sorted(kept)]]
+
+    # type-II: each term after every term that does not contain it
+    rows = {}
+    for term, spec in terms.items():
+        cols = [position[c] for c in spec["columns"] if c in position]
+        if not cols:
+            continue
+        others = [o for o in terms.values() if not spec["factors"] <= o["factors"]]
+        base = [position[0]] + [position[c] for o in others for c in o["columns"] if c in position]
+        rss_without = _sub_rss(r, qty, sorted(base), rss)
+        rss_with = _sub_rss(r, qty, sorted(base + cols), rss)
+        ss = max(rss_without - rss_with, 0.0)
+        f_value = ss / len(cols) / sigma2
+        rows[term] = {
+            "sum_sq": ss,
+            "df": len(cols),
+            "F": f_value,
+            "p": stats.f.sf(f_value, len(cols), df_resid),
+            "partial_r2": ss / (ss + rss),
+        }
+    rows["Residual"] = {"sum_sq": rss, "df": df_resid, "F": np.nan, "p": np.nan, "partial_r2": np.nan}
+    anova = pd.DataFrame.from_dict(rows, orient="index")
+
+    f_model = (tss - rss) / df_model / sigma2 if df_model > 0 else np.nan
+    return {
+        "n": n,
+        "r2": r2,
+        "adj_r2": adj_r2,
+        "f": f_model,
+        "f_p": stats.f.sf(f_model, df_model, df_resid) if df_model > 0 else np.nan,
+        "df_model": df_model,
+        "df_resid": df_resid,
+        "formula": formula,
+        "references": references,
+        "aliased": aliased,
+        "coefficients": coefficients,
+        "anova": anova,
+    }
+
+
+# ------------------------------------------------------------------
+# DISPLAY
+# ------------------------------------------------------------------
+def regression_tables(result: dict, lang_dict):
+    """Coefficient and ANOVA tables with localized headers, rounded for display"""
+    t = lang_dict
+    coefficients = result["coefficients"].rename(
+        columns={
+            "coef": t["reg_coef"],
+            "se_hc3": t["reg_se"],
+            "t": "t",
+            "p": t["p_value"],
+            "ci_low": t["reg_ci_low"],
+            "ci_high": t["reg_ci_high"],
+        }
+    )
+    anova = result["anova"].rename(
+        columns={"sum_sq": t["reg_ss"], "df": "df", "F": "F", "p": t["p_value"], "partial_r2": t["reg_partial_r2"]}
+    )
+    anova = anova.rename(index={"Residual": t["reg_residual"]})
+    return coefficients.round(4).rename_axis(t["reg_term"]), anova.round(4).rename_axis(t["reg_term"])
+
+
+def regression_summary(result: dict, lang_dict) -> str:
+    t = lang_dict
+    return t["reg_summary"].format(
+        n=result["n"],
+        r2=result["r2"],
+        adj_r2=result["adj_r2"],
+        f=result["f"],
+        df_model=result["df_model"],
+        df_resid=result["df_resid"],
+        p=result["f_p"],
+    )
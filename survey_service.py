@@ -0,0 +1,442 @@
+"""Local HTTP analysis service for the FOMO / social media addiction survey.
+
+Runs the same helpers as the Streamlit app (survey_helpers.py) without the UI,
+so other internal tools can request the statistics as JSON.
+
+Usage:
+    python survey_service.py --port 8502 --workers 2 --queue-size 8
+    python survey_service.py --engine polars   # optional columnar engine
+
+Endpoints:
+    GET  /health   -> service status, pool limits and shared-cache counters
+    POST /analyze  -> request body is the raw survey file (CSV, XLSX, Parquet
+                      or Feather),
+                      options are passed in the query string:
+                        filename   original file name (used to pick the parser)
+                        sheet      Excel sheet name (default: first sheet)
+                        items      comma-separated item codes (default X1..Y5)
+                        composite  "mean" (default), "sum" or "irt"
+                        method     "pearson", "spearman" (default: normality
+                                   recommendation) or "chi-square"
+                        chi_x, chi_y  items for the chi-square test
+                        sparse     "auto" (default), "monte-carlo" or
+                                   "asymptotic" handling of sparse tables
+                        screen     comma-separated screening checks that
+                                   remove respondents (straightline,
+                                   long_run, duplicate, incomplete, speeder,
+                                   mahalanobis, guttman)
+                        ages       age groups, e.g. "13-18,19-23,24-28"
+                                   (default: the Gen Z groups)
+                        lang       "en" (default) or "id"
+                        pdf        "1" to include the PDF report (base64)
+
+Example:
+    curl --data-binary @survey.xlsx \\
+        "http://127.0.0.1:8502/analyze?filename=survey.xlsx&method=spearman&pdf=1"
+"""
+import argparse
+import base64
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+import pandas as pd
+
+from survey_cache import SHARED_CACHE
+import survey_engine
+from survey_quality import SCREEN_RULES, screen_responses, screening_mask
+from survey_helpers import (
+    LANGUAGES,
+    FIXED_X_ITEMS,
+    FIXED_Y_ITEMS,
+    AGE_GROUPS,
+    AGE_KEYWORDS,
+    GENDER_KEYWORDS,
+    TIMESTAMP_KEYWORDS,
+    parse_upload,
+    find_column,
+    parse_age_groups,
+    rename_item_columns,
+    demographic_table,
+    descriptive_table,
+    compute_normality,
+    compute_correlation,
+    compute_chi_square,
+    compute_ordinal_association,
+    generate_pdf_report,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8502
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 8
+DEFAULT_MAX_UPLOAD_MB = 50
+DEFAULT_LARGE_UPLOAD_MB = 5
+DEFAULT_LARGE_SLOTS = 1
+DEFAULT_REQUEST_TIMEOUT = 300
+
+class ServiceError(Exception):
+    """Error reported back to the client with an HTTP status code"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# ------------------------------------------------------------------
+# ANALYSIS
+# ------------------------------------------------------------------
+def frame_to_json(df):
+    """DataFrame -> JSON-safe dict (split orientation)"""
+    if df is None:
+        return None
+    return json.loads(df.to_json(orient="split", default_handler=str))
+
+
+def _json_default(obj):
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return frame_to_json(obj.to_frame() if isinstance(obj, pd.Series) else obj)
+    return str(obj)
+
+
+def parse_options(query: dict) -> dict:
+    """Validate query-string options into the analysis option dict"""
+
+    def first(name, default=None):
+        values = query.get(name)
+        return values[0] if values else default
+
+    lang = first("lang", "en")
+    if lang not in LANGUAGES:
+        raise ServiceError(400, f"Unsupported lang '{lang}' (use 'en' or 'id').")
+
+    all_items = FIXED_X_ITEMS + FIXED_Y_ITEMS
+    items_raw = first("items")
+    items = [i.strip() for i in items_raw.split(",") if i.strip()] if items_raw else all_items
+    unknown = [i for i in items if i not in all_items]
+    if unknown:
+        raise ServiceError(400, f"Unknown items: {unknown}")
+
+    composite = first("composite", "mean")
+    if composite not in ("mean", "sum", "irt"):
+        raise ServiceError(400, "composite must be 'mean', 'sum' or 'irt'.")
+    if composite == "irt" and (
+        len([i for i in items if i in FIXED_X_ITEMS]) < 2
+        or len([i for i in items if i in FIXED_Y_ITEMS]) < 2
+    ):
+        raise ServiceError(400, "composite 'irt' needs at least 2 X items and 2 Y items.")
+
+    sparse = first("sparse", "auto")
+    if sparse not in ("auto", "monte-carlo", "asymptotic"):
+        raise ServiceError(400, "sparse must be 'auto', 'monte-carlo' or 'asymptotic'.")
+
+    screen_raw = first("screen")
+    screen = [r.strip() for r in screen_raw.split(",") if r.strip()] if screen_raw else []
+    unknown_rules = [r for r in screen if r not in SCREEN_RULES]
+    if unknown_rules:
+        raise ServiceError(400, f"Unknown screening checks: {unknown_rules}")
+
+    ages_raw = first("ages")
+    age_groups = parse_age_groups(ages_raw) if ages_raw else AGE_GROUPS
+    if age_groups is None:
+        raise ServiceError(400, "ages must be non-overlapping ranges like '13-18,19-23'.")
+
+    method = first("method")
+    if method not in (None, "pearson", "spearman", "chi-square"):
+        raise ServiceError(400, "method must be 'pearson', 'spearman' or 'chi-square'.")
+
+    return {
+        "filename": first("filename", "upload.csv"),
+        "sheet": first("sheet"),
+        "lang": lang,
+        "x_items": [i for i in items if i in FIXED_X_ITEMS],
+        "y_items": [i for i in items if i in FIXED_Y_ITEMS],
+        "composite": composite,
+        "method": method,
+        "chi_x": first("chi_x"),
+        "chi_y": first("chi_y"),
+        "sparse": sparse,
+        "screen": screen,
+        "age_groups": age_groups,
+        "pdf": first("pdf", "0") in ("1", "true", "yes"),
+        "pdf_filename": first("pdf_filename", "analysis_report"),
+    }
+
+
+def run_analysis(df: pd.DataFrame, options: dict) -> dict:
+    """Run the app pipeline on a parsed survey and return a JSON-ready dict"""
+    lang_code = options["lang"]
+    t = LANGUAGES[lang_code]
+    x_items = options["x_items"]
+    y_items = options["y_items"]
+    if not x_items or not y_items:
+        raise ServiceError(400, t["min_selection"])
+
+    age_column = find_column(df.columns, AGE_KEYWORDS)
+    if age_column is None:
+        raise ServiceError(422, t["age_not_found"])
+
+    engine = survey_engine.get_engine()
+    df, before_clean, after_clean = engine.clean_age(df, age_column, options["age_groups"])
+    age_counts = df["Age_Group"].value_counts().sort_index()
+    age_demo_df = demographic_table(age_counts, t["age_group"], t)
+
+    gender_column = find_column(df.columns, GENDER_KEYWORDS)
+    gender_demo_df = None
+    if gender_column is not None:
+        gender_counts = df[gender_column].value_counts().sort_index()
+        gender_demo_df = demographic_table(gender_counts, "Gender", t)
+
+    df = rename_item_columns(df)
+    missing = [c for c in x_items + y_items if c not in df.columns]
+    if missing:
+        raise ServiceError(422, f"Missing items: {missing}")
+
+    before_screen = len(df)
+    if options["screen"]:
+        present_items = [c for c in FIXED_X_ITEMS + FIXED_Y_ITEMS if c in df.columns]
+        flags = screen_responses(df, present_items, find_column(df.columns, TIMESTAMP_KEYWORDS))
+        df = df[~screening_mask(flags, options["screen"])]
+
+    df = engine.add_composite_scores(df, x_items, y_items, options["composite"])
+    valid_xy = df[["X_total", "Y_total"]].dropna()
+    if len(valid_xy) < 3:
+        raise ServiceError(422, "At least 3 valid respondents are required.")
+
+    result_norm, recommended_method, _ = compute_normality(valid_xy, t)
+    desc_items = descriptive_table(df, x_items + y_items, t)
+    desc_comp = descriptive_table(df, ["X_total", "Y_total"], t)
+
+    method = options["method"]
+    if method == "chi-square":
+        chi_x = options["chi_x"] or x_items[0]
+        chi_y = options["chi_y"] or y_items[0]
+        if chi_x not in df.columns or chi_y not in df.columns:
+            raise ServiceError(400, "chi_x / chi_y must be selected items.")
+        assoc_stats, assoc_summary_text = compute_chi_square(
+            df, chi_x, chi_y, lang_code, t, sparse_method=options["sparse"], seed=0, engine=engine
+        )
+    else:
+        method_label = t[method] if method else recommended_method
+        assoc_stats, assoc_summary_text = compute_correlation(valid_xy, method_label, lang_code, t)
+
+    ordinal_table, _ = compute_ordinal_association(df, "X_total", "Y_total", t)
+
+    assoc_stats = dict(assoc_stats)
+    if "contingency" in assoc_stats:
+        assoc_stats["contingency"] = frame_to_json(assoc_stats["contingency"])
+
+    result = {
+        "respondents": {
+            "before_clean": before_clean,
+            "after_clean": after_clean,
+            "removed": before_clean - after_clean,
+            "screened_out": before_screen - len(df),
+            "valid_xy": int(len(valid_xy)),
+        },
+        "age_column": str(age_column),
+        "gender_column": None if gender_column is None else str(gender_column),
+        "demographics": {
+            "age": frame_to_json(age_demo_df),
+            "gender": frame_to_json(gender_demo_df),
+        },
+        "descriptives": {
+            "items": frame_to_json(desc_items),
+            "composite": frame_to_json(desc_comp),
+        },
+        "normality": frame_to_json(result_norm),
+        "recommended_method": recommended_method,
+        "association": assoc_stats,
+        "summary": assoc_summary_text,
+        "ordinal_association": frame_to_json(ordinal_table),
+    }
+
+    if options["pdf"]:
+        filename, pdf_bytes, err = generate_pdf_report(
+            lang_code, t, options["pdf_filename"], before_clean, after_clean,
+            age_demo_df, gender_demo_df, result_norm, desc_items, desc_comp,
+            assoc_summary_text, age_counts, df, x_items, y_items, valid_xy,
+            True, True, True, True, True, True, True, True, True, True, True,
+            age_groups=options["age_groups"],
+        )
+        if err is not None or pdf_bytes is None:
+            result["pdf"] = {"filename": filename, "error": err}
+        else:
+            result["pdf"] = {
+                "filename": filename,
+                "base64": base64.b64encode(pdf_bytes).decode("ascii"),
+            }
+
+    return result
+
+
+# ------------------------------------------------------------------
+# SERVICE
+# ------------------------------------------------------------------
+class AnalysisService:
+    """Bounded worker pool + request queue in front of run_analysis().
+
+    ``workers`` analyses run at once and at most ``queue_size`` requests may be
+    waiting or running; further requests get 503. Uploads bigger than
+    ``large_upload_bytes`` additionally share ``large_slots`` slots, so a few
+    big files can never occupy every worker.
+    """
+
+    def __init__(
+        self,
+        workers=DEFAULT_WORKERS,
+        queue_size=DEFAULT_QUEUE_SIZE,
+        max_upload_bytes=DEFAULT_MAX_UPLOAD_MB * 1024 * 1024,
+        large_upload_bytes=DEFAULT_LARGE_UPLOAD_MB * 1024 * 1024,
+        large_slots=DEFAULT_LARGE_SLOTS,
+        request_timeout=DEFAULT_REQUEST_TIMEOUT,
+    ):
+        self.workers = workers
+        self.queue_size = max(queue_size, workers)
+        self.max_upload_bytes = max_upload_bytes
+        self.large_upload_bytes = large_upload_bytes
+        self.large_slots = large_slots
+        self.request_timeout = request_timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis")
+        self._queue_slots = threading.BoundedSemaphore(self.queue_size)
+        self._large_slots = threading.BoundedSemaphore(large_slots)
+
+    def _analyze(self, data: bytes, options: dict) -> dict:
+        df = parse_upload(data, options["filename"], options["sheet"], survey_engine.get_engine())
+        return run_analysis(df, options)
+
+    def submit(self, data: bytes, options: dict) -> dict:
+        if not self._queue_slots.acquire(blocking=False):
+            raise ServiceError(503, "Analysis queue is full, retry later.")
+        large = len(data) > self.large_upload_bytes
+        if large and not self._large_slots.acquire(timeout=self.request_timeout):
+            self._queue_slots.release()
+            raise ServiceError(503, "Too many large uploads in progress, retry later.")
+
+        def release(_future=None):
+            if large:
+                self._large_slots.release()
+            self._queue_slots.release()
+
+        try:
+            future = self.executor.submit(self._analyze, data, options)
+        except BaseException:
+            release()
+            raise
+        # the slots stay taken until the analysis really ends: a timed-out
+        # task keeps running (and holding memory) on its worker thread
+        future.add_done_callback(release)
+        try:
+            return future.result(timeout=self.request_timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise ServiceError(504, "Analysis timed out.")
+
+    def status(self):
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "max_upload_bytes": self.max_upload_bytes,
+            "large_upload_bytes": self.large_upload_bytes,
+            "large_slots": self.large_slots,
+            "engine": survey_engine.get_engine().name,
+            "cache": SHARED_CACHE.stats(),
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def make_handler(service: AnalysisService):
+    class AnalysisHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, default=_json_default).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if urlparse(self.path).path == "/health":
+                self._send_json(200, service.status())
+            else:
+                self._send_json(404, {"error": "Not found"})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != "/analyze":
+                self._send_json(404, {"error": "Not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                if length <= 0:
+                    raise ServiceError(400, "Request body must contain the survey file.")
+                if length > service.max_upload_bytes:
+                    raise ServiceError(413, "Upload exceeds the configured size limit.")
+                options = parse_options(parse_qs(url.query))
+                data = self.rfile.read(length)
+                result = service.submit(data, options)
+                self._send_json(200, result)
+            except ServiceError as e:
+                self._send_json(e.status, {"error": e.message})
+            except Exception as e:
+                self._send_json(500, {"error": str(e)})
+
+    return AnalysisHandler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local FOMO/addiction analysis service")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="analyses running at the same time")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="max requests waiting or running before 503")
+    parser.add_argument("--max-upload-mb", type=float, default=DEFAULT_MAX_UPLOAD_MB)
+    parser.add_argument("--large-upload-mb", type=float, default=DEFAULT_LARGE_UPLOAD_MB,
+                        help="uploads above this size share --large-slots")
+    parser.add_argument("--large-slots", type=int, default=DEFAULT_LARGE_SLOTS)
+    parser.add_argument("--cache-mb", type=float, default=None,
+                        help="shared cache budget (default: SURVEY_CACHE_MB or 512)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_REQUEST_TIMEOUT)
+    parser.add_argument("--engine", choices=survey_engine.ENGINE_NAMES, default=None,
+                        help="dataframe engine (default: SURVEY_ENGINE or pandas)")
+    args = parser.parse_args(argv)
+
+    if args.engine is not None:
+        survey_engine.DEFAULT_ENGINE = args.engine
+
+    if args.cache_mb is not None:
+        SHARED_CACHE.budget_bytes = int(args.cache_mb * 1024 * 1024)
+    service = AnalysisService(
+        workers=args.workers,
+        queue_size=args.queue_size,
+        max_upload_bytes=int(args.max_upload_mb * 1024 * 1024),
+        large_upload_bytes=int(args.large_upload_mb * 1024 * 1024),
+        large_slots=args.large_slots,
+        request_timeout=args.timeout,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"Analysis service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
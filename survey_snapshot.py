@@ -0,0 +1,217 @@
+"""Save / restore a complete analysis as a snapshot file.
+
+A snapshot holds every shared-cache entry that belongs to one uploaded
+dataset (cleaned and scored frames, descriptive tables, test results …)
+plus the app's selections, so restoring it only puts the entries back into
+the cache and the app reruns without recomputing anything.
+
+The file is an uncompressed zip: ``manifest.json`` (format version, app
+selections, cache keys and JSON-encoded values) and one Parquet file per
+DataFrame / Series. Every member's SHA-256 is listed in the manifest and
+checked on load.
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import time
+import zipfile
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from survey_cache import SHARED_CACHE
+
+SNAPSHOT_FORMAT = "survey-snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = ".svsnap"
+SNAPSHOT_DIR = os.environ.get("SURVEY_SNAPSHOT_DIR", os.path.join(os.path.expanduser("~"), ".survey_snapshots"))
+
+# shared-cache namespaces whose keys start with the dataset key (see data_olah.py)
+SNAPSHOT_NAMESPACES = (
+    "clean_age",
+    "renamed",
+    "screening",
+    "screened",
+    "scored",
+    "normality",
+    "desc_items",
+    "desc_composite",
+    "correlation",
+    "chi_square",
+    "ordinal",
+    "chi_matrix",
+    "regression",
+    "density",
+    "group_tests",
+    "efa",
+)
+
+
+class SnapshotError(Exception):
+    """Snapshot file is unreadable, from another version or fails its checksum"""
+
+
+# ------------------------------------------------------------------
+# VALUE ENCODING
+# ------------------------------------------------------------------
+def _encode(value, frames):
+    """JSON-safe form of a cached value; frames are collected into ``frames``"""
+    if isinstance(value, pd.DataFrame):
+        name = f"frame_{len(frames)}.parquet"
+        frames[name] = value
+        return {"$frame": name}
+    if isinstance(value, pd.Series):
+        name = f"frame_{len(frames)}.parquet"
+        frames[name] = value.to_frame(name="__series__" if value.name is None else value.name)
+        return {"$series": name, "unnamed": value.name is None}
+    if hasattr(value, "_asdict"):
+        # scipy result objects (ShapiroResult …) come back as attribute records
+        return {"$record": {k: _encode(v, frames) for k, v in value._asdict().items()}}
+    if isinstance(value, tuple):
+        return {"$tuple": [_encode(v, frames) for v in value]}
+    if isinstance(value, list):
+        return [_encode(v, frames) for v in value]
+    if isinstance(value, dict):
+        return {"$dict": [[_encode(k, frames), _encode(v, frames)] for k, v in value.items()]}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return {"$array": value.tolist(), "dtype": str(value.dtype)}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise SnapshotError(f"Cannot store value of type {type(value).__name__} in a snapshot.")
+
+
+def _decode(value, frames):
+    if isinstance(value, list):
+        return [_decode(v, frames) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if "$frame" in value:
+        return frames[value["$frame"]]
+    if "$series" in value:
+        series = frames[value["$series"]].iloc[:, 0]
+        return series.rename(None) if value["unnamed"] else series
+    if "$record" in value:
+        return SimpleNamespace(**{k: _decode(v, frames) for k, v in value["$record"].items()})
+    if "$tuple" in value:
+        return tuple(_decode(v, frames) for v in value["$tuple"])
+    if "$dict" in value:
+        return {_decode(k, frames): _decode(v, frames) for k, v in value["$dict"]}
+    if "$array" in value:
+        return np.array(value["$array"], dtype=value["dtype"])
+    return value
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+# ------------------------------------------------------------------
+# SAVE / LOAD
+# ------------------------------------------------------------------
+def snapshot_bytes(data_key, meta: dict, clean, cache=SHARED_CACHE) -> bytes:
+    """Serialize all cache entries for ``data_key`` plus the app selections.
+
+    ``clean`` is the (cleaned frame, before, after) result of age cleaning.
+    It is passed in rather than read from the cache, since the LRU budget
+    may already have evicted it and a snapshot without it cannot be restored.
+    Other evicted entries are simply recomputed after a restore.
+    """
+    data_key = tuple(data_key)
+    prefix_len = len(data_key)
+    clean_key = ("clean_age",) + data_key
+    entries = cache.entries(
+        lambda key: key[0] in SNAPSHOT_NAMESPACES and tuple(key[1:1 + prefix_len]) == data_key and key != clean_key
+    )
+    entries.append((clean_key, tuple(clean)))
+    frames = {}
+    encoded = [[_encode(key, frames), _encode(value, frames)] for key, value in entries]
+
+    members = {}
+    for name, frame in frames.items():
+        buf = io.BytesIO()
+        frame.to_parquet(buf, compression="zstd")
+        members[name] = buf.getvalue()
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "data_key": _encode(data_key, frames),
+        "meta": meta,
+        "entries": encoded,
+        "checksums": {name: _sha256(data) for name, data in members.items()},
+    }
+    out = io.BytesIO()
+    # members are already compressed Parquet, so the zip only stores them
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) as zf:
+        zf.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False))
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return out.getvalue()
+
+
+def load_snapshot(data: bytes, cache=SHARED_CACHE) -> dict:
+    """Verify a snapshot, put its entries back into the cache and return its manifest.
+
+    The decoded age-cleaning result is returned as ``manifest["clean"]``, so
+    callers do not depend on it surviving the cache budget. Nothing is put
+    into the cache unless the snapshot holds that result.
+    """
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            manifest = json.loads(zf.read("manifest.json"))
+            if manifest.get("format") != SNAPSHOT_FORMAT:
+                raise SnapshotError("Not a survey snapshot.")
+            if manifest.get("version") != SNAPSHOT_VERSION:
+                raise SnapshotError(
+                    f"Snapshot version {manifest.get('version')} is not supported "
+                    f"(expected {SNAPSHOT_VERSION})."
+                )
+            frames = {}
+            for name, checksum in manifest["checksums"].items():
+                member = zf.read(name)
+                if _sha256(member) != checksum:
+                    raise SnapshotError(f"Checksum mismatch for {name}; the snapshot is damaged.")
+                frames[name] = pd.read_parquet(io.BytesIO(member))
+    except (zipfile.BadZipFile, KeyError, ValueError) as e:
+        raise SnapshotError(f"Unreadable snapshot: {e}") from e
+
+    manifest["data_key"] = _decode(manifest["data_key"], frames)
+    entries = [(_decode(key, frames), _decode(value, frames)) for key, value in manifest["entries"]]
+    clean_key = ("clean_age",) + manifest["data_key"]
+    clean = [value for key, value in entries if key == clean_key]
+    if not clean:
+        raise SnapshotError("No cleaned data in snapshot.")
+    manifest["clean"] = clean[0]
+    for key, value in entries:
+        cache.put(key, value)
+    return manifest
+
+
+def snapshot_path(name: str, directory=SNAPSHOT_DIR) -> str:
+    safe = re.sub(r"[^A-Za-z0-9_\- ]", "", name).strip() or "analysis"
+    return os.path.join(directory, safe + SNAPSHOT_SUFFIX)
+
+
+def save_snapshot(name: str, data_key, meta: dict, clean, directory=SNAPSHOT_DIR) -> str:
+    """Write a snapshot to ``directory`` and return its path"""
+    os.makedirs(directory, exist_ok=True)
+    path = snapshot_path(name, directory)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(snapshot_bytes(data_key, meta, clean))
+    os.replace(tmp, path)
+    return path
+
+
+def list_snapshots(directory=SNAPSHOT_DIR):
+    """Snapshot file names in ``directory``, newest first"""
+    if not os.path.isdir(directory):
+        return []
+    names = [f for f in os.listdir(directory) if f.endswith(SNAPSHOT_SUFFIX)]
+    return sorted(names, key=lambda f: os.path.getmtime(os.path.join(directory, f)), reverse=True)
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from survey_engine import engine_available, get_engine
+
+AGES = [
+    17, "17", " 19 ", "13 - 18 tahun", "19–23 years", "24 – 28", "< 13", "Above 28", "29+", "17,5",
+    "18.5", "20 tahun", "12", None, np.nan, "abc", "13-23", "28.9", "under 13", "24-28 tahun",
+]
+
+
+@pytest.mark.parametrize("name", ["polars", "duckdb"])
+@pytest.mark.parametrize("groups", [((13, 18), (19, 23), (24, 28)), ((10, 17), (20, 30))])
+def test_clean_age_matches_pandas(name, groups):
+    if not engine_available(name):
+        pytest.skip(f"{name} is not installed")
+    df = pd.DataFrame({"age": pd.Series(AGES, dtype=object), "x": range(len(AGES))})
+    expected = get_engine("pandas").clean_age(df, "age", groups)
+    got = get_engine(name).clean_age(df, "age", groups)
+    pd.testing.assert_frame_equal(got[0], expected[0])
+    assert got[1:] == expected[1:]
+
+
+def _answers():
+    rng = np.random.default_rng(0)
+    data = {f"X{k}": rng.integers(1, 6, 40) for k in range(1, 4)}
+    data.update({f"Y{k}": rng.integers(1, 6, 40).astype(float) for k in range(1, 3)})
+    data["Y2"][[3, 7]] = np.nan
+    df = pd.DataFrame(data)
+    # Excel-style text answers: whole numbers with padding, and one column with junk
+    df["X2"] = pd.Series([f" {v} " for v in df["X2"]], dtype=object)
+    df["X3"] = pd.Series([str(v) for v in df["X3"]], dtype=object)
+    df.loc[5, "X3"] = "n/a"
+    return df
+
+
+@pytest.mark.parametrize("name", ["polars", "duckdb"])
+@pytest.mark.parametrize("method", ["mean", "sum"])
+def test_scores_frequencies_and_crosstab_match_pandas(name, method):
+    if not engine_available(name):
+        pytest.skip(f"{name} is not installed")
+    df = _answers()
+    x_items, y_items = ["X1", "X2", "X3"], ["Y1", "Y2"]
+    ref, engine = get_engine("pandas"), get_engine(name)
+
+    expected = ref.add_composite_scores(df, x_items, y_items, method)
+    got = engine.add_composite_scores(df, x_items, y_items, method)
+    pd.testing.assert_frame_equal(got, expected)
+    assert got["X2"].dtype == np.int64
+
+    want_counts = ref.item_frequencies(expected, x_items + y_items)
+    have_counts = engine.item_frequencies(got, x_items + y_items)
+    assert have_counts.keys() == want_counts.keys()
+    for item, counts in want_counts.items():
+        pd.testing.assert_series_equal(have_counts[item], counts)
+
+    for x_col, y_col in (("X2", "Y1"), ("X3", "Y2")):
+        pd.testing.assert_frame_equal(engine.crosstab(got, x_col, y_col), ref.crosstab(expected, x_col, y_col))
@@ -0,0 +1,43 @@
+from survey_cache import SharedCache
+from survey_jobs import JobQueue
+
+
+def test_finished_results_count_against_the_cache_budget():
+    cache = SharedCache(2_000_000)
+    queue = JobQueue(workers=1, cache=cache)
+    try:
+        ids = [queue.submit(("report", k), lambda progress: b"x" * 700_000) for k in range(5)]
+        queue.executor.submit(lambda: None).result()  # wait for the single worker to drain
+        assert cache.stats()["bytes"] <= cache.budget_bytes
+        assert queue.get(ids[0]) is None  # evicted, so forgotten
+        assert queue.get(ids[-1]).result == b"x" * 700_000
+        # an identical request for an evicted result runs again
+        assert queue.submit(("report", 0), lambda progress: b"y") != ids[0]
+    finally:
+        queue.shutdown()
+
+
+def test_oversized_result_fails_with_a_message():
+    cache = SharedCache(100_000)
+    queue = JobQueue(workers=1, cache=cache)
+    try:
+        job_id = queue.submit(("report", "big"), lambda progress: b"x" * 500_000)
+        queue.executor.submit(lambda: None).result()
+        job = queue.get(job_id)
+        assert job.status == "failed"
+        assert "cache budget" in job.error
+    finally:
+        queue.shutdown()
+
+
+def test_polling_a_result_does_not_count_as_a_cache_hit():
+    cache = SharedCache(2_000_000)
+    queue = JobQueue(workers=1, cache=cache)
+    try:
+        job_id = queue.submit(("report", 1), lambda progress: b"pdf")
+        queue.executor.submit(lambda: None).result()
+        for _ in range(3):
+            assert queue.get(job_id).result == b"pdf"
+        assert cache.stats()["hits"] == 0
+    finally:
+        queue.shutdown()
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from survey_power import instrument_from_data, plan_power
+
+
+@pytest.fixture
+def instrument():
+    answers = np.random.default_rng(0).integers(1, 6, (100, 4))
+    df = pd.DataFrame(answers, columns=["X1", "X2", "Y1", "Y2"])
+    return instrument_from_data(df, ["X1", "X2"], ["Y1", "Y2"])
+
+
+@pytest.mark.parametrize(
+    "n_grid, rho_grid",
+    [([], [0.2]), ([50], []), ([3], [0.2]), ([50], [1.0]), ([50], [-1.5]), ([50], [float("nan")])],
+)
+def test_invalid_grid_raises_value_error(instrument, n_grid, rho_grid):
+    with pytest.raises(ValueError):
+        plan_power(instrument, n_grid, rho_grid, n_reps=10)
+
+
+def test_one_row_per_cell(instrument):
+    results = plan_power(instrument, [20, 40], [0.1, 0.3], n_reps=50)
+    assert len(results) == 4
+    assert results["Power"].between(0, 1).all()
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from survey_regression import fit_regression
+
+
+def _survey(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "X_total": rng.normal(3, 1, n),
+        "Age_Group": rng.choice(["13–18", "19–23", "24–28"], n),
+        "Gender": rng.choice(["F", "M"], n),
+    })
+    df["Y_total"] = 1 + 0.5 * df["X_total"] + rng.normal(0, 1, n)
+    return df
+
+
+def test_matches_least_squares():
+    df = _survey()
+    result = fit_regression(df, covariates=["Age_Group", "Gender"])
+    design = np.column_stack([
+        np.ones(len(df)),
+        df["X_total"],
+        df["Age_Group"] == "19–23",
+        df["Age_Group"] == "24–28",
+        df["Gender"] == "M",
+    ]).astype(float)
+    expected, *_ = np.linalg.lstsq(design, df["Y_total"].to_numpy(), rcond=None)
+    np.testing.assert_allclose(result["coefficients"]["coef"].to_numpy(), expected)
+    assert result["aliased"] == []
+
+
+def test_constant_predictor_is_aliased_not_an_error():
+    df = _survey().assign(X_total=3.0)
+    for interactions in (False, True):
+        result = fit_regression(df, covariates=["Age_Group", "Gender"], interactions=interactions)
+        assert "Intercept" in result["coefficients"].index
+        assert "X_total" in result["aliased"]
+        assert "Residual" in result["anova"].index
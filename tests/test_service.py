@@ -0,0 +1,36 @@
+import threading
+
+import pytest
+
+from survey_service import AnalysisService, ServiceError
+
+
+class SlowService(AnalysisService):
+    """Analysis that blocks until released, standing in for a slow large upload"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.release = threading.Event()
+
+    def _analyze(self, data, options):
+        self.release.wait(10)
+        return {"ok": True}
+
+
+def test_timed_out_large_upload_keeps_its_slot():
+    service = SlowService(workers=2, queue_size=4, large_upload_bytes=10, large_slots=1, request_timeout=0.2)
+    try:
+        with pytest.raises(ServiceError) as timed_out:
+            service.submit(b"x" * 100, {})
+        assert timed_out.value.status == 504
+
+        # the first analysis is still running, so a second large upload is refused
+        with pytest.raises(ServiceError) as refused:
+            service.submit(b"y" * 100, {})
+        assert refused.value.status == 503
+
+        service.release.set()
+        assert service.submit(b"z" * 100, {}) == {"ok": True}
+    finally:
+        service.release.set()
+        service.shutdown()
@@ -0,0 +1,46 @@
+import io
+import json
+import zipfile
+
+import pandas as pd
+import pytest
+
+from survey_cache import SharedCache
+from survey_snapshot import SnapshotError, load_snapshot, snapshot_bytes
+
+DATA_KEY = ("abc123", None, ((13, 18), (19, 23)))
+
+
+def test_snapshot_keeps_the_cleaned_data_after_eviction():
+    cache = SharedCache(10_000_000)
+    clean = (pd.DataFrame({"Age_Group": ["13 - 18 tahun", "19 - 23 tahun"]}), 3, 2)
+    cache.put(("normality",) + DATA_KEY, {"X_total": 0.5})
+    # the cleaned frame is not (or no longer) in the cache
+    data = snapshot_bytes(DATA_KEY, {"source": "survey.csv"}, clean, cache=cache)
+
+    restored = SharedCache(10_000_000)
+    manifest = load_snapshot(data, cache=restored)
+    frame, before, after = manifest["clean"]
+    pd.testing.assert_frame_equal(frame, clean[0])
+    assert (before, after) == (3, 2)
+    assert restored.peek(("normality",) + DATA_KEY) == {"X_total": 0.5}
+
+
+def test_snapshot_without_cleaned_data_is_rejected_before_caching():
+    source = SharedCache(10_000_000)
+    data = snapshot_bytes(DATA_KEY, {}, (pd.DataFrame({"a": [1]}), 1, 1), cache=source)
+    # drop the cleaned entry from the manifest, as an old damaged snapshot would
+    buf = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(data)) as zin, zipfile.ZipFile(buf, "w") as zout:
+        for name in zin.namelist():
+            member = zin.read(name)
+            if name == "manifest.json":
+                manifest = json.loads(member)
+                manifest["entries"] = [e for e in manifest["entries"] if e[0]["$tuple"][0] != "clean_age"]
+                member = json.dumps(manifest).encode()
+            zout.writestr(name, member)
+
+    target = SharedCache(10_000_000)
+    with pytest.raises(SnapshotError):
+        load_snapshot(buf.getvalue(), cache=target)
+    assert target.stats()["entries"] == 0